@@ -1,28 +1,37 @@
+import argparse
 import sys
+import time
+
+_START = time.perf_counter()  # antes de los imports, para medir el arranque
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
     QDialog,
+    QDockWidget,
     QFileDialog,
     QHBoxLayout,
     QLabel,
     QLineEdit,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
-    QScrollArea,
     QSpinBox,
     QVBoxLayout,
     QWidget,
 )
 from zb_analyzer.config_manager import ConfigManager
 from zb_analyzer.frame_buttons import FrameButtonManager
+from zb_analyzer.graph_layout import GraphLayoutCache
+from zb_analyzer.graph_view import SceneGraphPanel
 from zb_analyzer.hitbox_controls import HitboxControlsPanel
 from zb_analyzer.hitbox_manager import HitboxManager
+from zb_analyzer.path_search import PathSearchPanel
 from zb_analyzer.playback_controls import PlaybackControls
-from zb_analyzer.scene_loader import SceneDataLoader
+from zb_analyzer.startup import SceneLoadWorker, StartupProfile
+from zb_analyzer.timeline import TimelineWidget
 from zb_analyzer.video_player import VideoPlayer
 
 
@@ -133,24 +142,30 @@ class FileSelectionDialog(QDialog):
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación"""
 
-    def __init__(self, video_path, json_path):  # noqa: PLR0915
+    def __init__(  # noqa: PLR0915
+        self, video_path, json_path, config_manager=None, profile=None
+    ):
         super().__init__()
         self.setWindowTitle("Zorton Brothers Analyzer")
         self.resize(1400, 800)
 
-        self.scene_loader = SceneDataLoader(json_path)
-        self.scenes = self.scene_loader.load_scenes()
-
-        self.video_widget = VideoPlayer()
-        self.video_widget.load_video(video_path)
+        # las escenas y el vídeo se abren en segundo plano (ver _start_loading)
+        self.profile = profile
+        self.json_path = json_path
+        self.scene_loader = None
+        self.scenes = []
+        self.waiting_scene = None  # escena elegida cuyos paths aún no están
+
+        if config_manager:
+            self.video_widget = VideoPlayer(
+                config_manager.get_frame_cache_bytes(),
+                config_manager.get_loop_cache_bytes(),
+            )
+        else:
+            self.video_widget = VideoPlayer()
+        self.video_widget.videoLoaded.connect(self.on_video_loaded)
 
         self.scene_selector = QComboBox()
-        self.scene_selector.addItems(
-            [
-                f"[{i + 1}] Escena #{scene.get('id', '?')} - {scene['offset']}"
-                for i, scene in enumerate(self.scenes)
-            ]
-        )
         self.scene_selector.currentIndexChanged.connect(self.on_scene_changed)
 
         # navegación de escenas
@@ -168,11 +183,37 @@ class MainWindow(QMainWindow):
         self.info_btn.setToolTip("Información del video")
         self.info_btn.clicked.connect(self.show_video_info)
 
+        # proxy de baja resolución para navegar rápido
+        self.proxy_btn = QPushButton("Proxy")
+        self.proxy_btn.setCheckable(True)
+        self.proxy_btn.setEnabled(False)  # hasta que se abra el vídeo
+        self.proxy_btn.setToolTip(
+            "Usar el vídeo proxy para navegar (desactivar para revisar hitboxes)"
+        )
+        self.proxy_btn.toggled.connect(self.video_widget.set_proxy_mode)
+
+        # HUD de rendimiento de la reproducción
+        self.perf_btn = QPushButton("HUD")
+        self.perf_btn.setCheckable(True)
+        self.perf_btn.setToolTip(
+            "Tiempos de decodificación, conversión, composición y presentación, "
+            "fps, frames descartados, caché, cola y memoria (también en el log)"
+        )
+        self.perf_btn.toggled.connect(self.video_widget.set_perf_hud)
+
+        # grafo de la escena
+        self.graph_btn = QPushButton("Grafo")
+        self.graph_btn.setCheckable(True)
+        self.graph_btn.setToolTip("Mostrar el grafo de la escena")
+
         # selector de escenas
         scene_selector_layout = QHBoxLayout()
         scene_selector_layout.addWidget(self.scene_selector)
         scene_selector_layout.addWidget(self.prev_scene_btn)
         scene_selector_layout.addWidget(self.next_scene_btn)
+        scene_selector_layout.addWidget(self.graph_btn)
+        scene_selector_layout.addWidget(self.proxy_btn)
+        scene_selector_layout.addWidget(self.perf_btn)
         scene_selector_layout.addWidget(self.info_btn)
 
         # controles de reproducción
@@ -182,6 +223,7 @@ class MainWindow(QMainWindow):
             lambda: self.video_widget.seek_frame(-1),
             lambda: self.video_widget.seek_frame(1),
         )
+        self.playback_controls.connect_speed(self.video_widget.set_speed)
 
         self.is_playing = False
 
@@ -189,6 +231,10 @@ class MainWindow(QMainWindow):
         self.frame_timer.timeout.connect(self.update_frame_display)
         self.frame_timer.start(100)
 
+        # línea de tiempo de los nodos de la escena
+        self.timeline = TimelineWidget()
+        self.timeline.seekRequested.connect(self.seek_timeline)
+
         manual_frame_widget = QWidget()
         manual_frame_main_layout = QHBoxLayout()
         manual_frame_widget.setLayout(manual_frame_main_layout)
@@ -240,6 +286,7 @@ class MainWindow(QMainWindow):
         left_layout = QVBoxLayout()
         left_layout.addLayout(scene_selector_layout)
         left_layout.addWidget(self.video_widget)
+        left_layout.addWidget(self.timeline)
         left_layout.addWidget(self.playback_controls)
         left_layout.addWidget(manual_frame_widget)
 
@@ -247,14 +294,12 @@ class MainWindow(QMainWindow):
 
         self.hitbox_controls = HitboxControlsPanel()
 
+        # las listas de hitboxes y de paths/nodos hacen su propio scroll
         self.checkbox_widget = QWidget()
         self.checkbox_layout = QVBoxLayout()
+        self.checkbox_layout.setContentsMargins(0, 0, 0, 0)
         self.checkbox_widget.setLayout(self.checkbox_layout)
 
-        scroll = QScrollArea()
-        scroll.setWidget(self.checkbox_widget)
-        scroll.setWidgetResizable(True)
-
         self.hitbox_manager = HitboxManager(
             self.checkbox_layout, self.video_widget, self.play_frame_loop
         )
@@ -263,36 +308,30 @@ class MainWindow(QMainWindow):
         self.hitbox_controls.connect_select_buttons(
             self.hitbox_manager.select_all, self.hitbox_manager.deselect_all
         )
-        self.hitbox_controls.offset_x_spin.valueChanged.connect(
-            lambda: self.hitbox_manager.apply_offset(
-                self.hitbox_controls.offset_x_spin.value(),
-                self.hitbox_controls.offset_y_spin.value(),
-            )
-        )
-        self.hitbox_controls.offset_y_spin.valueChanged.connect(
-            lambda: self.hitbox_manager.apply_offset(
-                self.hitbox_controls.offset_x_spin.value(),
-                self.hitbox_controls.offset_y_spin.value(),
-            )
-        )
+        self.hitbox_controls.offset_x_spin.valueChanged.connect(self.on_offset_changed)
+        self.hitbox_controls.offset_y_spin.valueChanged.connect(self.on_offset_changed)
+        self.hitbox_controls.scale_spin.valueChanged.connect(self.on_offset_changed)
 
         self.buttons_widget = QWidget()
         self.buttons_layout = QVBoxLayout()
+        self.buttons_layout.setContentsMargins(0, 0, 0, 0)
         self.buttons_widget.setLayout(self.buttons_layout)
 
-        scroll_buttons = QScrollArea()
-        scroll_buttons.setWidget(self.buttons_widget)
-        scroll_buttons.setWidgetResizable(True)
-
         self.frame_button_manager = FrameButtonManager(
             self.buttons_layout, self.play_frame_loop
         )
 
+        self.path_search = PathSearchPanel()
+        self.path_search.filterChanged.connect(
+            self.frame_button_manager.set_visible_paths
+        )
+
         # panel derecho
         right_layout.addWidget(QLabel("Hitboxes:"))
         right_layout.addWidget(self.hitbox_controls)
-        right_layout.addWidget(scroll, 1)
-        right_layout.addWidget(scroll_buttons, 1)
+        right_layout.addWidget(self.checkbox_widget, 1)
+        right_layout.addWidget(self.path_search)
+        right_layout.addWidget(self.buttons_widget, 2)
 
         main_layout = QHBoxLayout()
         left_widget = QWidget()
@@ -307,23 +346,124 @@ class MainWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        self.on_scene_changed(0)  # carga de primera escena del json
-
-        # reproducción
+        # grafo en un panel acoplable: el layout solo se calcula si se ve
+        self.graph_panel = SceneGraphPanel(GraphLayoutCache.for_json(json_path))
+        self.graph_panel.nodeClicked.connect(self.on_graph_node_clicked)
+        self.frame_button_manager.node_changed_callback = self.graph_panel.set_current
+
+        self.graph_dock = QDockWidget("Grafo de la escena", self)
+        self.graph_dock.setWidget(self.graph_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.graph_dock)
+        self.graph_dock.hide()
+        self.graph_btn.toggled.connect(self.graph_dock.setVisible)
+        self.graph_dock.visibilityChanged.connect(self.graph_btn.setChecked)
+
+        # progreso de la carga de escenas
+        self.scene_progress = QProgressBar()
+        self.scene_progress.setMaximumWidth(200)
+        self.scene_progress.setFormat("Escenas %v / %m")
+        self.statusBar().addPermanentWidget(self.scene_progress)
+        self.statusBar().showMessage("Cargando escenas...")
+
+        # reproducción (empieza en cuanto se abra el vídeo)
         self.video_widget.play()
         self.is_playing = True
         self.playback_controls.set_play_state(self.is_playing)
 
+        self._start_loading(video_path)
+
+    def _start_loading(self, video_path):
+        """abre el vídeo y carga las escenas en segundo plano"""
+        if self.profile is not None:
+            self.video_widget.firstFrameShown.connect(
+                lambda: self.profile.mark("primer frame")
+            )
+        self.video_widget.load_video(video_path)
+
+        self.scene_worker = SceneLoadWorker(self.json_path, self)
+        self.scene_worker.opened.connect(self.on_scenes_opened)
+        self.scene_worker.sceneReady.connect(self.on_scene_ready)
+        self.scene_worker.finished.connect(self.on_scenes_finished)
+        self.scene_worker.start()
+
+    def on_scenes_opened(self, loader):
+        """JSON leído: lista de escenas disponible, paths todavía en camino"""
+        if self.profile is not None:
+            self.profile.mark("escenas leídas")
+        self.scene_loader = loader
+        self.scenes = loader.scenes
+        self.scene_progress.setRange(0, len(self.scenes))
+        self.graph_panel.set_game_data(loader.data)
+        if loader.data is not None:
+            self.timeline.set_game_nodes(loader.node_map.values())
+
+        self.scene_selector.blockSignals(True)
+        self.scene_selector.addItems(
+            [
+                f"[{i + 1}] Escena #{scene.get('id', '?')} - {scene['offset']}"
+                for i, scene in enumerate(self.scenes)
+            ]
+        )
+        self.scene_selector.blockSignals(False)
+        self.on_scene_changed(0)  # carga de primera escena del json
+
+    def on_scene_ready(self, index, done, total):
+        self.scene_progress.setValue(done)
+        if index == self.waiting_scene == self.scene_selector.currentIndex():
+            self.on_scene_changed(index)
+
+    def on_scenes_finished(self):
+        self.scene_progress.hide()
+        self.statusBar().clearMessage()
+        if self.profile is not None:
+            self.profile.mark("todas las escenas")
+
+    def on_video_loaded(self, opened):
+        self.proxy_btn.setEnabled(self.video_widget.has_proxy())
+        if self.profile is not None:
+            self.profile.mark("vídeo abierto")
+        if not opened:
+            return
+        # la calibración de los hitboxes viene con el vídeo
+        index = self.scene_selector.currentIndex()
+        if 0 <= index < len(self.scenes):
+            self._apply_hitbox_calibration(self.scenes[index])
+
+    def _apply_hitbox_calibration(self, scene):
+        """transformación calibrada de los hitboxes (la de la escena si tiene)"""
+        calibration = self.video_widget.calibration
+        if "hitbox" in calibration.meta:
+            offset_x, offset_y, scale = calibration.hitbox_transform(scene.get("id"))
+            self.hitbox_controls.set_transform(offset_x, offset_y, scale)
+            self.hitbox_manager.apply_offset(offset_x, offset_y, scale)
+
     def on_scene_changed(self, index):
         if index < 0 or index >= len(self.scenes):
             return
 
+        if not self.scene_loader.is_loaded(index):
+            # se muestra cuando llegue su sceneReady
+            self.waiting_scene = index
+            self.scene_worker.prioritize(index)
+            self.statusBar().showMessage(f"Cargando escena {index + 1}...")
+            return
+        self.waiting_scene = None
+        self.statusBar().clearMessage()
+        if self.profile is not None:
+            self.profile.mark("primera escena lista")
+
         scene = self.scenes[index]
         print(f"Cambiando a escena {index + 1}: {scene['offset']}")
 
+        self._apply_hitbox_calibration(scene)
+
         # Cargar los caminos del grafo
         paths = scene.get("graph_paths", [])
         self.frame_button_manager.update_paths(paths)
+        self.path_search.set_index(self.scene_loader.get_path_index(index))
+        chunk = self.scene_loader.chunks_by_id.get(scene.get("id"), {})
+        self.graph_panel.show_scene(chunk.get("nodes", []), chunk.get("mem_offset"))
+        self.timeline.set_scene(chunk.get("nodes", []))
 
         # Actualizar hitboxes del primer nodo si existe
         if paths and paths[0]["nodes"]:
@@ -334,6 +474,26 @@ class MainWindow(QMainWindow):
 
         self.frame_button_manager.activate_first_node()
 
+    def on_graph_node_clicked(self, mem):
+        """saltar al nodo pulsado en el grafo"""
+        index = self.scene_selector.currentIndex()
+        path_ids = self.scene_loader.get_path_index(index).paths_with_node(mem)
+        if self.frame_button_manager.select_node(mem, path_ids):
+            return
+
+        # nodo fuera de los paths visibles (o de otra escena en el grafo del juego)
+        node = self.scene_loader.get_node_data(mem)
+        if node is None:
+            return
+        self.frame_button_manager.clear_active_button()
+        self.play_frame_loop(node["frame_start"], node["frame_end"], node["hitboxes"])
+
+    def on_offset_changed(self):
+        offset_x, offset_y = self.hitbox_controls.get_offset_values()
+        self.hitbox_manager.apply_offset(
+            offset_x, offset_y, self.hitbox_controls.get_scale_value()
+        )
+
     def toggle_play_pause(self):
         if self.is_playing:
             self.video_widget.pause()
@@ -347,6 +507,7 @@ class MainWindow(QMainWindow):
     def play_frame_loop(self, start, end, hitboxes=None):
         """Reproduce un loop de frames y actualiza los hitboxes"""
         self.video_widget.play_loop(start, end)
+        self.timeline.set_current(start, end)
 
         if hitboxes is not None:
             self.hitbox_manager.update_hitboxes(hitboxes)
@@ -364,6 +525,15 @@ class MainWindow(QMainWindow):
     def update_frame_display(self):
         current_frame = self.video_widget.get_current_frame_number()
         self.playback_controls.update_frame_label(current_frame)
+        self.timeline.set_position(current_frame)
+
+    def seek_timeline(self, frame):
+        """saltar al frame pulsado en la línea de tiempo"""
+        if self.video_widget.loop_enabled:
+            self.frame_button_manager.clear_active_button()
+            self.timeline.set_current(None, None)
+            self.stop_loop()
+        self.video_widget.goto_frame(frame)
 
     def prev_scene(self):
         """cambiar a la escena anterior"""
@@ -403,15 +573,23 @@ class MainWindow(QMainWindow):
             )
             return
 
+        cache = info["cache"]
+        playback = info["playback"]
         minutes = int(info["duration"] // 60)
         seconds = info["duration"] % 60
 
         message = f"""<b>Información del video</b><br><br>
 <b>Ruta:</b> {info["path"]}<br>
 <b>Resolución:</b> {info["width"]} x {info["height"]} px<br>
-<b>FPS:</b> {info["fps"]:.2f}<br>
+<b>FPS:</b> {info["fps"]:.2f} (reproducción a {playback["speed"]:g}x)<br>
 <b>Total de frames:</b> {info["total_frames"]}<br>
-<b>Duración:</b> {minutes}m {seconds:.2f}s"""
+<b>Duración:</b> {minutes}m {seconds:.2f}s<br><br>
+<b>Caché de frames:</b> {cache["frames"]} frames, {cache["bytes"] / 2**20:.0f} / {cache["max_bytes"] / 2**20:.0f} MB<br>
+<b>Aciertos / fallos:</b> {cache["hits"]} / {cache["misses"]} ({cache["hit_rate"]:.0%}), {cache["evictions"]} descartados<br>
+<b>Frames en mmap:</b> {info["store_frames"]}<br>
+<b>Calibración:</b> {", ".join(f"{start}: {offset:+d}" for start, offset in info["calibration"])}<br>
+<b>Presentados / descartados / tarde:</b> {playback["presented"]} / {playback["dropped"]} / {playback["late"]}<br>
+<b>Modo:</b> {"proxy" if info["proxy"] else "resolución completa"}"""
 
         msg_box = QMessageBox(self)
         msg_box.setWindowTitle("Información del video")
@@ -419,6 +597,11 @@ class MainWindow(QMainWindow):
         msg_box.setText(message)
         msg_box.exec()
 
+    def closeEvent(self, event):
+        self.scene_worker.stop()
+        self.video_widget.release()
+        super().closeEvent(event)
+
     def goto_frame(self):
         """saltar a un frame específico"""
         frame = self.goto_frame_spin.value()
@@ -443,19 +626,50 @@ class MainWindow(QMainWindow):
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Zorton Brothers Analyzer")
+    parser.add_argument("video", nargs="?", help="vídeo del laserdisc")
+    parser.add_argument("json", nargs="?", help="JSON con los grafos de escenas")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="mide el arranque hasta el primer frame y sale",
+    )
+    args, qt_args = parser.parse_known_args()
+
+    profile = StartupProfile(_START) if args.profile_startup else None
+    if profile is not None:
+        profile.mark("imports")
+
+    app = QApplication([sys.argv[0], *qt_args])
 
     config_manager = ConfigManager()
 
-    dialog = FileSelectionDialog(config_manager)
-    if dialog.exec() != QDialog.DialogCode.Accepted:
-        return 0
+    if args.video and args.json:
+        video_path, json_path = args.video, args.json
+    else:
+        dialog = FileSelectionDialog(config_manager)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return 0
 
-    video_path, json_path = dialog.get_paths()
-    config_manager.set_paths(video_path, json_path)
+        video_path, json_path = dialog.get_paths()
+        config_manager.set_paths(video_path, json_path)
 
-    window = MainWindow(video_path, json_path)
+    window = MainWindow(video_path, json_path, config_manager, profile)
     window.show()
+    if profile is not None:
+        QTimer.singleShot(0, lambda: profile.mark("ventana visible"))
+
+        def check_done():
+            if window.isVisible() and profile.has(
+                "primer frame", "primera escena lista"
+            ):
+                print(profile.report())
+                window.close()
+                app.quit()
+
+        # el primer frame y la primera escena llegan en cualquier orden
+        window.video_widget.firstFrameShown.connect(check_done)
+        window.scene_worker.sceneReady.connect(lambda *_: check_done())
     sys.exit(app.exec())
 
 
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+VIDEO_FRAMES = 40
+VIDEO_SIZE = (64, 48)
+
+
+def frame_level(frame_number):
+    """gris de cada frame del vídeo de prueba, para reconocerlo al leerlo"""
+    return (frame_number * 6) % 240
+
+
+@pytest.fixture
+def video(tmp_path):
+    """vídeo MJPG corto (todo keyframes) con un gris distinto por frame"""
+    cv2 = pytest.importorskip("cv2")
+
+    path = tmp_path / "test.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, VIDEO_SIZE)
+    for i in range(VIDEO_FRAMES):
+        frame = np.full((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), frame_level(i), np.uint8)
+        writer.write(frame)
+    writer.release()
+    return path
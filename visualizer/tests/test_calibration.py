@@ -0,0 +1,61 @@
+import pytest
+
+from zb_analyzer.calibration import Calibration
+
+TABLES = [
+    [(0, 0)],
+    [(0, 7)],
+    [(0, -5)],
+    [(0, 2), (50, 5), (120, 9)],  # frames duplicados en el vídeo
+    [(0, 0), (40, -3), (90, -8)],  # frames perdidos en el vídeo
+    [(0, 4), (30, 1), (60, 6), (100, 3)],
+]
+LD_FRAMES = range(-20, 200)
+
+
+def _images(calibration):
+    """vídeo -> frames del laserdisc que lo usan, por fuerza bruta"""
+    images = {}
+    for ld in LD_FRAMES:
+        images.setdefault(calibration.to_video(ld), []).append(ld)
+    return images
+
+
+@pytest.mark.parametrize("segments", TABLES)
+def test_to_video_follows_segments(segments):
+    calibration = Calibration(segments)
+    for ld in LD_FRAMES:
+        offset = next((o for s, o in reversed(segments) if ld >= s), segments[0][1])
+        assert calibration.to_video(ld) == ld + offset
+
+
+@pytest.mark.parametrize("segments", TABLES)
+def test_to_laserdisc_inverts_to_video(segments):
+    calibration = Calibration(segments)
+    for video, lds in _images(calibration).items():
+        # de los frames del laserdisc con el mismo frame de vídeo, el último
+        assert calibration.to_laserdisc(video) == max(lds)
+        assert calibration.to_video(calibration.to_laserdisc(video)) == video
+
+
+@pytest.mark.parametrize("segments", TABLES)
+def test_round_trip_from_laserdisc(segments):
+    calibration = Calibration(segments)
+    images = _images(calibration)
+    for ld in LD_FRAMES:
+        if len(images[calibration.to_video(ld)]) == 1:
+            assert calibration.to_laserdisc(calibration.to_video(ld)) == ld
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / "video.avi.calib.json"
+    source = {"size": 1234, "mtime": 5678}
+    Calibration([(0, 2), (50, -1)], source, {"method": "cuts"}).save(path)
+
+    loaded = Calibration.load(path, source)
+    assert loaded.segments == [(0, 2), (50, -1)]
+    assert loaded.meta == {"method": "cuts"}
+    assert [loaded.to_video(ld) for ld in (0, 49, 50)] == [2, 51, 49]
+
+    assert Calibration.load(path, {"size": 1, "mtime": 5678}) is None
+    assert Calibration.load(tmp_path / "missing.calib.json") is None
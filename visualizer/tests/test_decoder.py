@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from conftest import VIDEO_FRAMES, frame_level
+
+pytest.importorskip("cv2")
+
+from zb_analyzer.decoder import FrameDecoder
+
+
+def wait_frame(decoder, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        item = decoder.take_frame()
+        if item is not None:
+            return item
+        time.sleep(0.005)
+    return None
+
+
+@pytest.fixture
+def decoder(video):
+    decoder = FrameDecoder(str(video))
+    decoder.start()
+    assert decoder.ready.wait(5)
+    yield decoder
+    decoder.stop()
+    decoder.join(timeout=2)
+
+
+def test_startup_opens_video(decoder):
+    assert decoder.info["opened"]
+    assert decoder.info["total_frames"] == VIDEO_FRAMES
+    # el hilo tiene que sobrevivir al primer comando
+    decoder.seek(0)
+    assert wait_frame(decoder) is not None
+    assert decoder.is_alive()
+
+
+def test_seek_delivers_requested_frame(decoder):
+    decoder.seek(17)
+    frame_number, frame = wait_frame(decoder)
+    assert frame_number == 17
+    assert abs(int(frame.mean()) - frame_level(17)) <= 3
+
+
+def test_playing_decodes_ahead_in_order(decoder):
+    decoder.seek(5)
+    decoder.set_playing(True)
+    numbers = [wait_frame(decoder)[0] for _ in range(6)]
+    assert numbers == list(range(5, 11))
+
+
+def test_stop_ends_thread(video):
+    decoder = FrameDecoder(str(video))
+    decoder.start()
+    assert decoder.ready.wait(5)
+    decoder.stop()
+    decoder.join(timeout=2)
+    assert not decoder.is_alive()
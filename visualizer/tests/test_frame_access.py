@@ -0,0 +1,41 @@
+import pytest
+from conftest import VIDEO_FRAMES, frame_level
+
+cv2 = pytest.importorskip("cv2")
+
+from zb_analyzer.frame_access import FrameAccessor, KeyframeIndex
+
+
+@pytest.fixture
+def cap(video):
+    cap = cv2.VideoCapture(str(video))
+    yield cap
+    cap.release()
+
+
+def assert_frame(frame, frame_number):
+    assert frame is not None
+    assert abs(int(frame.mean()) - frame_level(frame_number)) <= 3
+
+
+def test_forward_reads_without_seek(cap):
+    accessor = FrameAccessor(cap)
+    for n in (0, 1, 5, 12):
+        assert_frame(accessor.read(n), n)
+    assert accessor.seeks == 0
+
+
+def test_read_after_eof_seeks_without_index(cap):
+    accessor = FrameAccessor(cap)
+    assert accessor.read(VIDEO_FRAMES + 5) is None
+    # la posición es desconocida: los frames cercanos al inicio también
+    assert_frame(accessor.read(3), 3)
+    assert_frame(accessor.read(VIDEO_FRAMES - 1), VIDEO_FRAMES - 1)
+
+
+def test_backward_read_with_index(video, cap):
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video))
+    assert_frame(accessor.read(30), 30)
+    assert_frame(accessor.read(2), 2)
+    assert accessor.read(VIDEO_FRAMES + 5) is None
+    assert_frame(accessor.read(4), 4)
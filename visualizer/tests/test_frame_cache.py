@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from zb_analyzer.frame_cache import FrameCache
+
+FRAME_BYTES = 1000
+
+
+def _frame(value=0, nbytes=FRAME_BYTES):
+    return np.full(nbytes, value, np.uint8)
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = FrameCache(max_bytes=3 * FRAME_BYTES)
+    for n in range(3):
+        cache.put(n, _frame(n))
+    assert cache.get(0) is not None  # 0 pasa a ser el más reciente
+
+    cache.put(3, _frame(3))
+
+    assert 1 not in cache
+    assert [n for n in range(4) if n in cache] == [0, 2, 3]
+    assert cache.bytes == 3 * FRAME_BYTES
+    assert cache.evictions == 1
+
+
+def test_budget_counts_bytes_not_frames():
+    cache = FrameCache(max_bytes=2500)
+    cache.put(0, _frame(nbytes=500))
+    cache.put(1, _frame(nbytes=500))
+    cache.put(2, _frame(nbytes=1500))
+    assert cache.bytes == 2500 and len(cache.frames) == 3
+
+    cache.put(3, _frame(nbytes=1000))  # hay que sacar 0 y 1 para que quepa
+
+    assert list(cache.frames) == [2, 3]
+    assert cache.bytes == 2500
+    assert cache.evictions == 2
+
+
+def test_replacing_a_frame_updates_bytes():
+    cache = FrameCache(max_bytes=3 * FRAME_BYTES)
+    cache.put(0, _frame(nbytes=2000))
+    cache.put(0, _frame(nbytes=500))
+
+    assert cache.bytes == 500
+    assert cache.evictions == 0
+
+
+def test_frame_larger_than_budget_is_not_cached():
+    cache = FrameCache(max_bytes=FRAME_BYTES)
+    cache.put(0, _frame())
+    cache.put(1, _frame(nbytes=FRAME_BYTES + 1))
+
+    assert 0 in cache and 1 not in cache
+    assert cache.bytes == FRAME_BYTES
+
+
+def test_shrinking_budget_evicts_oldest():
+    cache = FrameCache(max_bytes=5 * FRAME_BYTES)
+    for n in range(5):
+        cache.put(n, _frame(n))
+
+    cache.set_budget(2 * FRAME_BYTES)
+
+    assert list(cache.frames) == [3, 4]
+    assert cache.bytes == 2 * FRAME_BYTES
+    assert cache.stats()["evictions"] == 3
+
+
+def test_cached_frames_are_read_only():
+    cache = FrameCache()
+    cache.put(0, _frame())
+
+    with pytest.raises(ValueError):
+        cache.get(0)[0] = 1
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+from conftest import VIDEO_FRAMES, frame_level
+
+from zb_analyzer.calibration import Calibration
+from zb_analyzer.frame_store import extract
+
+
+def _node(start, end):
+    return {
+        "value": {
+            "ptr_frame_start": ["0x0", "0x0", str(start)],
+            "ptr_frame_end": ["0x0", "0x0", str(end)],
+        }
+    }
+
+
+def _scenes_json(tmp_path, ranges):
+    path = tmp_path / "scenes.json"
+    nodes = [_node(start, end) for start, end in ranges]
+    path.write_text(json.dumps({"chunks": [{"nodes": nodes}]}))
+    return path
+
+
+def test_extract_clips_ranges_to_video(tmp_path, video):
+    # al vídeo le faltan los 5 primeros frames: el n del laserdisc es su n - 5
+    st = video.stat()
+    source = {"size": st.st_size, "mtime": int(st.st_mtime)}
+    Calibration([(0, -5)], source).save(Calibration.path_for(video))
+
+    # el primero empieza antes del vídeo y el último acaba después
+    scenes = _scenes_json(tmp_path, [(2, 10), (20, 25), (30, 60)])
+    store = extract(video, [scenes], workers=1)
+
+    assert store is not None
+    assert [r[:2] for r in store.ranges] == [(5, 10), (20, 25), (30, VIDEO_FRAMES + 4)]
+    for ld_frame in (5, 10, 20, 30, VIDEO_FRAMES + 4):
+        frame = store.get(ld_frame)
+        assert abs(int(np.median(frame)) - frame_level(ld_frame - 5)) <= 3
+    assert store.get(4) is None
+    assert store.get(VIDEO_FRAMES + 5) is None
@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+
+from zb_analyzer.game_engine import (
+    CLEARED,
+    GAME_OVER,
+    STALLED,
+    Rules,
+    SceneProgram,
+    run_batch,
+    run_log,
+)
+
+DEATH = "0x0004c7d2"
+SCENE_END = "0x0004c7fc"
+BOX = {"x0": 10, "y0": 10, "x1": 50, "y1": 50}
+INSIDE = (20, 20)
+OUTSIDE = (200, 200)
+
+
+def _frames(start, end):
+    return ["0x0", "0x0", str(start)], ["0x0", "0x0", str(end)]
+
+
+def _node(mem, frames, window, sequences, score=0, respawn=None):
+    start, end = _frames(*frames)
+    hb_start, hb_end = _frames(*window)
+    value = {
+        "ptr_frame_start": start,
+        "ptr_frame_end": end,
+        "ptr_frame_hitbox_start": hb_start,
+        "ptr_frame_hitbox_end": hb_end,
+        "sequences": sequences,
+        "lista_hitboxes": [{"hitbox": {**BOX, "score": score}}] if score else [],
+    }
+    if respawn:
+        value["ptr_node_respawn"] = respawn
+    return {"mem_offset": mem, "value": value}
+
+
+# A (entrada, 20 frames, ventana 5-14): fallo -> muerte, acierto -> B
+# R (respawn de A, 10 frames, ventana 0-9): fallo -> muerte, acierto -> B
+# B (10 frames, sin hitboxes): fin de escena
+NODES = [
+    _node(
+        "0x00000100",
+        (1000, 1019),
+        (1005, 1014),
+        [DEATH, "0x00000200"],
+        100,
+        "0x00000150",
+    ),
+    _node("0x00000150", (2000, 2009), (2000, 2009), [DEATH, "0x00000200"], 50),
+    _node("0x00000200", (1020, 1029), (1020, 1020), [SCENE_END]),
+    {"mem_offset": DEATH, "value": {"sequences": []}},
+]
+# como en el JSON real, los nodos se repiten y mem_offset es el nodo final
+CHUNK = {"id": 0, "mem_offset": "0x00000200", "nodes": NODES + NODES[2:3]}
+A, R, B = 0, 1, 2
+
+
+@pytest.fixture
+def program():
+    return SceneProgram(CHUNK)
+
+
+def test_program_layout(program):
+    assert program.mems == ["0x00000100", "0x00000150", "0x00000200"]
+    assert program.entry == A
+    assert program.length.tolist() == [20, 10, 10]
+    assert program.window.tolist() == [[5, 14], [0, 9], [0, 0]]
+    assert program.respawn.tolist() == [R, -1, -1]
+
+
+def test_hit_goes_to_hit_branch(program):
+    result = run_log(program, [(7, *INSIDE)])
+
+    assert result == {
+        "score": 100,
+        "deaths": 0,
+        "outcome": "superada",
+        "frames": 30,
+        "path": ["0x00000100", "0x00000200"],
+    }
+
+
+def test_only_first_hit_in_window_counts(program):
+    # fuera de la ventana, fallo dentro y dos aciertos: cuenta uno
+    log = [(2, *INSIDE), (6, *OUTSIDE), (8, *INSIDE), (9, *INSIDE)]
+    assert run_log(program, log)["score"] == 100
+
+
+def test_miss_dies_and_respawns(program):
+    # fallo en A, muerte y se repite desde R (frames 20-29 del log)
+    result = run_log(program, [(7, *OUTSIDE), (25, *INSIDE)])
+
+    assert result["score"] == 50
+    assert result["deaths"] == 1
+    assert result["outcome"] == "superada"
+    assert result["frames"] == 40
+    assert result["path"] == ["0x00000100", "0x00000150", "0x00000200"]
+
+
+def test_deaths_end_in_game_over(program):
+    # A -> muerte -> R -> muerte -> R (sin respawn, se repite) -> muerte
+    result = run_batch(program, [[(7, *OUTSIDE)]], trace=True)
+
+    assert result["outcome"][0] == GAME_OVER
+    assert result["deaths"][0] == 3
+    assert result["steps"][0] == 3
+    assert result["frames"][0] == 40
+    assert result["end_node"][0] == R
+    assert result["trace"][0, :4].tolist() == [A, R, R, -1]
+
+
+def test_respawn_rules(program):
+    log = [(7, *OUTSIDE), (25, *INSIDE)]
+
+    # de vuelta a la entrada: A empieza en el frame 20, ventana 25-34
+    entry = run_log(SceneProgram(CHUNK, Rules(respawn="entry")), log)
+    assert entry["path"] == ["0x00000100", "0x00000100", "0x00000200"]
+    assert entry["score"] == 100
+
+    # cada muerte consume frames: R empieza en 26 y el disparo llega antes
+    slow = run_log(SceneProgram(CHUNK, Rules(death_frames=6)), log)
+    assert slow["path"][:3] == ["0x00000100", "0x00000150", "0x00000150"]
+    assert slow["score"] == 0
+
+    assert run_log(SceneProgram(CHUNK, Rules(lives=1)), log)["outcome"] == "sin vidas"
+
+
+def test_stalled_without_end(program):
+    result = run_batch(program, [[]], max_steps=2)
+    assert result["outcome"][0] == STALLED
+
+
+def test_batch_matches_single_logs(program):
+    logs = [
+        [(7, *INSIDE)],
+        [(7, *OUTSIDE), (25, *INSIDE)],
+        [],
+        [(9, *INSIDE), (3, *OUTSIDE)],  # sin ordenar
+        [(-4, *INSIDE), (12, *INSIDE)],  # antes de empezar la escena
+    ]
+    batch = run_batch(program, logs)
+
+    for i, log in enumerate(logs):
+        single = run_batch(program, [log])
+        for key, values in batch.items():
+            assert values[i] == single[key][0], (i, key)
+    assert batch["outcome"].tolist() == [CLEARED, CLEARED, GAME_OVER, CLEARED, CLEARED]
+    np.testing.assert_array_equal(batch["score"], [100, 50, 0, 100, 100])
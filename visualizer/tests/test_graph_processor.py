@@ -0,0 +1,171 @@
+import itertools
+import random
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+
+from zb_analyzer.graph_processor import GraphProcessor
+
+
+def _graph(edges, nodes=()):
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    return G
+
+
+def test_stats_of_dag():
+    stats = GraphProcessor().get_graph_stats(_graph([(1, 2), (1, 3), (2, 4), (3, 4)]))
+
+    assert stats["is_dag"]
+    assert stats["num_sccs"] == 4
+    assert stats["num_cyclic_sccs"] == 0
+    assert stats["num_cycles"] == 0
+    assert not stats["cycles_capped"]
+
+
+def test_stats_count_cycles_per_component():
+    # 1 <-> 2 y 2 -> 3 -> 1 comparten SCC (2 ciclos), 5 tiene un bucle propio
+    # y 4 -> 6 -> 4 es otra SCC (1 ciclo); 7 queda suelto
+    G = _graph([(1, 2), (2, 1), (2, 3), (3, 1), (3, 4), (5, 5), (4, 6), (6, 4)], [7])
+    stats = GraphProcessor().get_graph_stats(G)
+
+    assert not stats["is_dag"]
+    assert stats["num_nodes"] == 7
+    assert stats["num_sccs"] == 4
+    assert stats["num_cyclic_sccs"] == 3
+    assert stats["cyclic_scc_sizes"] == [3, 2, 1]
+    assert stats["largest_scc"] == 3
+    assert stats["num_cycles"] == 4
+    assert stats["num_cycles"] == sum(1 for _ in nx.simple_cycles(G))
+    assert not stats["cycles_capped"]
+
+
+def test_stats_cap_cycle_count():
+    # grafo completo de 5 nodos: 84 ciclos elementales
+    G = nx.complete_graph(5, create_using=nx.DiGraph)
+    processor = GraphProcessor()
+
+    assert processor.get_graph_stats(G, None)["num_cycles"] == 84
+    capped = processor.get_graph_stats(G, 10)
+    assert (capped["num_cycles"], capped["cycles_capped"]) == (10, True)
+    exact = processor.get_graph_stats(G, 84)
+    assert (exact["num_cycles"], exact["cycles_capped"]) == (84, False)
+    skipped = processor.get_graph_stats(G, 0)
+    assert (skipped["num_cycles"], skipped["is_dag"]) == (0, False)
+
+
+def test_count_cycles_reuses_components():
+    G = _graph([(1, 2), (2, 1), (3, 4), (4, 3)])
+    processor = GraphProcessor()
+    components = processor.cyclic_components(G)
+
+    assert processor.count_cycles(G, None, components) == (2, False)
+    assert processor.count_cycles(G, None, components[:1]) == (1, False)
+
+
+def _brute_force_routes(G, roots, targets, weight):
+    """valores de todas las rutas raíz -> objetivo enumerando caminos"""
+    routes = []
+    for r in roots:
+        for t in targets:
+            paths = [[r]] if r == t else nx.all_simple_paths(G, r, t)
+            routes += [(sum(weight(m) for m in p), p) for p in paths]
+    return routes
+
+
+def _random_dag(seed, n=12, p=0.3):
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(
+        (i, j) for i in range(n) for j in range(i + 1, n) if rng.random() < p
+    )
+    weights = {i: rng.randint(0, 9) for i in range(n)}
+    return G, weights
+
+
+def _check_routes(G, routes, expected, weight, k):
+    assert [v for v, _ in routes] == [v for v, _ in expected][:k]
+    for value, path in routes:
+        assert all(G.has_edge(u, v) for u, v in itertools.pairwise(path))
+        assert sum(weight(m) for m in path) == value
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("maximize", [True, False])
+def test_k_best_routes_match_brute_force(seed, maximize):
+    G, weights = _random_dag(seed)
+    roots = [n for n in G if G.in_degree(n) == 0]
+    targets = {n for n in G if G.out_degree(n) == 0}
+    k = 5
+
+    routes = GraphProcessor().k_best_routes(G, roots, targets, weights.get, k, maximize)
+    expected = sorted(
+        _brute_force_routes(G, roots, targets, weights.get),
+        key=lambda r: r[0],
+        reverse=maximize,
+    )
+
+    _check_routes(G, routes, expected, weights.get, k)
+
+
+def test_k_best_routes_ignore_back_edges():
+    G, weights = _random_dag(3)
+    roots = [n for n in G if G.in_degree(n) == 0]
+    targets = {n for n in G if G.out_degree(n) == 0}
+    cyclic = G.copy()
+    cyclic.add_edges_from([(5, 2), (11, 11)])
+    processor = GraphProcessor()
+
+    D = processor.acyclic_view(cyclic)
+    assert nx.is_directed_acyclic_graph(D)
+    routes = processor.k_best_routes(cyclic, roots, targets, weights.get, 3)
+    expected = sorted(
+        _brute_force_routes(D, roots, targets, weights.get),
+        key=lambda r: r[0],
+        reverse=True,
+    )
+    _check_routes(D, routes, expected, weights.get, 3)
+
+
+def _scene_node(mem, sequences, score=0, frames=(0, 9)):
+    return {
+        "mem_offset": mem,
+        "value": {
+            "sequences": sequences,
+            "ptr_frame_start": ["0x0", "0x0", str(frames[0])],
+            "ptr_frame_end": ["0x0", "0x0", str(frames[1])],
+            "lista_hitboxes": [{"hitbox": {"score": score}}] if score else [],
+        },
+    }
+
+
+def test_max_score_routes_match_brute_force():
+    death = GraphProcessor.DEATH_ADDRESS
+    nodes = [
+        _scene_node("0x10", ["0x20", "0x30"], 100),
+        _scene_node("0x20", ["0x40", death], 500),
+        _scene_node("0x30", ["0x40", "0x50"], 200),
+        _scene_node("0x40", ["0x00000000"], 50),
+        _scene_node("0x50", ["0x60"], 300),
+        _scene_node("0x60", ["0x00000000"], 1000),
+    ]
+    processor = GraphProcessor()
+    G, _ = processor.build_graph(nodes)
+    roots = processor.find_roots(G, "0x10")
+
+    def score(m):
+        return processor.node_score(G.nodes[m]["data"])
+
+    leaves = {n for n in G if G.out_degree(n) == 0}
+    expected = sorted(
+        _brute_force_routes(G, roots, leaves, score), key=lambda r: r[0], reverse=True
+    )
+
+    routes = processor.max_score_routes(G, roots, k=3)
+    assert [r["path"] for r in routes] == [p for _, p in expected[:3]]
+    assert [r["value"] for r in routes] == [1600, 650, 350]
+    assert [r["score"] for r in routes] == [1600, 650, 350]
+    assert routes[0]["frames"] == 40
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from zb_analyzer.hash_index import FrameHashIndex
+from zb_analyzer.phash import hamming
+
+
+def flip_bits(rng, h, count):
+    for bit in rng.choice(64, count, replace=False):
+        h ^= 1 << int(bit)
+    return h
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = np.random.default_rng(7)
+    hashes = [int(h) for h in rng.integers(0, 2**63, 5000, dtype=np.int64)]
+    hashes = [h | (int(rng.integers(0, 2)) << 63) for h in hashes]
+    # vecinos de un mismo hash a todas las distancias
+    base = hashes[0]
+    hashes += [flip_bits(rng, base, d % 20) for d in range(200)]
+    return FrameHashIndex(np.array(hashes, dtype=np.uint64))
+
+
+def brute_force(index, h, k, radius):
+    dist = hamming(index.hashes, np.uint64(h))
+    frames = np.flatnonzero(dist <= radius)
+    best = np.argsort(dist[frames], kind="stable")[:k]
+    return [(int(frames[i]), int(frames[i]), int(dist[frames[i]])) for i in best]
+
+
+@pytest.mark.parametrize("radius", [0, 3, 4, 8, 12, 15, 16, 20])
+def test_search_matches_linear_scan(index, radius):
+    rng = np.random.default_rng(radius)
+    base = int(index.hashes[0])
+    for h in (base, flip_bits(rng, base, 2), flip_bits(rng, base, 9)):
+        assert index.search(h, k=1000, radius=radius) == brute_force(
+            index, h, 1000, radius
+        )
+
+
+def test_search_returns_k_closest(index):
+    results = index.search(int(index.hashes[0]), k=5, radius=8)
+    assert len(results) == 5
+    assert results[0][2] == 0
+    assert [d for _, _, d in results] == sorted(d for _, _, d in results)
@@ -0,0 +1,79 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from zb_analyzer.intervals import IntervalSet
+
+
+def _random_intervals(seed, n=80, frames=5000):
+    rng = random.Random(seed)
+    intervals = []
+    for _ in range(n):
+        start = rng.randrange(frames)
+        intervals.append((start, start + rng.choice([0, 1, 5, 40, 300])))
+    intervals += [(10, 5), (None, 3)]  # se descartan
+    return intervals
+
+
+def _covered(intervals):
+    frames = set()
+    for s, e in intervals:
+        if s is not None and e is not None and s <= e:
+            frames.update(range(s, e + 1))
+    return frames
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_coverage_matches_brute_force(seed):
+    intervals = _random_intervals(seed)
+    index = IntervalSet(intervals)
+    covered = _covered(intervals)
+    rng = random.Random(seed + 1000)
+
+    for _ in range(50):
+        lo = rng.randrange(-200, 5500)
+        hi = lo + rng.randrange(0, 3000)
+        buckets = rng.choice([1, 7, 100, 800, 5000])
+
+        result = index.coverage(lo, hi, buckets)
+
+        n = max(1, min(buckets, hi - lo + 1))
+        edges = np.round(np.linspace(lo, hi + 1, n + 1)).astype(int)
+        expected = [
+            sum(f in covered for f in range(a, b)) / max(b - a, 1)
+            for a, b in itertools.pairwise(edges)
+        ]
+        assert len(result) == n
+        np.testing.assert_allclose(result, expected)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_visible_matches_brute_force(seed):
+    intervals = _random_intervals(seed)
+    index = IntervalSet(intervals)
+    valid = [(s, e) for s, e in intervals if s is not None and e is not None and s <= e]
+    rng = random.Random(seed + 2000)
+
+    for _ in range(50):
+        lo = rng.randrange(-200, 5500)
+        hi = lo + rng.randrange(0, 1000)
+
+        starts, ends = index.visible(lo, hi)
+
+        expected = sorted((s, e) for s, e in valid if s <= hi and e >= lo)
+        assert sorted(zip(starts.tolist(), ends.tolist())) == expected
+        assert index.count_visible(lo, hi) >= len(expected)
+
+
+def test_span_and_empty_set():
+    index = IntervalSet([(30, 40), (5, 10), (35, 90)])
+    assert len(index) == 3
+    assert index.span() == (5, 90)
+    np.testing.assert_allclose(index.coverage(0, 19, 4), [0, 1, 0.2, 0])
+
+    empty = IntervalSet()
+    assert empty.span() is None
+    assert empty.coverage(0, 99, 10).tolist() == [0.0] * 10
+    assert empty.visible(0, 99)[0].size == 0
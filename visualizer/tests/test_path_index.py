@@ -0,0 +1,113 @@
+import random
+
+import numpy as np
+import pytest
+
+from zb_analyzer.path_index import BUCKET_FRAMES, PathIndex
+
+
+def _random_paths(seed, n_paths=60, n_nodes=25):
+    rng = random.Random(seed)
+    nodes = []
+    for i in range(n_nodes):
+        start = rng.randrange(0, 20 * BUCKET_FRAMES)
+        nodes.append(
+            {
+                "mem": f"0x{0x4A000 + i * 0x2C:08x}",
+                "frame_start": start,
+                "frame_end": start + rng.randrange(0, 3 * BUCKET_FRAMES),
+                "hitboxes": [{"points": rng.choice([0, 100, 500])}] * rng.randrange(3),
+                "ptr_node_respawn": "0x0004c000" if rng.random() < 0.15 else None,
+                "death": rng.random() < 0.1,
+            }
+        )
+    nodes.append({"mem": "0x0004ffff", "hitboxes": []})  # sin rango de frames
+    # los paths pueden repetir nodos (ciclos)
+    return [
+        {"nodes": [rng.choice(nodes) for _ in range(rng.randrange(1, 8))]}
+        for _ in range(n_paths)
+    ]
+
+
+def _brute_force(
+    paths,
+    mem=None,
+    frame=None,
+    respawn=None,
+    death=None,
+    min_score=None,
+    min_length=None,
+    max_length=None,
+):
+    ids = []
+    for p, path in enumerate(paths):
+        nodes = path["nodes"]
+        score = sum(hb["points"] for n in nodes for hb in n["hitboxes"])
+        if mem and not any(mem in n["mem"] for n in nodes):
+            continue
+        if frame is not None and not any(
+            n.get("frame_start") is not None
+            and n["frame_start"] <= frame <= n["frame_end"]
+            for n in nodes
+        ):
+            continue
+        if (
+            respawn is not None
+            and any(n.get("ptr_node_respawn") for n in nodes) != respawn
+        ):
+            continue
+        if death is not None and any(n.get("death") for n in nodes) != death:
+            continue
+        if min_score is not None and score < min_score:
+            continue
+        if min_length is not None and len(nodes) < min_length:
+            continue
+        if max_length is not None and len(nodes) > max_length:
+            continue
+        ids.append(p)
+    return ids
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_query_matches_brute_force(seed):
+    paths = _random_paths(seed)
+    index = PathIndex(paths)
+    rng = random.Random(seed + 1000)
+    mems = sorted({n["mem"] for path in paths for n in path["nodes"]})
+
+    for _ in range(200):
+        filters = {}
+        if rng.random() < 0.4:
+            mem = rng.choice(mems)
+            filters["mem"] = mem if rng.random() < 0.5 else mem[-3:]
+        if rng.random() < 0.5:
+            filters["frame"] = rng.randrange(-10, 24 * BUCKET_FRAMES)
+        if rng.random() < 0.3:
+            filters["respawn"] = rng.random() < 0.5
+        if rng.random() < 0.3:
+            filters["death"] = rng.random() < 0.5
+        if rng.random() < 0.3:
+            filters["min_score"] = rng.choice([0, 100, 600, 1500])
+        if rng.random() < 0.3:
+            filters["min_length"] = rng.randrange(1, 6)
+        if rng.random() < 0.3:
+            filters["max_length"] = rng.randrange(1, 8)
+
+        result = index.query(**filters)
+        assert result.tolist() == _brute_force(paths, **filters), filters
+
+
+def test_query_unknown_node_and_frame():
+    paths = _random_paths(0)
+    index = PathIndex(paths)
+
+    assert index.query(mem="zzz").size == 0
+    assert index.query(frame=10**9).size == 0
+    assert index.paths_with_node("zzz").size == 0
+    np.testing.assert_array_equal(index.query(), np.arange(len(paths)))
+
+
+def test_empty_index():
+    index = PathIndex([])
+    assert len(index) == 0
+    assert index.query(mem="0x", frame=5, min_score=0).size == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from zb_analyzer import playback_clock
+from zb_analyzer.playback_clock import PlaybackClock
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(playback_clock.time, "perf_counter", fake)
+    return fake
+
+
+def test_due_follows_fps_and_speed(clock_time):
+    clock = PlaybackClock(fps=25, speed=2.0)
+    assert clock.due() == 0  # parado
+    clock.start()
+
+    clock_time.now += 1.0
+    assert clock.due() == 50
+    assert clock.frame_period == pytest.approx(1 / 50)
+
+
+def test_speed_change_keeps_steps_and_fraction(clock_time):
+    clock = PlaybackClock(fps=25)
+    clock.start()
+    clock_time.now += 10.5 / 25  # 10 frames y medio a 1x
+
+    clock.set_speed(0.5)
+    assert clock.due() == 10  # sin saltos al cambiar
+
+    # la media frame que faltaba dura el doble a 0.5x
+    clock_time.now += 0.9 / 25
+    assert clock.due() == 10
+    clock_time.now += 0.2 / 25
+    assert clock.due() == 11
+
+    clock_time.now += 4 / 12.5
+    assert clock.due() == 15
+
+
+def test_speed_up_and_back(clock_time):
+    clock = PlaybackClock(fps=25)
+    clock.start()
+    clock_time.now += 1.0  # 25 frames a 1x
+    clock.set_speed(4.0)
+    clock_time.now += 1.0  # 100 frames a 4x
+    clock.set_speed(1.0)
+    clock_time.now += 1.0  # 25 frames a 1x
+
+    assert clock.due() == 150
+
+
+def test_time_until_uses_current_rate(clock_time):
+    clock = PlaybackClock(fps=25)
+    clock.start()
+    clock_time.now += 0.2  # 5 frames
+    clock.set_speed(2.0)
+
+    assert clock.time_until(5) == 0.0
+    assert clock.time_until(15) == pytest.approx(10 / 50)
+
+
+def test_speed_change_while_stopped(clock_time):
+    clock = PlaybackClock(fps=25)
+    clock.set_speed(2.0)
+    clock.start()
+    clock_time.now += 0.5
+
+    assert clock.due() == 25
+
+
+def test_invalid_fps_falls_back_to_pal(clock_time):
+    assert PlaybackClock(fps=0).fps == PlaybackClock.DEFAULT_FPS
+    clock = PlaybackClock(fps=30)
+    clock.set_fps(float("nan"))
+    assert clock.fps == PlaybackClock.DEFAULT_FPS
@@ -0,0 +1,57 @@
+import numpy as np
+
+from zb_analyzer.shot_detect import ShotSignals, validate
+
+FRAMES = 100
+
+
+def _signals(cuts, seed=0):
+    """señales de poco movimiento con saltos en los cortes"""
+    rng = np.random.default_rng(seed)
+    signals = rng.uniform(0.0, 0.05, (FRAMES, 2)).astype(np.float32)
+    signals[0] = 1.0  # como las escribe _signal_segment: el frame 0 es un corte
+    signals[cuts] = (0.8, 0.5)
+    return ShotSignals(signals)
+
+
+def _node(mem, start, end):
+    return {
+        "mem_offset": mem,
+        "value": {
+            "ptr_frame_start": ["0x0", "0x0", str(start)],
+            "ptr_frame_end": ["0x0", "0x0", str(end)],
+        },
+    }
+
+
+def test_cuts_include_first_frame():
+    assert _signals([40, 70]).cuts().tolist() == [0, 40, 70]
+
+
+def test_cuts_right_after_first_frame():
+    # el relleno de la mediana local no debe repetir la señal del frame 0
+    assert _signals([1, 3, 50]).cuts().tolist() == [0, 1, 3, 50]
+
+
+def test_motion_is_not_a_cut():
+    signals = _signals([60])
+    signals.signals[20:50] = (0.35, 0.15)  # movimiento sostenido sobre el umbral
+    assert signals.cuts().tolist() == [0, 60]
+
+
+def test_node_starting_at_frame_zero_is_valid():
+    data = {
+        "chunks": [
+            {
+                "id": 1,
+                "nodes": [_node("0x10", 0, 39), _node("0x20", 40, 69)],
+            }
+        ]
+    }
+    rows = validate(data, _signals([40, 70]), window=2)
+
+    assert [(r["start_status"], r["end_status"]) for r in rows] == [
+        ("ok", "ok"),
+        ("ok", "ok"),
+    ]
+    assert not any(r["mismatch"] for r in rows)
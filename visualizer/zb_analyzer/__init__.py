@@ -1,15 +1,43 @@
-from .frame_buttons import FrameButtonManager
-from .hitbox_controls import HitboxControlsPanel
-from .hitbox_manager import HitboxManager
-from .playback_controls import PlaybackControls
-from .scene_loader import SceneDataLoader
-from .video_player import VideoPlayer
-
-__all__ = [
-    "VideoPlayer",
-    "SceneDataLoader",
-    "HitboxControlsPanel",
-    "HitboxManager",
-    "FrameButtonManager",
-    "PlaybackControls",
-]
+"""
+Los módulos se importan al pedir el nombre (PEP 562): importar el paquete
+o uno de sus submódulos no carga cv2, networkx ni todo PySide6.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "VideoPlayer": ".video_player",
+    "SceneDataLoader": ".scene_loader",
+    "GameGraph": ".game_graph",
+    "SceneProgram": ".game_engine",
+    "GraphLayoutCache": ".graph_layout",
+    "SceneGraphPanel": ".graph_view",
+    "HitboxControlsPanel": ".hitbox_controls",
+    "HitboxManager": ".hitbox_manager",
+    "HitboxListModel": ".list_models",
+    "PathListModel": ".list_models",
+    "NodeListModel": ".list_models",
+    "FrameButtonManager": ".frame_buttons",
+    "PlaybackControls": ".playback_controls",
+    "PathIndex": ".path_index",
+    "PathSearchPanel": ".path_search",
+    "IntervalSet": ".intervals",
+    "TimelineWidget": ".timeline",
+    "SceneLoadWorker": ".startup",
+    "StartupProfile": ".startup",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # las siguientes veces no pasa por aquí
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,391 @@
+"""
+Calibración frame del laserdisc -> frame del vídeo.
+
+Cada copia del laserdisc (AVI, volcado CAV PAL...) puede estar desplazada
+o tener campos perdidos o duplicados, así que el número de frame del JSON
+no siempre es el índice del frame en el vídeo. La calibración es una tabla
+por tramos (desde el frame N del laserdisc, desplazamiento D) que se
+guarda junto al vídeo y se expande a un array para convertir en O(1).
+
+También guarda la transformación de los hitboxes (ver hitbox_calibration).
+
+La detección automática toma una muestra de los límites de nodos del JSON
+y busca alrededor de cada uno el desplazamiento que mejor lo explica:
+  - con un vídeo de referencia ya alineado, el que minimiza la distancia
+    entre los dHash de la referencia y los del vídeo;
+  - sin referencia, el que hace coincidir el límite con un corte de plano
+    (salto grande de dHash entre dos frames consecutivos).
+Los desplazamientos de cada muestra se filtran con una mediana y se
+agrupan en tramos.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .graph_processor import GraphProcessor
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+class Calibration:
+    """Tabla por tramos frame del laserdisc -> frame del vídeo"""
+
+    SUFFIX = ".calib.json"
+    VERSION = 1
+
+    def __init__(self, segments=None, source=None, meta=None):
+        # [(primer frame del laserdisc, desplazamiento)] ordenados
+        self.segments = sorted(segments or [(0, 0)])
+        self.source = source or {}
+        self.meta = meta or {}
+        self._build_table()
+
+    def _build_table(self):
+        """expande los tramos a un array denso para convertir en O(1)"""
+        starts = [s for s, _ in self.segments]
+        end = max(starts[-1] + 1, 1)
+        self.table = np.arange(end, dtype=np.int64)
+        for i, (start, offset) in enumerate(self.segments):
+            stop = starts[i + 1] if i + 1 < len(starts) else end
+            self.table[max(start, 0) : stop] += offset
+        self._first_offset = self.segments[0][1]
+        self._last_offset = self.segments[-1][1]
+
+    @property
+    def is_identity(self):
+        return all(offset == 0 for _, offset in self.segments)
+
+    def to_video(self, ld_frame):
+        """frame del vídeo para un frame del laserdisc"""
+        if 0 <= ld_frame < len(self.table):
+            return int(self.table[ld_frame])
+        offset = self._first_offset if ld_frame < 0 else self._last_offset
+        return ld_frame + offset
+
+    def to_laserdisc(self, video_frame):
+        """frame del laserdisc que muestra un frame del vídeo (inversa por tramos)"""
+        for i in range(len(self.segments) - 1, -1, -1):
+            start, offset = self.segments[i]
+            if i == 0 or video_frame - offset >= start:
+                return video_frame - offset
+        return video_frame
+
+    @property
+    def hitbox(self):
+        """transformación de los hitboxes (dx, dy, scale) para todo el vídeo"""
+        return self.meta.get("hitbox", {"dx": 0, "dy": 0, "scale": 1.0})
+
+    @hitbox.setter
+    def hitbox(self, transform):
+        self.meta["hitbox"] = transform
+
+    def hitbox_transform(self, scene=None):
+        """transformación de los hitboxes de una escena, o la del vídeo si no tiene"""
+        transform = self.hitbox
+        if scene is not None:
+            transform = transform.get("scenes", {}).get(str(scene), transform)
+        return transform["dx"], transform["dy"], transform["scale"]
+
+    def digest(self):
+        """identifica la tabla (para invalidar lo extraído con otra calibración)"""
+        return hashlib.sha1(json.dumps(self.segments).encode()).hexdigest()[:12]
+
+    @classmethod
+    def path_for(cls, video_path):
+        video_path = Path(video_path)
+        return video_path.with_name(video_path.name + cls.SUFFIX)
+
+    def save(self, path):
+        data = {
+            "version": self.VERSION,
+            "source": self.source,
+            "segments": [list(s) for s in self.segments],
+            **self.meta,
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"Error al guardar la calibración: {e}")
+
+    @classmethod
+    def load(cls, path, source=None):
+        """Carga la calibración; None si no existe o es de otra versión del vídeo"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if data.get("version") != cls.VERSION:
+            return None
+        if source is not None and data.get("source") != source:
+            return None
+
+        meta = {
+            k: v for k, v in data.items() if k not in ("version", "source", "segments")
+        }
+        return cls([tuple(s) for s in data["segments"]], data["source"], meta)
+
+    @classmethod
+    def for_video(cls, video_path):
+        """Calibración guardada del vídeo o identidad si no hay"""
+        calibration = cls.load(cls.path_for(video_path), _source_info(video_path))
+        return calibration if calibration is not None else cls()
+
+
+# detección automática
+
+
+def boundary_frames(data):
+    """
+    Frames del laserdisc donde empieza un plano según los nodos: el inicio
+    de cada nodo y el frame siguiente a su final.
+    """
+    processor = GraphProcessor()
+    nodes = [n for chunk in data.get("chunks", []) for n in chunk.get("nodes", [])]
+    nodes += data.get("spare_chunks", [])
+
+    frames = set()
+    for n in nodes:
+        v = n.get("value", {})
+        start = processor.frame_val(v.get("ptr_frame_start"))
+        end = processor.frame_val(v.get("ptr_frame_end"))
+        if start is not None:
+            frames.add(start)
+        if end is not None:
+            frames.add(end + 1)
+    return sorted(frames)
+
+
+def _hash_windows(job):
+    """
+    dHash de los frames de vídeo alrededor de cada posición (proceso del pool).
+    Devuelve (S, 2*window + 2): frames p - window - 1 .. p + window.
+    """
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+    from .phash import dhash_batch
+
+    video_path, positions, window = job
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+    width = 2 * window + 2
+    hashes = np.zeros((len(positions), width), dtype=np.uint64)
+    valid = np.zeros((len(positions), width), dtype=bool)
+
+    try:
+        for i, p in enumerate(positions):
+            first = p - window - 1
+            frames = []
+            for frame_number in range(max(first, 0), first + width):
+                frame = accessor.read(frame_number)
+                if frame is None:
+                    break
+                frames.append(frame)
+            lo = max(first, 0) - first
+            hashes[i, lo : lo + len(frames)] = dhash_batch(frames)
+            valid[i, lo : lo + len(frames)] = True
+    finally:
+        cap.release()
+
+    return hashes, valid
+
+
+def _hash_all(video_path, positions, window, workers):
+    """dHash de las ventanas de todas las posiciones, repartidas por procesos"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .frame_access import KeyframeIndex
+
+    KeyframeIndex.for_video(video_path)  # una vez, antes de repartir
+
+    workers = workers or os.cpu_count()
+    batches = np.array_split(np.asarray(positions), workers)
+    jobs = [(str(video_path), b.tolist(), window) for b in batches if len(b)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_hash_windows, jobs))
+    return (
+        np.concatenate([h for h, _ in results]),
+        np.concatenate([v for _, v in results]),
+    )
+
+
+def _cut_offsets(hashes, valid, window, min_bits):
+    """
+    Sin referencia: desplazamiento que pone un corte de plano en cada límite.
+
+    Returns:
+        (offsets, confident) arrays (S,)
+    """
+    from .phash import hamming
+
+    # cut[s, j] = distancia entre los frames j y j+1 de la ventana; el frame
+    # j+1 es p + (j - window) -> desplazamiento d = j - window
+    cut = hamming(hashes[:, 1:], hashes[:, :-1]).astype(np.int32)
+    cut[~(valid[:, 1:] & valid[:, :-1])] = 0
+
+    order = np.sort(cut, axis=1)
+    best = cut.argmax(axis=1)
+    strongest = order[:, -1]
+    second = order[:, -2]
+    # un corte claro: suficientes bits y claramente por encima del resto
+    confident = (strongest >= min_bits) & (strongest >= 2 * np.maximum(second, 1))
+    return best - window, confident
+
+
+def _reference_offsets(hashes, valid, ref_hashes, ref_valid, window, max_bits):
+    """
+    Con referencia: desplazamiento que minimiza la distancia a los frames
+    p-1, p, p+1 de la referencia.
+    """
+    from .phash import hamming
+
+    span = hashes.shape[1] - 2  # desplazamientos posibles: 2*window + 1
+    dist = np.zeros((len(hashes), span), dtype=np.int32)
+    ok = np.ones((len(hashes), span), dtype=bool)
+    for k in range(3):
+        # frame p - 1 + k de la referencia contra p - 1 + k + d del vídeo
+        dist += hamming(hashes[:, k : k + span], ref_hashes[:, k : k + 1])
+        ok &= valid[:, k : k + span] & ref_valid[:, k : k + 1]
+    dist[~ok] = np.iinfo(np.int32).max
+
+    order = np.sort(dist, axis=1)
+    best = dist.argmin(axis=1)
+    confident = (order[:, 0] <= 3 * max_bits) & (order[:, 1] > order[:, 0])
+    return best - window, confident
+
+
+def _segments_from_samples(positions, offsets, min_run):
+    """
+    Tramos a partir de los desplazamientos de cada muestra: mediana móvil
+    para descartar muestras sueltas y un tramo nuevo solo cuando el cambio
+    se mantiene min_run muestras.
+    """
+    if len(offsets) == 0:
+        return [(0, 0)]
+
+    k = min_run if min_run % 2 else min_run + 1
+    padded = np.pad(offsets, k // 2, mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, k)
+    smooth = np.median(windows, axis=1).astype(np.int64)
+
+    # tramos de valor constante con apoyo suficiente, el primero desde 0
+    segments = []
+    run_start = 0
+    for i in range(1, len(smooth) + 1):
+        if i < len(smooth) and smooth[i] == smooth[run_start]:
+            continue
+        value = int(smooth[run_start])
+        if i - run_start >= min_run and (not segments or value != segments[-1][1]):
+            start = int(positions[run_start]) if segments else 0
+            segments.append((start, value))
+        run_start = i
+    return segments or [(0, int(np.median(offsets)))]
+
+
+def detect(
+    video_path,
+    json_paths,
+    reference_path=None,
+    samples=400,
+    window=12,
+    workers=None,
+    min_run=3,
+):
+    """
+    Detecta la calibración del vídeo a partir de los límites de nodos.
+
+    Args:
+        video_path: vídeo a calibrar
+        json_paths: JSON de escenas de los que sacar los límites
+        reference_path: vídeo ya alineado con el laserdisc (opcional)
+        samples: número máximo de límites a muestrear
+        window: desplazamiento máximo buscado (en frames, a cada lado)
+        workers: procesos del pool
+        min_run: muestras seguidas necesarias para aceptar un tramo
+
+    Returns:
+        Calibration
+    """
+    boundaries = []
+    for json_path in json_paths:
+        with open(json_path, encoding="utf-8") as f:
+            boundaries += boundary_frames(json.load(f))
+    boundaries = sorted({b for b in boundaries if b > window})
+    if len(boundaries) > samples:
+        picks = np.linspace(0, len(boundaries) - 1, samples).round().astype(int)
+        boundaries = [boundaries[i] for i in np.unique(picks)]
+    positions = np.asarray(boundaries, dtype=np.int64)
+
+    hashes, valid = _hash_all(video_path, positions, window, workers)
+    if reference_path:
+        # de la referencia solo hacen falta p-1, p, p+1
+        ref_hashes, ref_valid = _hash_all(reference_path, positions, 1, workers)
+        offsets, confident = _reference_offsets(
+            hashes, valid, ref_hashes[:, 1:], ref_valid[:, 1:], window, max_bits=10
+        )
+        method = "reference"
+    else:
+        offsets, confident = _cut_offsets(hashes, valid, window, min_bits=16)
+        method = "cuts"
+
+    segments = _segments_from_samples(positions[confident], offsets[confident], min_run)
+    meta = {
+        "method": method,
+        "samples": len(positions),
+        "confident_samples": int(confident.sum()),
+        "window": window,
+    }
+    if reference_path:
+        meta["reference"] = str(reference_path)
+    return Calibration(segments, _source_info(video_path), meta)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Detecta la correspondencia frame del laserdisc -> frame del vídeo"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", nargs="+", help="JSON de escenas")
+    parser.add_argument("-r", "--reference", help="vídeo de referencia ya alineado")
+    parser.add_argument("-n", "--samples", type=int, default=400)
+    parser.add_argument(
+        "-w", "--window", type=int, default=12, help="desplazamiento máximo buscado"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    calibration = detect(
+        args.video,
+        args.json,
+        args.reference,
+        args.samples,
+        args.window,
+        args.workers,
+    )
+    calibration.save(Calibration.path_for(args.video))
+
+    meta = calibration.meta
+    print(
+        f"{meta['confident_samples']}/{meta['samples']} muestras fiables "
+        f"({meta['method']}), {time.perf_counter() - t0:.1f}s"
+    )
+    for start, offset in calibration.segments:
+        print(f"  desde el frame {start}: {offset:+d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Exportación a vídeo de paths completos con los hitboxes dibujados.
+
+Cada nodo del path es un segmento (su rango de frames del laserdisc). Los
+segmentos se reparten entre procesos: cada uno decodifica su rango de forma
+secuencial, dibuja los hitboxes activos en cada frame (con los colores del
+visualizador y la transformación calibrada) y lo escribe frame a frame en un
+fichero temporal FFV1 (sin pérdida). El proceso principal va uniendo los
+segmentos en orden en cuanto están listos, así que la memoria usada no
+depende de la longitud del path.
+
+Un mismo nodo aparece en muchos paths de una escena: al exportar varios
+paths a la vez cada segmento distinto se renderiza una sola vez.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from .calibration import Calibration
+from .colors import hitbox_bgr
+
+SEGMENT_CODEC = "FFV1"
+OUTPUT_CODEC = "mp4v"
+AMIGA_SIZE = (320, 256)
+LINE_WIDTH = 3
+
+
+def _segment_key(node, transform):
+    """identifica segmentos iguales (mismo rango, mismos hitboxes)"""
+    boxes = tuple(
+        (
+            hb["x0"],
+            hb["y0"],
+            hb["x1"],
+            hb["y1"],
+            hb.get("frame_start"),
+            hb.get("frame_end"),
+        )
+        for hb in node.get("hitboxes", [])
+    )
+    return (node["frame_start"], node["frame_end"], boxes, tuple(transform))
+
+
+def scaled_boxes(hitboxes, transform, size):
+    """hitboxes transformados y escalados a píxeles de salida, con su color"""
+    dx, dy, s = transform
+    sx, sy = size[0] / AMIGA_SIZE[0], size[1] / AMIGA_SIZE[1]
+    cx, cy = AMIGA_SIZE[0] / 2, AMIGA_SIZE[1] / 2
+    boxes = []
+    for i, hb in enumerate(hitboxes):
+        # misma transformación que HitboxManager.apply_offset
+        x0 = round(cx + (hb["x0"] - cx) * s) + dx
+        y0 = round(cy + (hb["y0"] - cy) * s) + dy
+        x1 = round(cx + (hb["x1"] - cx) * s) + dx
+        y1 = round(cy + (hb["y1"] - cy) * s) + dy
+        boxes.append(
+            (
+                (int(x0 * sx), int(y0 * sy)),
+                (int(x1 * sx), int(y1 * sy)),
+                hitbox_bgr(i),
+                hb.get("frame_start"),
+                hb.get("frame_end"),
+            )
+        )
+    return boxes
+
+
+def _render_segment(job):
+    """decodifica, dibuja y codifica un segmento (proceso del pool)"""
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, out_path, start, end, hitboxes, transform, size, fps = job
+    calibration = Calibration.for_video(video_path)
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+    writer = cv2.VideoWriter(
+        str(out_path), cv2.VideoWriter_fourcc(*SEGMENT_CODEC), fps, size
+    )
+    boxes = scaled_boxes(hitboxes, transform, size)
+
+    written = 0
+    try:
+        for ld_frame in range(start, end + 1):
+            frame = accessor.read(calibration.to_video(ld_frame))
+            if frame is None:
+                break
+            if (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            for p0, p1, color, hb_start, hb_end in boxes:
+                # sin ventana de frames el hitbox se dibuja en todo el nodo
+                if (hb_start is None or hb_start <= ld_frame) and (
+                    hb_end is None or ld_frame <= hb_end
+                ):
+                    cv2.rectangle(frame, p0, p1, color, LINE_WIDTH)
+            writer.write(frame)
+            written += 1
+    finally:
+        writer.release()
+        cap.release()
+    return written
+
+
+def _append_segment(writer, segment_path):
+    """copia un segmento ya renderizado al final del vídeo de salida"""
+    import cv2
+
+    cap = cv2.VideoCapture(str(segment_path))
+    count = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            writer.write(frame)
+            count += 1
+    finally:
+        cap.release()
+    return count
+
+
+def export_paths(
+    video_path, exports, workers=None, size=None, fps=None, codec=OUTPUT_CODEC
+):
+    """
+    Exporta paths a ficheros de vídeo.
+
+    Args:
+        video_path: vídeo del laserdisc
+        exports: lista de (fichero de salida, path de graph_paths, id de escena)
+        workers: procesos del pool (por defecto uno por núcleo)
+        size: (ancho, alto) de salida (por defecto el del vídeo)
+        fps: fps de salida (por defecto los del vídeo)
+        codec: fourcc del vídeo de salida
+
+    Returns:
+        lista de (fichero de salida, frames escritos)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    import cv2
+
+    from .frame_access import KeyframeIndex
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"Error: no se pudo abrir {video_path}")
+        return []
+    size = (
+        tuple(size)
+        if size
+        else (
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+    )
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 25.0
+    cap.release()
+
+    # el índice se construye una vez aquí en vez de en cada proceso
+    KeyframeIndex.for_video(video_path)
+    calibration = Calibration.for_video(video_path)
+
+    first_output = Path(exports[0][0]) if exports else Path(".")
+    first_output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".segments-", dir=first_output.parent))
+
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            # todos los segmentos distintos se lanzan a la vez y cada salida
+            # se une en orden según van terminando
+            futures = {}
+            pending = {}  # usos que faltan de cada segmento
+            plans = []
+            for output, path, scene_id in exports:
+                transform = calibration.hitbox_transform(scene_id)
+                plan = []
+                for node in path.get("nodes", []):
+                    if node["frame_end"] < node["frame_start"]:
+                        continue
+                    key = _segment_key(node, transform)
+                    if key not in futures:
+                        seg_path = tmp_dir / f"seg_{len(futures):05d}.avi"
+                        job = (
+                            str(video_path),
+                            str(seg_path),
+                            node["frame_start"],
+                            node["frame_end"],
+                            node.get("hitboxes", []),
+                            transform,
+                            size,
+                            fps,
+                        )
+                        futures[key] = (seg_path, pool.submit(_render_segment, job))
+                    plan.append((key, *futures[key]))
+                    pending[key] = pending.get(key, 0) + 1
+                plans.append((output, plan))
+
+            for output, plan in plans:
+                Path(output).parent.mkdir(parents=True, exist_ok=True)
+                writer = cv2.VideoWriter(
+                    str(output), cv2.VideoWriter_fourcc(*codec), fps, size
+                )
+                frames = 0
+                try:
+                    for key, seg_path, future in plan:
+                        if future.result():
+                            frames += _append_segment(writer, seg_path)
+                        pending[key] -= 1
+                        if not pending[key]:
+                            seg_path.unlink(missing_ok=True)
+                finally:
+                    writer.release()
+                results.append((str(output), frames))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return results
+
+
+def main():
+    import argparse
+    import sys
+    import time
+
+    from .scene_loader import SceneDataLoader
+
+    parser = argparse.ArgumentParser(
+        description="Exporta paths de una escena a vídeo con los hitboxes dibujados"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", help="JSON de escenas")
+    parser.add_argument(
+        "-s", "--scene", type=int, required=True, help="número de escena (1 = primera)"
+    )
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "-p", "--path", type=int, nargs="+", help="números de path (1 = primero)"
+    )
+    group.add_argument("--all", action="store_true", help="todos los paths")
+    group.add_argument(
+        "--best", action="store_true", help="la ruta con más puntos (por defecto)"
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="fichero (un path) o directorio"
+    )
+    parser.add_argument("--size", type=int, nargs=2, metavar=("ANCHO", "ALTO"))
+    parser.add_argument("--fps", type=float)
+    parser.add_argument("--codec", default=OUTPUT_CODEC)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    loader = SceneDataLoader(args.json)
+    scenes = loader.load_scenes()
+    scene_index = args.scene - 1
+    if not 0 <= scene_index < len(scenes):
+        print(f"Error: la escena debe estar entre 1 y {len(scenes)}", file=sys.stderr)
+        sys.exit(1)
+    scene_id = scenes[scene_index].get("id")
+    paths = loader.get_paths(scene_index)
+
+    if args.all:
+        selected = [(f"path{i + 1:03d}", p) for i, p in enumerate(paths)]
+    elif args.path:
+        if any(not 1 <= n <= len(paths) for n in args.path):
+            print(
+                f"Error: los paths deben estar entre 1 y {len(paths)}", file=sys.stderr
+            )
+            sys.exit(1)
+        selected = [(f"path{n:03d}", paths[n - 1]) for n in args.path]
+    else:
+        best = loader.get_best_route(scene_index)
+        selected = [("mejor_ruta", best)] if best else []
+
+    if not selected:
+        print("No hay paths que exportar")
+        return
+
+    output = Path(args.output)
+    if len(selected) == 1 and output.suffix:
+        exports = [(output, selected[0][1], scene_id)]
+    else:
+        exports = [
+            (output / f"escena{args.scene:02d}_{name}.mp4", path, scene_id)
+            for name, path in selected
+        ]
+
+    t0 = time.perf_counter()
+    results = export_paths(
+        args.video,
+        exports,
+        args.workers,
+        args.size,
+        args.fps,
+        args.codec,
+    )
+    total = sum(frames for _, frames in results)
+    for file_name, frames in results:
+        print(f"{file_name}: {frames} frames")
+    print(
+        f"{len(results)} vídeos, {total} frames en {time.perf_counter() - t0:.1f}s "
+        f"con {args.workers} procesos"
+    )
+
+
+if __name__ == "__main__":
+    main()
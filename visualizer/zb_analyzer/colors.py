@@ -0,0 +1,28 @@
+"""
+Colores de los hitboxes (RGB), compartidos por el visualizador y las
+exportaciones de vídeo (que no cargan Qt).
+"""
+
+HITBOX_RGB = [
+    (255, 0, 0),  # Rojo
+    (0, 255, 0),  # Verde
+    (0, 100, 255),  # Azul
+    (255, 255, 0),  # Amarillo
+    (255, 0, 255),  # Magenta
+    (0, 255, 255),  # Cian
+    (255, 128, 0),  # Naranja
+    (128, 0, 255),  # Púrpura
+    (255, 192, 203),  # Rosa
+    (0, 255, 128),  # Verde menta
+    (255, 64, 64),  # Rojo claro
+    (64, 255, 64),  # Verde claro
+    (64, 64, 255),  # Azul claro
+    (255, 215, 0),  # Dorado
+    (255, 99, 71),  # Tomate
+]
+
+
+def hitbox_bgr(index):
+    """color del hitbox en BGR (OpenCV)"""
+    r, g, b = HITBOX_RGB[index % len(HITBOX_RGB)]
+    return (b, g, r)
@@ -26,6 +26,8 @@ class ConfigManager:
             "last_json_path": "",
             "last_video_directory": str(Path.home()),
             "last_json_directory": str(Path.home()),
+            "frame_cache_mb": 256,
+            "loop_cache_mb": 512,
         }
 
     def save_config(self):
@@ -47,6 +49,12 @@ class ConfigManager:
     def get_last_json_directory(self):
         return self.config.get("last_json_directory", str(Path.home()))
 
+    def get_frame_cache_bytes(self):
+        return int(self.config.get("frame_cache_mb", 256)) * 1024 * 1024
+
+    def get_loop_cache_bytes(self):
+        return int(self.config.get("loop_cache_mb", 512)) * 1024 * 1024
+
     def set_last_video_path(self, path):
         self.config["last_video_path"] = path
         if path:
@@ -0,0 +1,284 @@
+"""
+Hojas de contactos de todos los nodos, con los hitboxes dibujados.
+
+Para cada nodo de cada escena (y de spare_chunks) se muestran en una fila
+sus frames inicial, de inicio de hitboxes, de fin de hitboxes y final, con
+las cajas dibujadas en los que están dentro de la ventana de hitboxes. Cada
+escena es una hoja (o varias páginas si tiene muchos nodos) y cada hoja es
+una tarea del pool: decodifica solo los frames que necesita, ordenados por
+número de frame para que los seeks vayan siempre hacia delante.
+
+No usa Qt, así que funciona sin pantalla. Junto a las hojas se guarda un
+índice con un hash de las entradas de cada una (nodos, vídeo, calibración)
+y las hojas que no han cambiado no se vuelven a generar.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .calibration import Calibration
+from .clip_export import scaled_boxes
+from .graph_processor import GraphProcessor
+
+VERSION = 1
+INDEX_FILE = "contact_sheets.json"
+THUMB_SIZE = (240, 192)
+ROWS_PER_SHEET = 30
+GAP = 4
+LABEL_HEIGHT = 20
+COLUMNS = ("inicio", "hitbox inicio", "hitbox fin", "fin")
+BACKGROUND = (32, 32, 32)
+TEXT_COLOR = (230, 230, 230)
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def _node_row(node):
+    """(etiqueta, 4 frames, hitboxes) de un nodo o None si no tiene frames"""
+    processor = GraphProcessor()
+    v = node.get("value", {})
+    start = processor.frame_val(v.get("ptr_frame_start"))
+    end = processor.frame_val(v.get("ptr_frame_end"))
+    if start is None or end is None:
+        return None
+    hb_start = processor.frame_val(v.get("ptr_frame_hitbox_start"))
+    hb_end = processor.frame_val(v.get("ptr_frame_hitbox_end"))
+
+    hitboxes = [
+        {
+            "x0": h.get("x0", 0),
+            "y0": h.get("y0", 0),
+            "x1": h.get("x1", 0),
+            "y1": h.get("y1", 0),
+            "frame_start": hb_start,
+            "frame_end": hb_end,
+        }
+        for h in (item.get("hitbox", {}) for item in v.get("lista_hitboxes", []))
+        if h
+    ]
+    label = f"{node.get('mem_offset', '?')}  {start}-{end}"
+    if hb_start is not None and hb_end is not None:
+        label += f"  hitboxes {hb_start}-{hb_end} ({len(hitboxes)})"
+    frames = [start, hb_start, hb_end, end]
+    return label, frames, hitboxes
+
+
+def collect_sheets(data, rows_per_sheet=ROWS_PER_SHEET):
+    """
+    Hojas a generar a partir del JSON de escenas.
+
+    Returns:
+        lista de (nombre, título, id de escena, filas)
+    """
+    groups = [
+        (
+            f"escena_{chunk.get('id', i)}",
+            f"Escena #{chunk.get('id', i)}",
+            chunk.get("id", i),
+            chunk["nodes"],
+        )
+        for i, chunk in enumerate(data.get("chunks", []))
+        if chunk.get("nodes")
+    ]
+    if data.get("spare_chunks"):
+        groups.append(("spare", "spare_chunks", None, data["spare_chunks"]))
+
+    sheets = []
+    for name, title, scene, nodes in groups:
+        rows = [row for row in map(_node_row, nodes) if row is not None]
+        pages = max(1, -(-len(rows) // rows_per_sheet))
+        for p in range(pages):
+            page_rows = rows[p * rows_per_sheet : (p + 1) * rows_per_sheet]
+            if pages > 1:
+                name_page = f"{name}_p{p + 1}"
+                sheets.append(
+                    (name_page, f"{title} ({p + 1}/{pages})", scene, page_rows)
+                )
+            else:
+                sheets.append((name, title, scene, page_rows))
+    return sheets
+
+
+def _sheet_digest(rows, context):
+    """hash de todo lo que influye en la imagen de una hoja"""
+    payload = json.dumps([VERSION, context, rows], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _render_sheet(job):
+    """decodifica los frames de una hoja y la compone (proceso del pool)"""
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+    from .frame_store import FrameStore
+
+    video_path, out_path, title, rows, transform, thumb_size = job
+    calibration = Calibration.for_video(video_path)
+    store = FrameStore.open(video_path, calibration)
+    tw, th = thumb_size
+
+    # frames distintos de toda la hoja, en orden de vídeo
+    wanted = sorted(
+        {f for _, frames, _ in rows for f in frames if f is not None},
+        key=calibration.to_video,
+    )
+    thumbs = {}
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+    try:
+        for ld_frame in wanted:
+            frame = store.get(ld_frame) if store is not None else None
+            if frame is None:
+                frame = accessor.read(calibration.to_video(ld_frame))
+            if frame is not None:
+                # solo se guarda la miniatura: la memoria no depende del vídeo
+                thumbs[ld_frame] = cv2.resize(
+                    frame, thumb_size, interpolation=cv2.INTER_AREA
+                )
+    finally:
+        cap.release()
+
+    width = GAP + len(COLUMNS) * (tw + GAP)
+    row_height = LABEL_HEIGHT + th + GAP
+    height = LABEL_HEIGHT * 2 + len(rows) * row_height
+    sheet = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.putText(sheet, title, (GAP, LABEL_HEIGHT - 5), font, 0.5, TEXT_COLOR, 1)
+    for c, name in enumerate(COLUMNS):
+        x = GAP + c * (tw + GAP)
+        cv2.putText(sheet, name, (x, 2 * LABEL_HEIGHT - 5), font, 0.45, TEXT_COLOR, 1)
+
+    for r, (label, frames, hitboxes) in enumerate(rows):
+        y = LABEL_HEIGHT * 2 + r * row_height
+        cv2.putText(
+            sheet, label, (GAP, y + LABEL_HEIGHT - 6), font, 0.45, TEXT_COLOR, 1
+        )
+        boxes = scaled_boxes(hitboxes, transform, thumb_size)
+        for c, ld_frame in enumerate(frames):
+            thumb = thumbs.get(ld_frame)
+            if thumb is None:
+                continue
+            thumb = thumb.copy()
+            for p0, p1, color, hb_start, hb_end in boxes:
+                if (hb_start is None or hb_start <= ld_frame) and (
+                    hb_end is None or ld_frame <= hb_end
+                ):
+                    cv2.rectangle(thumb, p0, p1, color, 1)
+            cv2.putText(thumb, str(ld_frame), (4, th - 6), font, 0.45, TEXT_COLOR, 1)
+            x = GAP + c * (tw + GAP)
+            sheet[y + LABEL_HEIGHT : y + LABEL_HEIGHT + th, x : x + tw] = thumb
+
+    cv2.imwrite(str(out_path), sheet)
+    return len(thumbs)
+
+
+def generate(
+    video_path, json_path, out_dir, workers=None, force=False, thumb_size=THUMB_SIZE
+):
+    """
+    Genera las hojas de contactos que hayan cambiado.
+
+    Args:
+        video_path: vídeo del laserdisc
+        json_path: JSON de escenas
+        out_dir: directorio de las hojas (PNG) y su índice
+        workers: procesos del pool (por defecto uno por núcleo)
+        force: regenerar todas aunque no hayan cambiado
+        thumb_size: (ancho, alto) de cada miniatura
+
+    Returns:
+        (hojas generadas, hojas sin cambios)
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    from .frame_access import KeyframeIndex
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / INDEX_FILE
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except OSError, json.JSONDecodeError:
+        index = {}
+
+    with open(json_path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    calibration = Calibration.for_video(video_path)
+    context = {
+        "source": _source_info(video_path),
+        "calibration": calibration.digest(),
+        "thumb_size": list(thumb_size),
+    }
+
+    jobs = []
+    skipped = 0
+    for name, title, scene, rows in collect_sheets(data):
+        transform = calibration.hitbox_transform(scene)
+        digest = _sheet_digest(rows, {**context, "hitbox": list(transform)})
+        out_path = out_dir / f"{name}.png"
+        if not force and index.get(name) == digest and out_path.exists():
+            skipped += 1
+            continue
+        job = (str(video_path), str(out_path), title, rows, transform, thumb_size)
+        jobs.append((name, digest, job))
+
+    if not jobs:
+        return 0, skipped
+
+    KeyframeIndex.for_video(video_path)
+    # las hojas con más frames primero para repartir mejor la carga
+    jobs.sort(key=lambda j: -len(j[2][3]))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(_render_sheet, job): (name, digest)
+            for name, digest, job in jobs
+        }
+        for future in as_completed(futures):
+            name, digest = futures[future]
+            future.result()
+            index[name] = digest
+            # se guarda tras cada hoja: si se interrumpe, lo hecho no se repite
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+
+    return len(jobs), skipped
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Hojas de contactos de todos los nodos con sus hitboxes"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", help="JSON de escenas")
+    parser.add_argument("-o", "--output", default="contact_sheets", help="directorio")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="regenerar todas")
+    parser.add_argument(
+        "--thumb", type=int, nargs=2, default=THUMB_SIZE, metavar=("ANCHO", "ALTO")
+    )
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    done, skipped = generate(
+        args.video, args.json, args.output, args.workers, args.force, tuple(args.thumb)
+    )
+    print(
+        f"{done} hojas generadas, {skipped} sin cambios en "
+        f"{time.perf_counter() - t0:.1f}s con {args.workers} procesos"
+    )
+
+
+if __name__ == "__main__":
+    main()
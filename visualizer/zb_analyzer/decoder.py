@@ -0,0 +1,348 @@
+"""
+Hilo decodificador de vídeo.
+
+El hilo es el único dueño del VideoCapture. Decodifica por delante del
+cabezal de reproducción y deja los frames en un buffer circular acotado;
+el hilo de la GUI solo recoge frames ya listos. Los seeks, el play/pause y
+los límites del loop se le comunican por una pequeña cola de comandos.
+
+Los loops que caben en el presupuesto de memoria se decodifican una sola
+vez en un array contiguo (LoopBuffer) y se reproducen desde RAM sin seeks.
+Si hay un FrameStore extraído, sus frames se sirven desde el mmap sin
+decodificar. Con el proxy activo se lee del vídeo reducido en lugar del
+original.
+
+Los números de frame de esta API son del laserdisc; la calibración los
+convierte a frames del vídeo solo al decodificar.
+"""
+
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .calibration import Calibration
+from .frame_access import FrameAccessor, KeyframeIndex
+from .frame_cache import FrameCache
+from .perf_stats import DECODE, PerfStats
+
+
+class LoopBuffer:
+    """Frames de un loop decodificados una vez en un array contiguo"""
+
+    def __init__(self, start, end, frame_shape):
+        self.start = start
+        self.end = end
+        # np.empty no toca la memoria hasta que se escribe cada frame
+        self.frames = np.empty((end - start + 1, *frame_shape), dtype=np.uint8)
+        self.filled = 0  # frames válidos desde start, lo escribe el decodificador
+
+    @staticmethod
+    def nbytes_for(start, end, frame_shape):
+        return (end - start + 1) * int(np.prod(frame_shape))
+
+    @property
+    def complete(self):
+        return self.filled >= len(self.frames)
+
+    def covers(self, frame_number):
+        return self.start <= frame_number <= self.end
+
+    def get(self, frame_number):
+        """frame del loop si ya está decodificado, si no None"""
+        i = frame_number - self.start
+        if 0 <= i < self.filled:
+            return self.frames[i]
+        return None
+
+
+class FrameDecoder(threading.Thread):
+    """Decodifica frames en segundo plano hacia un buffer circular"""
+
+    DEFAULT_BUFFER_SIZE = 12  # ~0.5 s a 25 fps
+    DEFAULT_LOOP_BUDGET = 512 * 1024 * 1024  # ~430 frames PAL
+
+    def __init__(
+        self,
+        path,
+        cache=None,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        loop_budget=DEFAULT_LOOP_BUDGET,
+        store=None,
+        proxy=None,
+        calibration=None,
+        perf=None,
+    ):
+        super().__init__(name="FrameDecoder", daemon=True)
+        self.path = path
+        self.cache = cache if cache is not None else FrameCache()
+        self.buffer_size = buffer_size
+        self.loop_budget = loop_budget
+        self.store = store  # FrameStore o None
+        self.proxy = proxy  # ProxyVideo o None
+        self.calibration = calibration if calibration is not None else Calibration()
+        self.perf = perf if perf is not None else PerfStats()
+        self.use_proxy = False
+        self.loop_buffer = None
+        self.info = {}
+        self.ready = threading.Event()
+
+        # compartido con la GUI, protegido por cond
+        self.cond = threading.Condition()
+        self.buffer = deque()  # (generación, frame_number, frame)
+        self.commands = deque()
+        self.generation = 0
+        self.eof = False
+
+        # estado propio del hilo
+        self._cap = None
+        self._accessor = None
+        self._next = 0  # siguiente frame a decodificar por adelantado
+        self._playing = False
+        self._loop = None  # (inicio, fin) o None
+        self._proxy_active = False
+
+    # API para el hilo de la GUI
+
+    def _send(self, *command):
+        with self.cond:
+            self.commands.append(command)
+            self.cond.notify()
+
+    def seek(self, frame_number, deliver=True):
+        """
+        Mover el cabezal: se descarta lo que hubiera en el buffer y el
+        decodificador entrega frame_number como siguiente frame. Con
+        deliver=False solo se recoloca el cabezal (la GUI ya tiene el frame).
+        """
+        with self.cond:
+            self.generation += 1
+            self.buffer.clear()
+            self.eof = False
+            self.commands.append(("seek", frame_number, self.generation, deliver))
+            self.cond.notify()
+
+    def set_proxy(self, enabled):
+        """
+        Cambia entre el proxy y el vídeo original. Se vacían el buffer, la
+        caché y el loop en memoria para no mezclar resoluciones; la GUI debe
+        volver a pedir el frame actual y el loop.
+        """
+        enabled = bool(enabled and self.proxy is not None)
+        with self.cond:
+            self.use_proxy = enabled
+            self.generation += 1
+            self.buffer.clear()
+            self.eof = False
+            self.loop_buffer = None
+            self.cache.clear()
+            self.commands.append(("proxy", enabled))
+            self.cond.notify()
+
+    def frame_shape(self):
+        """forma de los frames que se decodifican en el modo actual"""
+        if self.use_proxy:
+            return (self.proxy.height, self.proxy.width, 3)
+        return (self.info["height"], self.info["width"], 3)
+
+    def set_playing(self, playing):
+        self._send("play", playing)
+
+    def set_loop(self, start=None, end=None):
+        """
+        Límites del loop, None para desactivarlo. Si el loop cabe en el
+        presupuesto se decodifica entero en memoria en segundo plano; si no,
+        se sigue leyendo del vídeo (streaming).
+        """
+        if start is None:
+            self.loop_buffer = None
+            self._send("loop", None)
+            return
+
+        shape = self.frame_shape()
+        current = self.loop_buffer
+        if self.store is not None and self.store.covers(start, end):
+            # el loop ya está entero en el mmap, no hace falta copiarlo
+            self.loop_buffer = None
+        elif not (current and current.start == start and current.end == end):
+            fits = LoopBuffer.nbytes_for(start, end, shape) <= self.loop_budget
+            self.loop_buffer = LoopBuffer(start, end, shape) if fits else None
+        self._send("loop", (start, end))
+
+    def peek(self, frame_number):
+        """frame ya decodificado (mmap, loop en memoria o caché) o None, sin decodificar"""
+        if self.store is not None:
+            frame = self.store.get(frame_number)
+            if frame is not None:
+                return frame
+        loop = self.loop_buffer
+        if loop is not None:
+            frame = loop.get(frame_number)
+            if frame is not None:
+                return frame
+        return self.cache.get(frame_number)
+
+    def take_frame(self):
+        """(frame_number, frame) listo o None si todavía no hay ninguno"""
+        with self.cond:
+            if not self.buffer:
+                return None
+            _, frame_number, frame = self.buffer.popleft()
+            self.cond.notify()  # hay hueco, el decodificador puede seguir
+            return frame_number, frame
+
+    def queue_depth(self):
+        with self.cond:
+            return len(self.buffer)
+
+    def stop(self):
+        self._send("stop")
+
+    # hilo decodificador
+
+    def run(self):
+        self._cap = cv2.VideoCapture(self.path)
+        opened = self._cap.isOpened()
+        self.info = {
+            "opened": opened,
+            "total_frames": int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "width": int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self._cap.get(cv2.CAP_PROP_FPS),
+        }
+        self.ready.set()
+
+        if not opened:
+            return
+
+        self._accessor = FrameAccessor(
+            self._cap, KeyframeIndex.for_video(self.path, build=False)
+        )
+        if self._accessor.index is None:
+            # el índice se construye una vez en otro hilo y se usa cuando esté
+            threading.Thread(
+                target=self._build_index, name="KeyframeIndex", daemon=True
+            ).start()
+
+        try:
+            while True:
+                with self.cond:
+                    while not self.commands and not self._wants_frame():
+                        self.cond.wait()
+                    commands = list(self.commands)
+                    self.commands.clear()
+
+                for command in commands:
+                    if not self._handle_command(command):
+                        return
+
+                if self._wants_frame():
+                    self._decode_ahead()
+        finally:
+            self._cap.release()
+            if self.proxy is not None:
+                self.proxy.release()
+
+    def _build_index(self):
+        index = KeyframeIndex.for_video(self.path)
+        if index is not None:
+            self._accessor.index = index
+
+    def _wants_frame(self):
+        # llamado con cond adquirido
+        loop = self.loop_buffer
+        if loop is not None:
+            # el loop en memoria se llena aunque esté en pausa; mientras
+            # exista la GUI lee de él y no hace falta leer por adelantado
+            return not loop.complete
+        return self._playing and not self.eof and len(self.buffer) < self.buffer_size
+
+    def _handle_command(self, command):
+        name = command[0]
+        if name == "stop":
+            return False
+        if name == "play":
+            self._playing = command[1]
+        elif name == "loop":
+            self._loop = command[1]
+        elif name == "proxy":
+            self._proxy_active = command[1]
+            self.cache.clear()  # lo decodificado en el modo anterior
+        elif name == "seek":
+            _, frame_number, generation, deliver = command
+            if deliver:
+                self._push(frame_number, generation)
+            else:
+                self._next = frame_number
+        return True
+
+    def _next_frame_number(self):
+        frame_number = self._next
+        if self._loop and not (self._loop[0] <= frame_number <= self._loop[1]):
+            frame_number = self._loop[0]
+        return frame_number
+
+    def _decode_ahead(self):
+        loop = self.loop_buffer
+        if loop is not None:
+            self._fill_loop(loop)
+            return
+
+        with self.cond:
+            generation = self.generation
+        self._push(self._next_frame_number(), generation)
+
+    def _fill_loop(self, loop):
+        """decodifica el siguiente frame del loop directamente en su array"""
+        frame_number = loop.start + loop.filled
+        target = loop.frames[loop.filled]
+
+        cached = self.peek(frame_number)
+        if cached is not None:
+            np.copyto(target, cached)
+        else:
+            frame = self._decode(frame_number, target)
+            if frame is None:
+                # no se puede completar (fin del vídeo): volver a streaming
+                if self.loop_buffer is loop:
+                    self.loop_buffer = None
+                return
+            if frame is not target:
+                np.copyto(target, frame)
+
+        loop.filled += 1
+
+    def _push(self, frame_number, generation):
+        frame = self._read_frame(frame_number)
+
+        with self.cond:
+            if generation != self.generation:
+                return  # hubo un seek mientras se decodificaba
+            if frame is None:
+                self.eof = True
+                return
+            self.buffer.append((generation, frame_number, frame))
+
+        self._next = frame_number + 1
+
+    def _read_frame(self, frame_number):
+        """frame decodificado, de memoria o del vídeo (solo seek si hace falta)"""
+        frame = self.peek(frame_number)
+        if frame is not None:
+            return frame
+
+        frame = self._decode(frame_number)
+        if frame is not None:
+            self.cache.put(frame_number, frame)
+        return frame
+
+    def _decode(self, frame_number, out=None):
+        video_frame = self.calibration.to_video(frame_number)
+        t0 = self.perf.start()
+        if self._proxy_active:
+            frame = self.proxy.read(video_frame)
+        else:
+            frame = self._accessor.read(video_frame, out)
+        self.perf.stop(DECODE, t0)
+        return frame
@@ -0,0 +1,196 @@
+"""
+Acceso aleatorio a frames con tiempo acotado.
+
+KeyframeIndex recorre una sola vez los paquetes del vídeo (sin decodificar)
+y guarda qué frames son keyframes en un fichero junto al vídeo.
+FrameAccessor usa ese índice para llegar a cualquier frame con un único
+seek al keyframe anterior y decodificando hacia delante, llevando él mismo
+la cuenta de la posición (sin cap.get en cada acceso).
+"""
+
+import bisect
+import itertools
+import json
+import os
+from pathlib import Path
+
+import cv2
+
+
+class KeyframeIndex:
+    """Índice de keyframes de un vídeo, persistido junto al fichero"""
+
+    SUFFIX = ".kfidx.json"
+    VERSION = 1
+
+    def __init__(self, keyframes, total_frames, source=None):
+        self.keyframes = keyframes  # números de frame ordenados
+        self.total_frames = total_frames
+        self.source = source or {}  # tamaño y mtime del vídeo indexado
+
+    @staticmethod
+    def _source_info(video_path):
+        st = os.stat(video_path)
+        return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+    @classmethod
+    def index_path(cls, video_path):
+        video_path = Path(video_path)
+        return video_path.with_name(video_path.name + cls.SUFFIX)
+
+    @classmethod
+    def build(cls, video_path):
+        """
+        Recorre los paquetes del vídeo en modo raw (sin decodificar) y anota
+        los keyframes. El número de frame es el orden del paquete.
+        """
+        cap = cv2.VideoCapture(
+            str(video_path), cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1]
+        )
+        if not cap.isOpened():
+            return None
+
+        keyframes = []
+        count = 0
+        try:
+            while cap.grab():
+                if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframes.append(count)
+                count += 1
+        finally:
+            cap.release()
+
+        return cls(keyframes, count, cls._source_info(video_path))
+
+    def save(self, path):
+        data = {
+            "version": self.VERSION,
+            "source": self.source,
+            "total_frames": self.total_frames,
+            "keyframes": self.keyframes,
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"Error al guardar el índice de keyframes: {e}")
+
+    @classmethod
+    def load(cls, path, source=None):
+        """Carga el índice; None si no existe o es de otra versión del vídeo"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if data.get("version") != cls.VERSION:
+            return None
+        if source is not None and data.get("source") != source:
+            return None
+
+        return cls(data["keyframes"], data["total_frames"], data["source"])
+
+    @classmethod
+    def for_video(cls, video_path, build=True):
+        """Índice del vídeo desde disco, o construido y guardado si no existe"""
+        path = cls.index_path(video_path)
+        source = cls._source_info(video_path)
+
+        index = cls.load(path, source)
+        if index is None and build:
+            index = cls.build(video_path)
+            if index is not None:
+                index.save(path)
+        return index
+
+    def keyframe_before(self, frame_number):
+        """keyframe más cercano en o antes de frame_number"""
+        i = bisect.bisect_right(self.keyframes, frame_number) - 1
+        return self.keyframes[i] if i >= 0 else 0
+
+    def max_gop(self):
+        gaps = [b - a for a, b in itertools.pairwise(self.keyframes)]
+        return max(gaps, default=self.total_frames)
+
+
+class FrameAccessor:
+    """Lectura de frames con un solo seek al keyframe anterior"""
+
+    # sin índice, saltos hacia delante menores que esto se hacen sin seek
+    FORWARD_DECODE_LIMIT = 25
+
+    def __init__(self, cap, index=None):
+        self.cap = cap
+        self.index = index
+        self.position = 0  # siguiente frame que devolverá cap.read()
+        self.seeks = 0
+
+    def _seek_to(self, frame_number):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self.position = frame_number
+        self.seeks += 1
+
+    def _position_before(self, frame_number):
+        """deja la posición en un punto desde el que avanzar hasta frame_number"""
+        if self.position == frame_number:
+            return
+
+        if self.index is not None:
+            keyframe = self.index.keyframe_before(frame_number)
+            # si ya estamos en el mismo GOP y por detrás, basta con avanzar
+            if not (keyframe <= self.position < frame_number):
+                self._seek_to(keyframe)
+        elif self.position < 0 or not (
+            0 <= frame_number - self.position <= self.FORWARD_DECODE_LIMIT
+        ):
+            # posición desconocida (tras un fallo) o demasiado lejos
+            self._seek_to(frame_number)
+
+    def read(self, frame_number, out=None):
+        """
+        Decodifica frame_number. Si se pasa out, se decodifica en ese array.
+
+        Returns:
+            ndarray o None si no se pudo leer
+        """
+        self._position_before(frame_number)
+
+        while self.position < frame_number:
+            if not self.cap.grab():
+                self.position = -1
+                return None
+            self.position += 1
+
+        ret, frame = self.cap.read() if out is None else self.cap.read(out)
+        if not ret:
+            self.position = -1  # posición desconocida, forzar seek la próxima vez
+            return None
+
+        self.position = frame_number + 1
+        return frame
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Construye el índice de keyframes")
+    parser.add_argument("video")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = KeyframeIndex.build(args.video)
+    if index is None:
+        print(f"Error: no se pudo abrir {args.video}")
+        return
+
+    index.save(KeyframeIndex.index_path(args.video))
+    print(
+        f"{index.total_frames} frames, {len(index.keyframes)} keyframes, "
+        f"GOP máximo {index.max_gop()} ({time.perf_counter() - t0:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,14 @@
-from PySide6.QtWidgets import QHBoxLayout, QLabel, QPushButton
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QLabel,
+    QListView,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .list_models import NodeListModel, PathListModel
 
 
 class FrameButtonManager:
@@ -10,43 +20,88 @@ class FrameButtonManager:
 
         # grafo
         self.paths = []
+        self.visible = []  # ids de los paths que pasan el filtro de búsqueda
+        self._visible_pos = {}
         self.current_path_idx = 0
         self.current_node_idx = 0
+        self._listed_path_idx = None  # path cuyos nodos están en node_model
+        self.node_changed_callback = None  # recibe el mem del nodo actual
 
-        # UI
-        self.path_nav_layout = None
-        self.node_nav_layout = None
-        self.info_label = None
-        self.path_label = None
-        self.node_label = None
-        self.node_info_label = None
+        # UI: se crea una sola vez, cambiar de escena o de nodo solo
+        # actualiza los modelos y los textos
+        self.path_model = PathListModel()
+        self.node_model = NodeListModel()
+        self._create_navigation_controls()
 
     def update_paths(self, paths):
         """Actualiza los paths del grafo"""
-        self._clear_buttons()
-
         self.paths = paths
         self.current_path_idx = 0
         self.current_node_idx = 0
+        self._listed_path_idx = None
+        self._set_visible(list(range(len(paths))))
+        self.node_model.set_items([])
 
-        if not paths:
-            no_data_label = QLabel("No hay paths en esta escena")
-            no_data_label.setStyleSheet(
-                "color: #888; font-style: italic; padding: 10px;"
-            )
-            self.buttons_layout.addWidget(no_data_label)
+        self.no_data_label.setVisible(not paths)
+        self.nav_widget.setVisible(bool(paths))
+        if paths:
+            self._update_display()
+
+    def _set_visible(self, ids):
+        self.visible = ids
+        self._visible_pos = {p: i for i, p in enumerate(ids)}
+        self.path_model.set_items([self.paths[p] for p in ids], ids)
+
+    def set_visible_paths(self, ids):
+        """Muestra solo los paths indicados (resultado de la búsqueda)"""
+        if not self.paths:
+            return
+        self._set_visible(ids)
+        if not ids:
             return
+        if self.current_path_idx in self._visible_pos:
+            # el path actual sigue visible: solo se recoloca en la lista
+            self._sync_path_row()
+        else:
+            self.current_path_idx = ids[0]
+            self.current_node_idx = 0
+            self._update_display()
 
-        # controles de navegación
-        self._create_navigation_controls()
-        self._update_display()
+    def _sync_path_row(self):
+        row = self._visible_pos.get(self.current_path_idx, -1)
+        self.path_model.set_current(row)
+        if row >= 0:
+            self._select_row(self.path_view, row)
+        self._update_path_label()
+
+    def _update_path_label(self):
+        text = f"Path {self.current_path_idx + 1} / {len(self.paths)}"
+        if len(self.visible) != len(self.paths):
+            row = self._visible_pos.get(self.current_path_idx)
+            position = "-" if row is None else row + 1
+            text += f" ({position} / {len(self.visible)} filtrados)"
+        self.path_label.setText(text)
 
     def _create_navigation_controls(self):
         """Crea los controles de navegación de paths y nodos"""
 
+        self.no_data_label = QLabel("No hay paths en esta escena")
+        self.no_data_label.setStyleSheet(
+            "color: #888; font-style: italic; padding: 10px;"
+        )
+        self.no_data_label.hide()
+        self.buttons_layout.addWidget(self.no_data_label)
+
+        self.nav_widget = QWidget()
+        nav_layout = QVBoxLayout()
+        nav_layout.setContentsMargins(0, 0, 0, 0)
+        self.nav_widget.setLayout(nav_layout)
+        self.nav_widget.hide()
+        self.buttons_layout.addWidget(self.nav_widget)
+
         path_header = QLabel("Paths:")
         path_header.setStyleSheet("font-weight: bold; margin-top: 10px;")
-        self.buttons_layout.addWidget(path_header)
+        nav_layout.addWidget(path_header)
 
         self.path_nav_layout = QHBoxLayout()
 
@@ -62,17 +117,20 @@ class FrameButtonManager:
         next_path_btn.clicked.connect(self._next_path)
         self.path_nav_layout.addWidget(next_path_btn)
 
-        self.buttons_layout.addLayout(self.path_nav_layout)
+        nav_layout.addLayout(self.path_nav_layout)
 
         # path actual
         self.info_label = QLabel()
         self.info_label.setStyleSheet("color: #666; font-size: 15px; padding: 5px;")
-        self.buttons_layout.addWidget(self.info_label)
+        nav_layout.addWidget(self.info_label)
+
+        self.path_view = self._create_list_view(self.path_model, self._on_path_clicked)
+        nav_layout.addWidget(self.path_view, 1)
 
         # nodos
         node_header = QLabel("Nodos en el path:")
         node_header.setStyleSheet("font-weight: bold; margin-top: 15px;")
-        self.buttons_layout.addWidget(node_header)
+        nav_layout.addWidget(node_header)
 
         self.node_nav_layout = QHBoxLayout()
 
@@ -88,7 +146,10 @@ class FrameButtonManager:
         next_node_btn.clicked.connect(self._next_node)
         self.node_nav_layout.addWidget(next_node_btn)
 
-        self.buttons_layout.addLayout(self.node_nav_layout)
+        nav_layout.addLayout(self.node_nav_layout)
+
+        self.node_view = self._create_list_view(self.node_model, self._on_node_clicked)
+        nav_layout.addWidget(self.node_view, 1)
 
         # info adicional del nodo (mem offset y respawn)
         self.node_info_label = QLabel()
@@ -96,7 +157,7 @@ class FrameButtonManager:
             "color: #888; font-size: 15px; padding: 5px; font-family: monospace;"
         )
         self.node_info_label.setWordWrap(True)
-        self.buttons_layout.addWidget(self.node_info_label)
+        nav_layout.addWidget(self.node_info_label)
 
         # botónm para reproducir frames del nodo actual
         self.play_node_layout = QHBoxLayout()
@@ -116,22 +177,68 @@ class FrameButtonManager:
         self.play_node_btn.clicked.connect(self._replay_current_node)
         self.play_node_layout.addWidget(self.play_node_btn)
 
-        self.buttons_layout.addLayout(self.play_node_layout)
+        nav_layout.addLayout(self.play_node_layout)
+
+    @staticmethod
+    def _create_list_view(model, on_clicked):
+        """lista de solo lectura: solo se pintan las filas visibles"""
+        view = QListView()
+        view.setModel(model)
+        view.setUniformItemSizes(True)
+        view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        view.clicked.connect(lambda index: on_clicked(index.row()))
+        return view
+
+    def _on_path_clicked(self, row):
+        path_idx = self.visible[row]
+        if path_idx != self.current_path_idx:
+            self.current_path_idx = path_idx
+            self.current_node_idx = 0
+            self._update_display()
+
+    def _on_node_clicked(self, row):
+        if row != self.current_node_idx:
+            self.current_node_idx = row
+            self._update_display()
 
     def _prev_path(self):
-        """Navegar al path anterior"""
-        if self.current_path_idx > 0:
-            self.current_path_idx -= 1
+        """Navegar al path anterior (entre los visibles)"""
+        row = self._visible_pos.get(self.current_path_idx, len(self.visible))
+        if row > 0 and self.visible:
+            self.current_path_idx = self.visible[min(row, len(self.visible)) - 1]
             self.current_node_idx = 0
             self._update_display()
 
     def _next_path(self):
-        """Navegar al path siguiente"""
-        if self.current_path_idx < len(self.paths) - 1:
-            self.current_path_idx += 1
+        """Navegar al path siguiente (entre los visibles)"""
+        row = self._visible_pos.get(self.current_path_idx, -1)
+        if row < len(self.visible) - 1:
+            self.current_path_idx = self.visible[row + 1]
             self.current_node_idx = 0
             self._update_display()
 
+    def select_node(self, mem, path_ids):
+        """
+        Salta a un nodo: en el path actual si pasa por él, si no en el primer
+        path visible de path_ids. Devuelve False si ningún path visible lo tiene.
+        """
+        candidates = [int(p) for p in path_ids if int(p) in self._visible_pos]
+        if not candidates:
+            return False
+        if self.current_path_idx not in candidates:
+            self.current_path_idx = candidates[0]
+        nodes = self.paths[self.current_path_idx]["nodes"]
+        current = (
+            nodes[self.current_node_idx] if self.current_node_idx < len(nodes) else {}
+        )
+        if current.get("mem") != mem:
+            self.current_node_idx = next(
+                i for i, node in enumerate(nodes) if node.get("mem") == mem
+            )
+        self._update_display()
+        return True
+
     def _prev_node(self):
         """Navegar al nodo anterior en el path actual"""
         if self.current_node_idx > 0:
@@ -157,9 +264,18 @@ class FrameButtonManager:
             self.current_node_idx = 0
 
         current_node = nodes[self.current_node_idx]
+        if self.node_changed_callback is not None:
+            self.node_changed_callback(current_node.get("mem"))
+
+        # las listas solo se tocan en lo que cambia
+        if self._listed_path_idx != self.current_path_idx:
+            self._listed_path_idx = self.current_path_idx
+            self.node_model.set_items(nodes)
+            self._sync_path_row()
+        self.node_model.set_current(self.current_node_idx)
+        self._select_row(self.node_view, self.current_node_idx)
 
         # actualizar labels
-        self.path_label.setText(f"Path {self.current_path_idx + 1} / {len(self.paths)}")  # type: ignore
 
         total_frames = current_path.get("total_frames", 0)
         total_hitboxes = current_path.get("total_hitboxes", 0)
@@ -176,6 +292,8 @@ class FrameButtonManager:
 
         if ptr_respawn:
             info_parts.append(f"💀 Respawn: {ptr_respawn}")
+        if current_node.get("death"):
+            info_parts.append("☠ Muerte")
 
         self.node_info_label.setText(" | ".join(info_parts))  # type: ignore
 
@@ -196,6 +314,12 @@ class FrameButtonManager:
             self.play_node_btn.setText("▶ Reproducir nodo (sin frames)")
             self.play_node_btn.setEnabled(False)
 
+    @staticmethod
+    def _select_row(view, row):
+        index = view.model().index(row, 0)
+        view.setCurrentIndex(index)
+        view.scrollTo(index)
+
     def _replay_current_node(self):
         """Reproduce nuevamente el nodo actual"""
         if not self.paths or self.current_path_idx >= len(self.paths):
@@ -229,24 +353,10 @@ class FrameButtonManager:
 
         return nodes[self.current_node_idx]
 
-    def _clear_buttons(self):
-        """Limpia todos los botones existentes"""
-
-        # TODO: overkill, esto no es eficiente, pyside debe tener mejor forma de manejar layouts
-        while self.buttons_layout.count():
-            child = self.buttons_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-            elif child.layout():
-                while child.layout().count():
-                    subchild = child.layout().takeAt(0)
-                    if subchild.widget():
-                        subchild.widget().deleteLater()
-
     def activate_first_node(self):
-        """Activa el primer nodo del primer path"""
-        if self.paths:
-            self.current_path_idx = 0
+        """Activa el primer nodo del primer path visible"""
+        if self.visible:
+            self.current_path_idx = self.visible[0]
             self.current_node_idx = 0
             self._update_display()
 
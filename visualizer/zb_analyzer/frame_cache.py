@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+
+class FrameCache:
+    """
+    Caché LRU de frames decodificados con presupuesto de memoria en bytes.
+    Es segura entre hilos (la usan el decodificador y la GUI).
+    """
+
+    # un frame PAL 720x576 BGR ocupa ~1.2 MB -> ~200 frames
+    DEFAULT_BUDGET = 256 * 1024 * 1024
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()  # frame_number -> ndarray
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, frame_number):
+        """devuelve el frame cacheado (solo lectura) o None"""
+        with self._lock:
+            frame = self.frames.get(frame_number)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(frame_number)
+            self.hits += 1
+            return frame
+
+    def put(self, frame_number, frame):
+        """guarda un frame; los frames cacheados se marcan como solo lectura"""
+        if frame.nbytes > self.max_bytes:
+            return
+
+        # se comparten sin copiar, nadie debe modificarlos
+        frame.flags.writeable = False
+
+        with self._lock:
+            old = self.frames.pop(frame_number, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self.frames[frame_number] = frame
+            self.bytes += frame.nbytes
+            self._evict()
+
+    def _evict(self):
+        # llamado con _lock adquirido
+        while self.bytes > self.max_bytes and self.frames:
+            _, frame = self.frames.popitem(last=False)
+            self.bytes -= frame.nbytes
+            self.evictions += 1
+
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self.frames.clear()
+            self.bytes = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "frames": len(self.frames),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, frame_number):
+        return frame_number in self.frames
+
+    def __len__(self):
+        return len(self.frames)
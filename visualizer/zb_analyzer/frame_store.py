@@ -0,0 +1,295 @@
+"""
+Almacén de frames crudos en un fichero mapeado en memoria.
+
+Las escenas solo usan un conjunto finito de rangos de frames del laserdisc.
+La extracción decodifica exactamente la unión de esos rangos (sin duplicados
+y fusionados) a un .npy de frames BGR sin comprimir, en paralelo por
+segmentos, y guarda un índice rango -> offset. Después el reproductor sirve
+esos frames como vistas NumPy del mmap, sin decodificar nada.
+
+El almacén se indexa por frame del laserdisc: si el vídeo tiene
+calibración, se extrae a través de ella y queda ligado a esa calibración.
+"""
+
+import bisect
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .graph_processor import GraphProcessor
+
+
+def collect_frame_ranges(data):
+    """Rangos [frame_start, frame_end] de todos los nodos de chunks y spare_chunks"""
+    processor = GraphProcessor()
+    nodes = [n for chunk in data.get("chunks", []) for n in chunk.get("nodes", [])]
+    nodes += data.get("spare_chunks", [])
+
+    ranges = []
+    for n in nodes:
+        v = n.get("value", {})
+        start = processor.frame_val(v.get("ptr_frame_start"))
+        end = processor.frame_val(v.get("ptr_frame_end"))
+        if start is not None and end is not None and end >= start:
+            ranges.append((start, end))
+    return ranges
+
+
+def merge_ranges(ranges):
+    """Fusiona rangos solapados o contiguos, devuelve la lista ordenada"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+class FrameStore:
+    """Frames crudos de los rangos usados por las escenas, servidos desde un mmap"""
+
+    DATA_SUFFIX = ".frames.npy"
+    INDEX_SUFFIX = ".frames.json"
+    VERSION = 1
+    SEGMENT_FRAMES = 250  # frames por tarea en la extracción paralela
+
+    def __init__(self, frames, ranges):
+        self.frames = frames  # memmap (N, alto, ancho, 3)
+        self.ranges = ranges  # [(inicio, fin, offset)] ordenados
+        self._starts = [r[0] for r in ranges]
+
+    @staticmethod
+    def paths(video_path):
+        video_path = Path(video_path)
+        return (
+            video_path.with_name(video_path.name + FrameStore.DATA_SUFFIX),
+            video_path.with_name(video_path.name + FrameStore.INDEX_SUFFIX),
+        )
+
+    @staticmethod
+    def _source_info(video_path):
+        st = os.stat(video_path)
+        return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+    @classmethod
+    def open(cls, video_path, calibration=None):
+        """
+        Abre el almacén del vídeo si existe, está completo y se extrajo de
+        este vídeo con esta calibración
+        """
+        data_path, index_path = cls.paths(video_path)
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if (
+            index.get("version") != cls.VERSION
+            or not index.get("complete")
+            or index.get("source") != cls._source_info(video_path)
+            or index.get("calibration") != _calibration_digest(calibration)
+        ):
+            return None
+
+        try:
+            frames = np.load(data_path, mmap_mode="r")
+        except OSError, ValueError:
+            return None
+
+        return cls(frames, [tuple(r) for r in index["ranges"]])
+
+    def get(self, frame_number):
+        """vista (sin copia) del frame o None si no está en el almacén"""
+        i = bisect.bisect_right(self._starts, frame_number) - 1
+        if i < 0:
+            return None
+        start, end, offset = self.ranges[i]
+        if frame_number > end:
+            return None
+        return self.frames[offset + frame_number - start]
+
+    def covers(self, start, end):
+        """True si todo [start, end] está en el almacén"""
+        i = bisect.bisect_right(self._starts, start) - 1
+        return i >= 0 and self.ranges[i][1] >= end
+
+    def __contains__(self, frame_number):
+        return self.get(frame_number) is not None
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def _calibration_digest(calibration):
+    if calibration is None or calibration.is_identity:
+        return None
+    return calibration.digest()
+
+
+def _extract_segment(job):
+    """Decodifica un segmento contiguo en su sitio del mmap (proceso del pool)"""
+    import cv2
+
+    from .calibration import Calibration
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, data_path, start, end, offset = job
+    calibration = Calibration.for_video(video_path)
+    frames = np.load(data_path, mmap_mode="r+")
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+
+    done = 0
+    try:
+        for frame_number in range(start, end + 1):
+            target = frames[offset + frame_number - start]
+            frame = accessor.read(calibration.to_video(frame_number), target)
+            if frame is None:
+                break
+            if frame is not target:
+                target[...] = frame
+            done += 1
+    finally:
+        cap.release()
+        frames.flush()
+
+    return done == end - start + 1
+
+
+def extract(video_path, json_paths, workers=None, segment_frames=None):
+    """
+    Extrae al almacén todos los frames referenciados por los JSON de escenas.
+
+    Args:
+        video_path: vídeo de origen
+        json_paths: lista de JSON de escenas
+        workers: procesos del pool (por defecto uno por núcleo)
+        segment_frames: tamaño de cada tarea
+
+    Returns:
+        FrameStore: almacén abierto, o None si falló
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    import cv2
+
+    from .calibration import Calibration
+    from .frame_access import KeyframeIndex
+
+    segment_frames = segment_frames or FrameStore.SEGMENT_FRAMES
+
+    ranges = []
+    for json_path in json_paths:
+        with open(json_path, encoding="utf-8") as f:
+            ranges += collect_frame_ranges(json.load(f))
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"Error: no se pudo abrir {video_path}")
+        return None
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    shape = (
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        3,
+    )
+    cap.release()
+
+    # solo lo que existe en el vídeo (los rangos son frames del laserdisc):
+    # cada rango se recorta a los frames que caen en [0, total - 1]
+    calibration = Calibration.for_video(video_path)
+    merged = []
+    for start, end in merge_ranges(ranges):
+        while start <= end and calibration.to_video(start) < 0:
+            start += 1
+        while end >= start and calibration.to_video(end) > total - 1:
+            end -= 1
+        if start <= end:
+            merged.append((start, end))
+
+    index_ranges = []
+    offset = 0
+    for start, end in merged:
+        index_ranges.append((start, end, offset))
+        offset += end - start + 1
+
+    size_gb = offset * int(np.prod(shape)) / 2**30
+    print(f"{len(merged)} rangos, {offset} frames, {size_gb:.1f} GB")
+
+    # el índice de keyframes se construye antes para que lo usen todos
+    KeyframeIndex.for_video(video_path)
+
+    data_path, index_path = FrameStore.paths(video_path)
+    index_path.unlink(missing_ok=True)
+    np.lib.format.open_memmap(
+        data_path, mode="w+", dtype=np.uint8, shape=(offset, *shape)
+    ).flush()
+
+    jobs = []
+    for start, end, range_offset in index_ranges:
+        for seg_start in range(start, end + 1, segment_frames):
+            seg_end = min(seg_start + segment_frames - 1, end)
+            jobs.append(
+                (
+                    str(video_path),
+                    str(data_path),
+                    seg_start,
+                    seg_end,
+                    range_offset + seg_start - start,
+                )
+            )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        complete = all(pool.map(_extract_segment, jobs))
+
+    if not complete:
+        print("Error: no se pudieron decodificar todos los frames")
+        return None
+
+    # el índice se escribe al final: si no existe, el almacén no está completo
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": FrameStore.VERSION,
+                "source": FrameStore._source_info(video_path),
+                "shape": list(shape),
+                "ranges": index_ranges,
+                "calibration": _calibration_digest(calibration),
+                "complete": True,
+            },
+            f,
+        )
+
+    return FrameStore.open(video_path, calibration)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Extrae a un fichero mmap los frames usados por las escenas"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", nargs="+", help="JSON de escenas")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--segment",
+        type=int,
+        default=FrameStore.SEGMENT_FRAMES,
+        help="frames por tarea",
+    )
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    store = extract(args.video, args.json, args.workers, args.segment)
+    if store is not None:
+        print(f"{len(store)} frames extraídos en {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
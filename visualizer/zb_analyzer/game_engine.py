@@ -0,0 +1,511 @@
+"""
+Motor de la lógica del juego sin GUI ni vídeo.
+
+Ejecuta logs de disparos contra el árbol de decisiones de una escena. Un log
+es una lista de disparos (frame, x, y):
+
+- frame cuenta los frames reproducidos desde el inicio de la escena, no los
+  del laserdisc (tras una muerte el disco vuelve atrás, el log no)
+- x, y están en coordenadas Amiga (320x256), las mismas que los hitboxes
+
+Modelo por defecto (las hipótesis se cambian con Rules):
+
+- cada nodo reproduce todos sus frames; en su ventana de hitboxes el primer
+  disparo que cae dentro de un hitbox es un acierto y suma su score
+- al acabar el nodo se sigue sequences[1 + i] si se acertó el hitbox i, o
+  sequences[0] si no se acertó ninguno
+- 0x0004c7d2 es una muerte: se pierde una vida y se repite el nodo desde su
+  ptr_node_respawn (la misma ventana de hitboxes empezando más tarde) o,
+  si no tiene, desde su inicio
+- 0x00000000, 0x0004c7fc, un nodo de otra escena o un nodo sin sequences
+  terminan la escena
+- se entra por el primer nodo del chunk al que no llega ninguna sequence ni
+  ningún respawn (el mem_offset del chunk es su nodo final)
+
+SceneProgram compila la escena a arrays de numpy y run_batch avanza todos
+los logs a la vez, un nodo por paso. run_parallel reparte lotes de logs
+entre procesos.
+"""
+
+import numpy as np
+
+from .graph_processor import GraphProcessor
+
+NULL_ADDRESS = "0x00000000"
+
+# destinos especiales en las tablas de sucesores
+DEATH = -1
+END = -2
+
+# resultado de cada log
+RUNNING = 0
+CLEARED = 1  # la escena termina
+GAME_OVER = 2  # sin vidas
+STALLED = 3  # max_steps sin terminar (ciclo sin muertes)
+OUTCOMES = {CLEARED: "superada", GAME_OVER: "sin vidas", STALLED: "atascada"}
+
+DEFAULT_MAX_STEPS = 500
+BATCH_SIZE = 2000  # logs por tarea en run_parallel
+
+
+class Rules:
+    """
+    Hipótesis sobre la lógica de los nodos.
+
+    successor_slots decide qué sequence se sigue en cada caso; se puede
+    sobrescribir en una subclase para probar qué significan type_a, type_b
+    o los huecos de sequences.
+    """
+
+    MISS_SLOT = 0  # sequence sin acierto
+    HIT_SLOT = 1  # sequence del primer hitbox; el hitbox i usa HIT_SLOT + i
+    RESPAWN_MODES = ("node", "checkpoint", "entry")
+
+    def __init__(self, lives=3, respawn="node", null_miss="end", death_frames=0):
+        """
+        Args:
+            lives: muertes hasta acabar la partida
+            respawn: dónde se sigue tras morir: "node" (ptr_node_respawn
+                del nodo donde se muere, o el mismo nodo), "checkpoint"
+                (último ptr_node_respawn visto, o la entrada) o "entry"
+                (entrada de la escena)
+            null_miss: con 0x00000000 en el hueco de fallo, "end" termina la
+                escena y "next" lo toma como "sin rama de fallo" y sigue el
+                hueco siguiente
+            death_frames: frames que consume cada muerte
+        """
+        if respawn not in self.RESPAWN_MODES:
+            raise ValueError(f"respawn desconocido: {respawn}")
+        self.lives = lives
+        self.respawn = respawn
+        self.null_miss = null_miss
+        self.death_frames = death_frames
+
+    def successor_slots(self, node, num_hitboxes):
+        """
+        Huecos de sequences que sigue un nodo.
+
+        Args:
+            node: nodo del JSON
+            num_hitboxes: hitboxes del nodo
+
+        Returns:
+            tuple: (hueco sin acierto, [hueco por hitbox]); None si no hay
+        """
+        seqs = node.get("value", {}).get("sequences", []) or []
+        if not seqs:
+            return None, [None] * num_hitboxes
+        last = len(seqs) - 1
+        miss = min(self.MISS_SLOT, last)
+        if self.null_miss == "next" and seqs[miss] == NULL_ADDRESS and miss < last:
+            miss += 1
+        return miss, [min(self.HIT_SLOT + i, last) for i in range(num_hitboxes)]
+
+
+class SceneProgram:
+    """Escena compilada a arrays, un índice por nodo"""
+
+    def __init__(self, chunk, rules=None):
+        """
+        Args:
+            chunk: escena del JSON
+            rules: Rules a aplicar (por defecto las del modelo de arriba)
+        """
+        processor = GraphProcessor()
+        self.rules = rules or Rules()
+        # un nodo puede repetirse en el chunk, manda el primero; el nodo de
+        # muerte también aparece y no se ejecuta
+        index = {}
+        nodes = []
+        for n in chunk.get("nodes", []):
+            mem = n.get("mem_offset")
+            if mem and mem not in index and mem not in processor.TERMINATION_ADDRESSES:
+                index[mem] = len(nodes)
+                nodes.append(n)
+        self.mems = [n["mem_offset"] for n in nodes]
+        self.entry = self._find_entry(nodes)
+
+        boxes = [n.get("value", {}).get("lista_hitboxes", []) or [] for n in nodes]
+        count = len(nodes)
+        width = max(max((len(b) for b in boxes), default=0), 1)
+
+        self.length = np.zeros(count, dtype=np.int64)
+        # ventana de hitboxes relativa al inicio del nodo (vacía: lo > hi)
+        self.window = np.tile(np.array([1, 0], dtype=np.int64), (count, 1))
+        self.boxes = np.zeros((count, width, 4), dtype=np.int64)  # x0, y0, x1, y1
+        self.box_score = np.zeros((count, width), dtype=np.int64)
+        self.box_count = np.zeros(count, dtype=np.int64)
+        self.miss = np.full(count, END, dtype=np.int64)
+        self.hit = np.full((count, width), END, dtype=np.int64)
+        self.respawn = np.full(count, -1, dtype=np.int64)
+
+        for i, node in enumerate(nodes):
+            v = node.get("value", {})
+            self.length[i] = processor.node_frames(node)
+            start = processor.frame_val(v.get("ptr_frame_start"))
+            hb_start = processor.frame_val(v.get("ptr_frame_hitbox_start"))
+            hb_end = processor.frame_val(v.get("ptr_frame_hitbox_end"))
+            if None not in (start, hb_start, hb_end):
+                self.window[i] = (hb_start - start, hb_end - start)
+
+            for j, item in enumerate(boxes[i]):
+                hb = item.get("hitbox", {})
+                x0, x1 = sorted((hb.get("x0", 0), hb.get("x1", 0)))
+                y0, y1 = sorted((hb.get("y0", 0), hb.get("y1", 0)))
+                self.boxes[i, j] = (x0, y0, x1, y1)
+                self.box_score[i, j] = hb.get("score", hb.get("points", 0))
+            self.box_count[i] = len(boxes[i])
+
+            seqs = v.get("sequences", []) or []
+            miss, hits = self.rules.successor_slots(node, len(boxes[i]))
+            self.miss[i] = self._target(seqs, miss, index)
+            for j, slot in enumerate(hits):
+                self.hit[i, j] = self._target(seqs, slot, index)
+
+            self.respawn[i] = index.get(v.get("ptr_node_respawn"), -1)
+
+    @staticmethod
+    def _find_entry(nodes):
+        reached = set()
+        for n in nodes:
+            v = n.get("value", {})
+            reached.update(v.get("sequences", []) or [])
+            reached.add(v.get("ptr_node_respawn"))
+        return next(
+            (i for i, n in enumerate(nodes) if n["mem_offset"] not in reached), 0
+        )
+
+    @staticmethod
+    def _target(seqs, slot, index):
+        if slot is None:
+            return END
+        mem = seqs[slot]
+        if mem == GraphProcessor.DEATH_ADDRESS:
+            return DEATH
+        # 0x00000000, 0x0004c7fc o un nodo de otra escena
+        return index.get(mem, END)
+
+    def __len__(self):
+        return len(self.mems)
+
+    def hit_test(self, nodes, x, y):
+        """(n, hitboxes) bool: qué hitboxes del nodo contienen cada disparo"""
+        boxes = self.boxes[nodes]
+        valid = np.arange(boxes.shape[1]) < self.box_count[nodes][:, None]
+        x = x[:, None]
+        y = y[:, None]
+        return (
+            valid
+            & (x >= boxes[..., 0])
+            & (x <= boxes[..., 2])
+            & (y >= boxes[..., 1])
+            & (y <= boxes[..., 3])
+        )
+
+
+def pack_logs(logs):
+    """
+    Junta los logs en arrays planos ordenados por (log, frame).
+
+    La clave de cada disparo es fila * stride + frame: cada log queda como un
+    tramo ordenado y un searchsorted encuentra los disparos de una ventana.
+
+    Args:
+        logs: lista de arrays (n, 3) o listas de (frame, x, y)
+
+    Returns:
+        tuple: (claves, x, y, stride)
+    """
+    arrays = [np.asarray(log, dtype=np.int64).reshape(-1, 3) for log in logs]
+    rows = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+    shots = np.concatenate(arrays) if arrays else np.empty((0, 3), dtype=np.int64)
+    keep = shots[:, 0] >= 0  # disparos antes de empezar la escena
+    shots, rows = shots[keep], rows[keep]
+    stride = int(shots[:, 0].max()) + 2 if len(shots) else 1
+    keys = rows * stride + shots[:, 0]
+    if (np.diff(keys) < 0).any():
+        # estable: los disparos del mismo frame mantienen el orden del log
+        order = np.argsort(keys, kind="stable")
+        keys, shots = keys[order], shots[order]
+    return keys, shots[:, 1], shots[:, 2], stride
+
+
+def run_batch(program, logs, max_steps=DEFAULT_MAX_STEPS, trace=False):
+    """
+    Ejecuta muchos logs sobre una escena a la vez.
+
+    Cada paso resuelve el nodo actual de todos los logs vivos: busca con
+    searchsorted los disparos que caen en su ventana de hitboxes y prueba el
+    k-ésimo disparo de todos ellos contra sus hitboxes hasta que cada log
+    acierta o se queda sin disparos.
+
+    Args:
+        program: SceneProgram
+        logs: lista de logs (frame, x, y)
+        max_steps: nodos como máximo por log
+        trace: devolver también los nodos recorridos
+
+    Returns:
+        dict: arrays por log con score, deaths, outcome, steps, frames
+        (reproducidos) y end_node (índice del último nodo; program.mems[i]
+        para su mem_offset); con trace, "trace" (logs, max_steps) con -1
+        de relleno
+    """
+    rules = program.rules
+    count = len(logs)
+    keys, xs, ys, stride = pack_logs(logs)
+
+    node = np.full(count, program.entry, dtype=np.int64)
+    t0 = np.zeros(count, dtype=np.int64)  # frame del log en que empieza el nodo
+    score = np.zeros(count, dtype=np.int64)
+    deaths = np.zeros(count, dtype=np.int64)
+    steps = np.zeros(count, dtype=np.int64)
+    outcome = np.full(count, RUNNING, dtype=np.int8)
+    checkpoint = np.full(count, -1, dtype=np.int64)
+    path = np.full((count, max_steps), -1, dtype=np.int64) if trace else None
+
+    active = np.arange(count) if len(program) else np.empty(0, dtype=np.int64)
+    if not len(program):
+        outcome[:] = CLEARED
+
+    for step in range(max_steps):
+        if not len(active):
+            break
+        n = node[active]
+        if trace:
+            path[active, step] = n
+        respawn = program.respawn[n]
+        has_respawn = respawn >= 0
+        checkpoint[active[has_respawn]] = respawn[has_respawn]
+
+        # tramo de disparos de cada log dentro de la ventana del nodo
+        base = active * stride
+        lo = t0[active] + program.window[n, 0]
+        hi = t0[active] + program.window[n, 1]
+        first = np.searchsorted(keys, base + np.clip(lo, 0, stride - 1), "left")
+        last = np.searchsorted(keys, base + np.clip(hi, -1, stride - 1), "right")
+
+        box = np.full(len(active), -1, dtype=np.int64)
+        pending = np.flatnonzero((first < last) & (program.box_count[n] > 0))
+        k = 0
+        while len(pending):
+            shot = first[pending] + k
+            left = shot < last[pending]
+            pending, shot = pending[left], shot[left]
+            if not len(pending):
+                break
+            inside = program.hit_test(n[pending], xs[shot], ys[shot])
+            scored = inside.any(axis=1)
+            box[pending[scored]] = inside[scored].argmax(axis=1)
+            pending = pending[~scored]
+            k += 1
+
+        hit = box >= 0
+        score[active[hit]] += program.box_score[n[hit], box[hit]]
+        target = program.miss[n]
+        target[hit] = program.hit[n[hit], box[hit]]
+        t0[active] += program.length[n]
+        steps[active] += 1
+
+        dead = target == DEATH
+        if dead.any():
+            died = active[dead]
+            deaths[died] += 1
+            t0[died] += rules.death_frames
+            if rules.respawn == "node":
+                resume = program.respawn[n[dead]]
+                fallback = n[dead]
+            elif rules.respawn == "checkpoint":
+                resume = checkpoint[died]
+                fallback = program.entry
+            else:
+                resume = np.full(len(died), -1, dtype=np.int64)
+                fallback = program.entry
+            target[dead] = np.where(resume >= 0, resume, fallback)
+            outcome[died[deaths[died] >= rules.lives]] = GAME_OVER
+
+        ended = target == END
+        outcome[active[ended]] = CLEARED
+        # los que terminan se quedan en su último nodo
+        node[active] = np.where(ended | (outcome[active] != RUNNING), n, target)
+        active = active[outcome[active] == RUNNING]
+
+    outcome[active] = STALLED
+
+    result = {
+        "score": score,
+        "deaths": deaths,
+        "outcome": outcome,
+        "steps": steps,
+        "frames": t0,
+        "end_node": node,
+    }
+    if trace:
+        result["trace"] = path
+    return result
+
+
+def run_log(program, log, max_steps=DEFAULT_MAX_STEPS):
+    """un solo log; el recorrido se devuelve como lista de mem_offset"""
+    result = run_batch(program, [log], max_steps, trace=True)
+    path = [program.mems[i] for i in result["trace"][0] if i >= 0]
+    return {
+        "score": int(result["score"][0]),
+        "deaths": int(result["deaths"][0]),
+        "outcome": OUTCOMES.get(int(result["outcome"][0])),
+        "frames": int(result["frames"][0]),
+        "path": path,
+    }
+
+
+def _run_job(job):
+    """Lote de logs; se ejecuta en un proceso del pool"""
+    chunk, rules, logs, max_steps = job
+    return run_batch(SceneProgram(chunk, rules), logs, max_steps)
+
+
+def run_parallel(
+    chunk,
+    logs,
+    rules=None,
+    workers=None,
+    batch_size=BATCH_SIZE,
+    max_steps=DEFAULT_MAX_STEPS,
+):
+    """
+    run_batch repartido en lotes entre procesos.
+
+    Args:
+        chunk: escena del JSON (cada proceso la compila)
+        logs: lista de logs (frame, x, y)
+        rules: Rules a aplicar
+        workers: procesos del pool (por defecto uno por núcleo)
+        batch_size: logs por tarea
+        max_steps: nodos como máximo por log
+
+    Returns:
+        dict: los mismos arrays que run_batch, en el orden de logs
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = [
+        (chunk, rules, logs[i : i + batch_size], max_steps)
+        for i in range(0, len(logs), batch_size)
+    ]
+    if len(jobs) <= 1:
+        results = [_run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_job, jobs))
+    if not results:
+        return run_batch(SceneProgram(chunk, rules), [], max_steps)
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+
+def random_logs(program, count, shots=None, seed=None):
+    """
+    Logs aleatorios para pruebas de rendimiento o de hipótesis: disparos
+    uniformes en el tiempo de la escena y en el rectángulo que cubre sus
+    hitboxes.
+
+    Args:
+        program: SceneProgram
+        count: número de logs
+        shots: disparos por log (por defecto ~2.5 por segundo de escena)
+        seed: semilla del generador
+
+    Returns:
+        list: arrays (shots, 3) de frame, x, y
+    """
+    rng = np.random.default_rng(seed)
+    horizon = max(int(program.length.sum()), 1)
+    shots = shots or max(horizon // 10, 1)
+    valid = np.arange(program.boxes.shape[1]) < program.box_count[:, None]
+    boxes = program.boxes[valid]
+    if len(boxes):
+        x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+        x1, y1 = boxes[:, 2].max(), boxes[:, 3].max()
+    else:
+        x0, y0, x1, y1 = 0, 0, 319, 255
+    frames = np.sort(rng.integers(0, horizon, (count, shots)), axis=1)
+    xs = rng.integers(x0, x1 + 1, (count, shots))
+    ys = rng.integers(y0, y1 + 1, (count, shots))
+    return list(np.stack([frames, xs, ys], axis=2))
+
+
+def main():
+    import argparse
+    import json
+    import os
+    import sys
+    import time
+    from pathlib import Path
+
+    JSON_FILE = "Zorton_brothes_v1.01.json"
+
+    parser = argparse.ArgumentParser(
+        description="Ejecuta logs de disparos contra el grafo de una escena"
+    )
+    parser.add_argument(
+        "--json",
+        default=str(Path(__file__).parent.parent.parent / JSON_FILE),
+        help="JSON de escenas",
+    )
+    parser.add_argument("-s", "--scene", type=int, default=0, help="id de la escena")
+    parser.add_argument(
+        "logs",
+        nargs="*",
+        help="logs CSV (frame,x,y por línea, # para comentarios); sin logs se generan aleatorios",
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=10000, help="logs aleatorios"
+    )
+    parser.add_argument("--shots", type=int, help="disparos por log aleatorio")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--lives", type=int, default=3)
+    parser.add_argument("--respawn", choices=Rules.RESPAWN_MODES, default="node")
+    parser.add_argument("--null-miss", choices=["end", "next"], default="end")
+    parser.add_argument("--death-frames", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.json, encoding="utf-8") as f:
+        data = json.load(f)
+    chunk = next((c for c in data.get("chunks", []) if c.get("id") == args.scene), None)
+    if chunk is None:
+        print(f"Error: no hay escena con id {args.scene}", file=sys.stderr)
+        sys.exit(1)
+
+    rules = Rules(args.lives, args.respawn, args.null_miss, args.death_frames)
+    program = SceneProgram(chunk, rules)
+    if args.logs:
+        logs = [
+            np.loadtxt(path, delimiter=",", comments="#", ndmin=2) for path in args.logs
+        ]
+    else:
+        logs = random_logs(program, args.count, args.shots, args.seed)
+
+    t0 = time.perf_counter()
+    result = run_parallel(chunk, logs, rules, args.workers, args.batch, args.max_steps)
+    elapsed = time.perf_counter() - t0
+
+    print(f"Escena {args.scene}: {len(program)} nodos, {len(logs)} logs")
+    for code, name in OUTCOMES.items():
+        print(f"  {name}: {np.count_nonzero(result['outcome'] == code)}")
+    print(
+        f"  score medio {result['score'].mean():.0f} (máximo {result['score'].max()}), "
+        f"muertes medias {result['deaths'].mean():.2f}"
+    )
+    ends = np.bincount(result["end_node"], minlength=len(program))
+    for i in np.argsort(ends)[::-1][:5]:
+        if ends[i]:
+            print(f"    termina en {program.mems[i]}: {ends[i]}")
+    if len(logs) == 1:
+        print(f"  recorrido: {' -> '.join(run_log(program, logs[0])['path'])}")
+    print(f"{len(logs)} logs en {elapsed:.2f}s ({len(logs) / elapsed:.0f} logs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Grafo global del juego: todas las escenas, spare_chunks y las aristas entre
+escenas (scene_order y respawns) en un solo grafo.
+
+Se precalcula una vez y se guarda junto al JSON:
+- componentes fuertemente conexas (SCC)
+- alcanzabilidad transitiva, un bitset (int) por SCC
+- rutas mínimas ponderadas por frames entre cualquier par de nodos
+"""
+
+import hashlib
+import json
+import pickle
+from pathlib import Path
+
+import networkx as nx
+
+from .graph_processor import GraphProcessor
+
+
+class GameGraph:
+    """Grafo global del juego con alcanzabilidad y rutas mínimas precalculadas"""
+
+    CACHE_VERSION = 1
+    CACHE_SUFFIX = ".gamegraph.pkl"
+
+    def __init__(self):
+        self.source_hash = None
+        self.scene_order = []
+        self.nodes = []  # índice -> mem_offset
+        self.index = {}  # mem_offset -> índice
+        self.scenes = []  # índice -> id de chunk o "spare"
+        self.frames = []  # índice -> frames que reproduce el nodo
+        self.scc_of = []  # índice -> índice de SCC
+        self.sccs = []  # índice de SCC -> lista de índices de nodo
+        self.reach = []  # índice de SCC -> bitset de nodos alcanzables
+        self.dist = []  # índice origen -> {índice destino: frames}
+        self.pred = []  # índice origen -> {índice destino: predecesor}
+
+    @classmethod
+    def build(cls, data, source_hash=None):
+        """
+        Construye el grafo global y precalcula SCCs, alcanzabilidad y rutas.
+
+        Args:
+            data: JSON completo del juego
+            source_hash: hash del JSON de origen (para invalidar la caché)
+
+        Returns:
+            GameGraph: grafo con todas las tablas calculadas
+        """
+        gg = cls()
+        gg.source_hash = source_hash
+        gg.scene_order = list(data.get("scene_order", []))
+
+        G, _ = GraphProcessor().build_game_graph(data)
+
+        gg.nodes = sorted(G.nodes())
+        gg.index = {mem: i for i, mem in enumerate(gg.nodes)}
+        gg.scenes = [G.nodes[mem]["scene"] for mem in gg.nodes]
+        gg.frames = [G.nodes[mem]["frames"] for mem in gg.nodes]
+
+        H = nx.relabel_nodes(G, gg.index)
+        gg._compute_reachability(H)
+        gg._compute_shortest_paths(H)
+
+        return gg
+
+    def _compute_reachability(self, H):
+        """SCCs y bitsets de alcanzabilidad sobre el grafo condensado (DAG)"""
+        C = nx.condensation(H)
+        mapping = C.graph["mapping"]
+
+        self.scc_of = [mapping[i] for i in range(len(self.nodes))]
+        self.sccs = [sorted(C.nodes[c]["members"]) for c in range(len(C))]
+        self.reach = [0] * len(C)
+
+        # en orden topológico inverso los sucesores ya están resueltos
+        for c in reversed(list(nx.topological_sort(C))):
+            bits = 0
+            for i in self.sccs[c]:
+                bits |= 1 << i
+            for s in C.successors(c):
+                bits |= self.reach[s]
+            self.reach[c] = bits
+
+    def _compute_shortest_paths(self, H):
+        """Dijkstra desde cada nodo; el peso de u -> v son los frames de v"""
+        frames = self.frames
+
+        def weight(u, v, d):
+            return frames[v]
+
+        self.dist = []
+        self.pred = []
+        for src in range(len(self.nodes)):
+            pred, dist = nx.dijkstra_predecessor_and_distance(H, src, weight=weight)
+            self.dist.append(dist)
+            self.pred.append({v: p[0] for v, p in pred.items() if p})
+
+    @staticmethod
+    def hash_file(path):
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @classmethod
+    def from_json(cls, json_path, cache_path=None, rebuild=False):
+        """
+        Carga el grafo global desde la caché o lo construye y la guarda.
+
+        Args:
+            json_path: ruta al JSON del juego
+            cache_path: ruta de la caché (por defecto junto al JSON)
+            rebuild: ignorar la caché existente
+
+        Returns:
+            GameGraph: grafo listo para consultas
+        """
+        json_path = Path(json_path)
+        cache_path = (
+            Path(cache_path)
+            if cache_path
+            else json_path.with_name(json_path.name + cls.CACHE_SUFFIX)
+        )
+        source_hash = cls.hash_file(json_path)
+
+        if not rebuild:
+            gg = cls.load(cache_path, source_hash)
+            if gg is not None:
+                return gg
+
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        gg = cls.build(data, source_hash)
+        gg.save(cache_path)
+        return gg
+
+    def save(self, path):
+        state = dict(self.__dict__)
+        state["version"] = self.CACHE_VERSION
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Error al guardar el grafo global: {e}")
+
+    @classmethod
+    def load(cls, path, source_hash=None):
+        """Carga la caché; None si no existe o no corresponde al JSON"""
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except OSError, pickle.UnpicklingError, EOFError:
+            return None
+
+        if state.pop("version", None) != cls.CACHE_VERSION:
+            return None
+        if source_hash is not None and state.get("source_hash") != source_hash:
+            return None
+
+        gg = cls()
+        gg.__dict__.update(state)
+        return gg
+
+    # consultas
+
+    def _idx(self, mem):
+        if mem not in self.index:
+            raise KeyError(f"Nodo desconocido: {mem}")
+        return self.index[mem]
+
+    def scene_entry(self, order_idx):
+        """Nodo de entrada de la escena en la posición order_idx de scene_order"""
+        return self.scene_order[order_idx]
+
+    def can_reach(self, src, dst):
+        """True si dst es alcanzable desde src (incluye src == dst)"""
+        i, j = self._idx(src), self._idx(dst)
+        return bool((self.reach[self.scc_of[i]] >> j) & 1)
+
+    def reachable(self, src):
+        """Lista de nodos alcanzables desde src"""
+        bits = self.reach[self.scc_of[self._idx(src)]]
+        return [mem for j, mem in enumerate(self.nodes) if (bits >> j) & 1]
+
+    def same_scc(self, a, b):
+        return self.scc_of[self._idx(a)] == self.scc_of[self._idx(b)]
+
+    def min_frames(self, src, dst):
+        """Frames mínimos de la ruta src -> dst (ambos incluidos), None si no hay"""
+        i, j = self._idx(src), self._idx(dst)
+        d = self.dist[i].get(j)
+        if d is None:
+            return None
+        return d + self.frames[i]
+
+    def shortest_route(self, src, dst):
+        """
+        Ruta con menos frames entre dos nodos.
+
+        Returns:
+            dict: {"path": [mem, ...], "frames": int} o None si no hay ruta
+        """
+        i, j = self._idx(src), self._idx(dst)
+        if j not in self.dist[i]:
+            return None
+
+        pred = self.pred[i]
+        path = [j]
+        while path[-1] != i:
+            path.append(pred[path[-1]])
+        path.reverse()
+
+        return {
+            "path": [self.nodes[k] for k in path],
+            "frames": self.dist[i][j] + self.frames[i],
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Grafo global del juego: alcanzabilidad y rutas mínimas"
+    )
+    parser.add_argument(
+        "json",
+        nargs="?",
+        default=str(Path(__file__).parent.parent.parent / "Zorton_brothes_v1.01.json"),
+    )
+    parser.add_argument("origen", nargs="?", help="mem_offset o índice en scene_order")
+    parser.add_argument("destino", nargs="?", help="mem_offset o índice en scene_order")
+    parser.add_argument("--rebuild", action="store_true", help="ignorar la caché")
+    args = parser.parse_args()
+
+    gg = GameGraph.from_json(args.json, rebuild=args.rebuild)
+
+    non_trivial = [c for c in gg.sccs if len(c) > 1]
+    print(
+        f"Nodos: {len(gg.nodes)}, SCCs: {len(gg.sccs)} ({len(non_trivial)} con ciclos)"
+    )
+
+    if not (args.origen and args.destino):
+        return
+
+    def resolve(value):
+        return gg.scene_entry(int(value)) if value.isdigit() else value
+
+    src, dst = resolve(args.origen), resolve(args.destino)
+    if not gg.can_reach(src, dst):
+        print(f"{dst} no es alcanzable desde {src}")
+        return
+
+    route = gg.shortest_route(src, dst)
+    print(f"{src} -> {dst}: {route['frames']} frames, {len(route['path'])} nodos")
+    print("  " + " -> ".join(route["path"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Layout por capas de los grafos de escena para el panel del grafo.
+
+El flujo del juego va de izquierda a derecha: cada nodo se coloca en la capa
+de su camino más largo desde una raíz (sobre la vista acíclica del grafo) y
+el orden dentro de cada capa se ajusta con unas pasadas de baricentro para
+reducir cruces. No usa Qt, así que se puede calcular en un hilo aparte.
+
+Los layouts se guardan por hash del grafo (nodos, sequences y respawns) en
+memoria y en un fichero junto al JSON: volver a una escena o abrir otra vez
+el mismo JSON no recalcula nada.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+from pathlib import Path
+
+from .graph_processor import GraphProcessor
+
+LAYER_GAP = 120.0
+NODE_GAP = 60.0
+SWEEPS = 4
+
+# tipos de nodo, de mayor a menor prioridad
+DEATH = "death"
+RESPAWN = "respawn"
+TERMINAL = "terminal"
+NORMAL = "normal"
+EXTERNAL = "external"  # destino de otra escena, sin datos en este grafo
+
+
+def node_kind(node, processor=None):
+    """tipo de un nodo del JSON para colorearlo"""
+    if node is None:
+        return EXTERNAL
+    processor = processor or GraphProcessor()
+    if processor.ends_in_death(node):
+        return DEATH
+    respawn = node.get("value", {}).get("ptr_node_respawn")
+    if respawn and respawn != "0x00000000":
+        return RESPAWN
+    if processor.is_exit_node(node):
+        return TERMINAL
+    return NORMAL
+
+
+def graph_digest(G):
+    """hash de lo que determina el layout y los colores de un grafo"""
+    rows = []
+    for mem in sorted(G.nodes()):
+        node = G.nodes[mem].get("data")
+        v = node.get("value", {}) if node else {}
+        rows.append(
+            [
+                mem,
+                sorted(G.successors(mem)),
+                v.get("sequences", []) or [],
+                v.get("ptr_node_respawn"),
+            ]
+        )
+    payload = json.dumps([GraphLayoutCache.CACHE_VERSION, rows], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def layered_layout(G, processor=None):
+    """
+    Posiciones de los nodos en capas de izquierda a derecha.
+
+    Args:
+        G: DiGraph de NetworkX (puede tener ciclos)
+        processor: GraphProcessor a usar (por defecto uno nuevo)
+
+    Returns:
+        dict: mem_offset -> (x, y)
+    """
+    import networkx as nx
+
+    processor = processor or GraphProcessor()
+    D = processor.acyclic_view(G)
+    topo = list(nx.topological_sort(D))
+
+    # capa = camino más largo desde una raíz
+    layer = dict.fromkeys(topo, 0)
+    for u in topo:
+        for v in D.successors(u):
+            layer[v] = max(layer[v], layer[u] + 1)
+
+    layers = [[] for _ in range(max(layer.values(), default=-1) + 1)]
+    for u in topo:
+        layers[layer[u]].append(u)
+
+    pos = {}
+    for nodes in layers:
+        pos.update((u, i) for i, u in enumerate(nodes))
+
+    def sweep(indices, neighbors):
+        for i in indices:
+            nodes = layers[i]
+            keys = {}
+            for u in nodes:
+                ps = [pos[w] for w in neighbors(u)]
+                keys[u] = sum(ps) / len(ps) if ps else pos[u]
+            # sort estable: los nodos sin vecinos mantienen su sitio relativo
+            nodes.sort(key=keys.__getitem__)
+            pos.update((u, j) for j, u in enumerate(nodes))
+
+    for _ in range(SWEEPS):
+        sweep(range(1, len(layers)), D.predecessors)
+        sweep(range(len(layers) - 2, -1, -1), D.successors)
+
+    result = {}
+    for i, nodes in enumerate(layers):
+        offset = (len(nodes) - 1) / 2
+        for j, u in enumerate(nodes):
+            result[u] = (i * LAYER_GAP, (j - offset) * NODE_GAP)
+    return result
+
+
+class GraphLayoutCache:
+    """Layouts calculados, por hash de grafo, en memoria y en disco"""
+
+    CACHE_VERSION = 1
+    CACHE_SUFFIX = ".layouts.pkl"
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.layouts = None  # se carga en el primer acceso
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_json(cls, json_path):
+        json_path = Path(json_path)
+        return cls(json_path.with_name(json_path.name + cls.CACHE_SUFFIX))
+
+    def _load(self):
+        self.layouts = {}
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except OSError, pickle.UnpicklingError, EOFError:
+            return
+        if state.get("version") == self.CACHE_VERSION:
+            self.layouts = state.get("layouts", {})
+
+    def get(self, digest):
+        with self._lock:
+            if self.layouts is None:
+                self._load()
+            return self.layouts.get(digest)
+
+    def put(self, digest, positions):
+        with self._lock:
+            if self.layouts is None:
+                self._load()
+            self.layouts[digest] = positions
+            if self.path is None:
+                return
+            state = {"version": self.CACHE_VERSION, "layouts": self.layouts}
+            try:
+                with open(self.path, "wb") as f:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError as e:
+                print(f"Error al guardar los layouts del grafo: {e}")
+
+    def layout(self, G, digest=None):
+        """layout del grafo desde la caché o calculado y guardado"""
+        digest = digest or graph_digest(G)
+        positions = self.get(digest)
+        if positions is None:
+            positions = layered_layout(G)
+            self.put(digest, positions)
+        return positions
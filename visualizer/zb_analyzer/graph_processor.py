@@ -1,14 +1,80 @@
-import networkx as nx
+"""
+Grafos de secuencias de las escenas.
+
+networkx se importa dentro de los métodos que lo usan: los módulos que solo
+necesitan frame_val y compañía no lo cargan (el arranque del visualizador).
+"""
+
+import heapq
+import itertools
+import time
 
 
 class GraphProcessor:
     """Procesador de grafos de secuencias de animación usando NetworkX"""
 
     TERMINATION_ADDRESSES = ["0x00000000", "0x0004c7d2", "0x0004c7fc"]
+    DEATH_ADDRESS = "0x0004c7d2"
+    MAX_CYCLES = 1000
 
     def __init__(self):
         pass
 
+    @staticmethod
+    def frame_val(field):
+        """
+        Extraer frame integer de ptr_frame_*
+
+        - está en el tercer elemento de la lista
+        - ejemplo:
+
+            "ptr_frame_start": [
+                "0x0004731c",
+                "0x0000751c",
+                "10548"
+                ]
+        """
+
+        if not isinstance(field, list) or len(field) < 3:
+            return None
+        s = field[2]
+        try:
+            return int(s)
+        except Exception:
+            return None
+
+    def node_frames(self, node):
+        """Número de frames que reproduce un nodo (0 si no tiene rango)"""
+        v = node.get("value", {})
+        start = self.frame_val(v.get("ptr_frame_start"))
+        end = self.frame_val(v.get("ptr_frame_end"))
+        if start is None or end is None:
+            return 0
+        return end - start + 1
+
+    def node_score(self, node):
+        """Suma de puntos de los hitboxes del nodo"""
+        v = node.get("value", {})
+        return sum(
+            item.get("hitbox", {}).get("score", item.get("hitbox", {}).get("points", 0))
+            for item in v.get("lista_hitboxes", []) or []
+        )
+
+    def ends_in_death(self, node):
+        """True si alguna de las secuencias del nodo lleva a la muerte"""
+        seqs = node.get("value", {}).get("sequences", []) or []
+        return self.DEATH_ADDRESS in seqs
+
+    def is_exit_node(self, node):
+        """
+        Un nodo es de salida de escena si no tiene sucesores reales
+        y no termina en muerte (termina en 0x00000000 o 0x0004c7fc).
+        """
+        seqs = node.get("value", {}).get("sequences", []) or []
+        if self.DEATH_ADDRESS in seqs:
+            return False
+        return all(s in self.TERMINATION_ADDRESSES for s in seqs)
+
     def build_graph(self, nodes):
         """
         Construye un grafo dirigido a partir de nodos de escena.
@@ -19,6 +85,8 @@ class GraphProcessor:
         Returns:
             tuple: (DiGraph, dict) - Grafo de NetworkX y mapa mem_offset -> nodo
         """
+        import networkx as nx
+
         G = nx.DiGraph()
         mem_map = {n.get("mem_offset"): n for n in nodes if "mem_offset" in n}
 
@@ -36,6 +104,88 @@ class GraphProcessor:
 
         return G, mem_map
 
+    def build_game_graph(self, data):
+        """
+        Construye el grafo global del juego uniendo todas las escenas.
+
+        Además de las aristas de `sequences` (kind="sequence") añade:
+        - kind="respawn": nodo -> ptr_node_respawn (checkpoint al morir)
+        - kind="scene": nodos de salida de una escena -> entrada de la
+          siguiente escena en scene_order
+
+        Los spare_chunks se incluyen como nodos y quedan enganchados al
+        grafo principal a través de scene_order.
+
+        Args:
+            data: JSON completo (dict con chunks, scene_order y spare_chunks)
+
+        Returns:
+            tuple: (DiGraph, dict) - Grafo global y mapa mem_offset -> nodo
+        """
+        import networkx as nx
+
+        G = nx.DiGraph()
+        mem_map = {}
+        scene_of = {}
+
+        # un mismo nodo puede aparecer en varios chunks, manda el primero
+        for chunk in data.get("chunks", []):
+            for n in chunk.get("nodes", []):
+                mem = n.get("mem_offset")
+                if mem and mem not in self.TERMINATION_ADDRESSES:
+                    mem_map.setdefault(mem, n)
+                    scene_of.setdefault(mem, chunk.get("id"))
+
+        for n in data.get("spare_chunks", []):
+            mem = n.get("mem_offset")
+            if mem and mem not in self.TERMINATION_ADDRESSES:
+                mem_map.setdefault(mem, n)
+                scene_of.setdefault(mem, "spare")
+
+        for mem, n in mem_map.items():
+            G.add_node(mem, data=n, scene=scene_of[mem], frames=self.node_frames(n))
+
+        for mem, n in mem_map.items():
+            v = n.get("value", {})
+            for s in v.get("sequences", []) or []:
+                if s in mem_map:
+                    G.add_edge(mem, s, kind="sequence")
+
+            respawn = v.get("ptr_node_respawn")
+            if respawn in mem_map and not G.has_edge(mem, respawn):
+                G.add_edge(mem, respawn, kind="respawn")
+
+        # encadenar escenas: salidas de la escena i -> entrada de la i + 1
+        entries = [m for m in data.get("scene_order", []) if m in mem_map]
+        for cur, nxt in itertools.pairwise(entries):
+            for exit_node in self._scene_exits(G, cur):
+                if not G.has_edge(exit_node, nxt):
+                    G.add_edge(exit_node, nxt, kind="scene")
+
+        return G, mem_map
+
+    def _scene_exits(self, G, entry):
+        """Nodos de salida alcanzables desde la entrada sin salir de su escena"""
+        scene = G.nodes[entry]["scene"]
+        seen = {entry}
+        stack = [entry]
+        exits = []
+
+        while stack:
+            mem = stack.pop()
+            if self.is_exit_node(G.nodes[mem]["data"]):
+                exits.append(mem)
+            for s in G.successors(mem):
+                if (
+                    s not in seen
+                    and G[mem][s]["kind"] == "sequence"
+                    and G.nodes[s]["scene"] == scene
+                ):
+                    seen.add(s)
+                    stack.append(s)
+
+        return exits
+
     def find_roots(self, G, priority_root=None):
         """
         Encuentra nodos raíz (sin predecesores) en el grafo.
@@ -72,6 +222,8 @@ class GraphProcessor:
         Returns:
             list: Lista de caminos (cada camino es una lista de mem_offsets)
         """
+        import networkx as nx
+
         all_paths = []
         leaf_nodes = [n for n in G.nodes() if G.out_degree(n) == 0]
 
@@ -94,90 +246,526 @@ class GraphProcessor:
 
         return all_paths
 
-    def get_graph_stats(self, G):
+    def find_feedback_edges(self, G):
+        """
+        Aristas de retroceso de un DFS: quitándolas el grafo queda acíclico.
+
+        Args:
+            G: Grafo de NetworkX
+
+        Returns:
+            list: Lista de aristas (u, v)
+        """
+        feedback = []
+        state = {}  # 1 = en la pila, 2 = terminado
+
+        for start in G.nodes():
+            if start in state:
+                continue
+            state[start] = 1
+            stack = [(start, iter(G.successors(start)))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child not in state:
+                        state[child] = 1
+                        stack.append((child, iter(G.successors(child))))
+                        break
+                    if state[child] == 1:
+                        feedback.append((node, child))
+                else:
+                    state[node] = 2
+                    stack.pop()
+
+        return feedback
+
+    def acyclic_view(self, G):
+        """El propio grafo si es un DAG, si no una copia sin aristas de retroceso"""
+        feedback = self.find_feedback_edges(G)
+        if not feedback:
+            return G
+        D = G.copy()
+        D.remove_edges_from(feedback)
+        return D
+
+    def k_best_routes(self, G, roots, targets, node_weight, k=1, maximize=True):
+        """
+        K mejores rutas raíz -> objetivo con programación dinámica sobre el DAG.
+
+        Cada nodo guarda sus k mejores prefijos (valor, predecesor, rango del
+        predecesor), así que el coste es O(aristas * k log k) sin enumerar caminos.
+        Si el grafo tiene ciclos se ignoran las aristas de retroceso. Los nodos
+        de terminación (muerte, fin) no cuentan como raíz ni como objetivo.
+
+        Args:
+            G: Grafo de NetworkX
+            roots: Lista de nodos raíz
+            targets: Conjunto de nodos en los que puede acabar una ruta
+            node_weight: Función mem_offset -> peso del nodo
+            k: Número de rutas a devolver
+            maximize: True para maximizar el peso total, False para minimizarlo
+
+        Returns:
+            list: Lista de (valor, [mem_offsets]) de mejor a peor
+        """
+        import networkx as nx
+
+        D = self.acyclic_view(G)
+        select = heapq.nlargest if maximize else heapq.nsmallest
+        roots = {r for r in roots if r in D and r not in self.TERMINATION_ADDRESSES}
+        targets = {t for t in targets if t not in self.TERMINATION_ADDRESSES}
+        best = {}
+
+        for u in nx.topological_sort(D):
+            w = node_weight(u)
+            candidates = [(w, None, None)] if u in roots else []
+            for p in D.predecessors(u):
+                for rank, (value, _, _) in enumerate(best.get(p, ())):
+                    candidates.append((value + w, p, rank))
+            if candidates:
+                best[u] = select(k, candidates, key=lambda c: c[0])
+
+        ends = [
+            (entry[0], t, rank)
+            for t in targets
+            for rank, entry in enumerate(best.get(t, ()))
+        ]
+
+        routes = []
+        for value, node, rank in select(k, ends, key=lambda e: e[0]):
+            path = []
+            while node is not None:
+                path.append(node)
+                _, node, rank = best[node][rank]
+            path.reverse()
+            routes.append((value, path))
+
+        return routes
+
+    def _route_data(self, G, value, path):
+        nodes = [G.nodes[m]["data"] for m in path]
+        return {
+            "path": path,
+            "value": value,
+            "score": sum(self.node_score(n) for n in nodes),
+            "frames": sum(self.node_frames(n) for n in nodes),
+        }
+
+    def max_score_routes(self, G, roots, k=1):
+        """Rutas con más puntos (sumando el score de todos sus hitboxes)"""
+        leaves = {n for n in G.nodes() if G.out_degree(n) == 0}
+        routes = self.k_best_routes(
+            G, roots, leaves, lambda m: self.node_score(G.nodes[m]["data"]), k
+        )
+        return [self._route_data(G, v, p) for v, p in routes]
+
+    def min_footage_routes(self, G, roots, k=1):
+        """Rutas con éxito (acaban en un nodo de salida) con menos frames"""
+        exits = {
+            n
+            for n in G.nodes()
+            if G.out_degree(n) == 0 and self.is_exit_node(G.nodes[n]["data"])
+        }
+        routes = self.k_best_routes(
+            G,
+            roots,
+            exits,
+            lambda m: self.node_frames(G.nodes[m]["data"]),
+            k,
+            maximize=False,
+        )
+        return [self._route_data(G, v, p) for v, p in routes]
+
+    def longest_death_routes(self, G, roots, k=1):
+        """Rutas más largas (en frames) que acaban en un nodo con muerte"""
+        deaths = {n for n in G.nodes() if self.ends_in_death(G.nodes[n]["data"])}
+        routes = self.k_best_routes(
+            G, roots, deaths, lambda m: self.node_frames(G.nodes[m]["data"]), k
+        )
+        return [self._route_data(G, v, p) for v, p in routes]
+
+    def get_route_analytics(self, G, roots, k=1):
+        """
+        Rutas óptimas de una escena.
+
+        Args:
+            G: Grafo de NetworkX (de build_graph)
+            roots: Lista de nodos raíz
+            k: Número de rutas por criterio
+
+        Returns:
+            dict: max_score, min_footage y longest_death, cada uno una lista
+            de rutas {"path", "value", "score", "frames"}
+        """
+        return {
+            "max_score": self.max_score_routes(G, roots, k),
+            "min_footage": self.min_footage_routes(G, roots, k),
+            "longest_death": self.longest_death_routes(G, roots, k),
+        }
+
+    def cyclic_components(self, G, sccs=None):
+        """
+        SCCs que contienen algún ciclo (más de un nodo o con bucle propio).
+        sccs: componentes ya calculadas, para no repetir el recorrido.
+        """
+        import networkx as nx
+
+        if sccs is None:
+            sccs = nx.strongly_connected_components(G)
+        return [c for c in sccs if len(c) > 1 or any(G.has_edge(n, n) for n in c)]
+
+    def iter_cycles(self, G, components=None):
+        """
+        Generador de ciclos elementales, buscando solo dentro de las SCC con
+        ciclos (components si ya se tienen). Puede haber un número
+        exponencial: consumir bajo demanda.
+        """
+        import networkx as nx
+
+        if components is None:
+            components = self.cyclic_components(G)
+        for component in components:
+            yield from nx.simple_cycles(G.subgraph(component))
+
+    def count_cycles(self, G, limit=MAX_CYCLES, components=None):
+        """
+        Cuenta ciclos elementales hasta un tope.
+
+        Returns:
+            tuple: (número de ciclos, True si se alcanzó el tope)
+        """
+        cycles = self.iter_cycles(G, components)
+        if limit is None:
+            return sum(1 for _ in cycles), False
+        count = sum(1 for _ in itertools.islice(cycles, limit + 1))
+        return min(count, limit), count > limit
+
+    def get_graph_stats(self, G, max_cycles=MAX_CYCLES):
         """
         Obtiene estadísticas del grafo.
 
+        Los ciclos se analizan por componentes fuertemente conexas; el conteo
+        de ciclos elementales se corta en max_cycles para acotar el tiempo.
+
         Args:
             G: Grafo de NetworkX
+            max_cycles: Tope de ciclos a contar (0 = no contar, None = sin tope)
 
         Returns:
             dict: Diccionario con estadísticas
         """
+        import networkx as nx
+
+        sccs = list(nx.strongly_connected_components(G))
+        cyclic = self.cyclic_components(G, sccs)
+
+        num_cycles, capped = 0, False
+        if cyclic and max_cycles != 0:
+            num_cycles, capped = self.count_cycles(G, max_cycles, cyclic)
+
         return {
             "num_nodes": G.number_of_nodes(),
             "num_edges": G.number_of_edges(),
-            "is_dag": nx.is_directed_acyclic_graph(G),
-            "num_cycles": (
-                len(list(nx.simple_cycles(G)))
-                if not nx.is_directed_acyclic_graph(G)
-                else 0
-            ),
+            "is_dag": not cyclic,
+            "num_sccs": len(sccs),
+            "num_cyclic_sccs": len(cyclic),
+            "cyclic_scc_sizes": sorted((len(c) for c in cyclic), reverse=True),
+            "largest_scc": max((len(c) for c in sccs), default=0),
+            "num_feedback_edges": len(self.find_feedback_edges(G)) if cyclic else 0,
+            "num_cycles": num_cycles,
+            "cycles_capped": capped,
         }
 
 
+STATS_FIELDS = [
+    "file",
+    "chunk",
+    "id",
+    "offset",
+    "nodes",
+    "edges",
+    "roots",
+    "leaves",
+    "paths",
+    "is_dag",
+    "sccs",
+    "cyclic_sccs",
+    "largest_scc",
+    "feedback_edges",
+    "cycles",
+    "cycles_capped",
+    "frame_min",
+    "frame_max",
+    "frames_covered",
+    "build_ms",
+    "stats_ms",
+    "paths_ms",
+    "total_ms",
+]
+
+
+def _frame_coverage(processor, nodes):
+    """(frame mínimo, frame máximo, frames distintos cubiertos) de los nodos"""
+    ranges = []
+    for n in nodes:
+        v = n.get("value", {})
+        start = processor.frame_val(v.get("ptr_frame_start"))
+        end = processor.frame_val(v.get("ptr_frame_end"))
+        if start is not None and end is not None and end >= start:
+            ranges.append((start, end))
+
+    if not ranges:
+        return None, None, 0
+
+    ranges.sort()
+    covered = 0
+    cur_start, cur_end = ranges[0]
+    for start, end in ranges[1:]:
+        if start > cur_end + 1:
+            covered += cur_end - cur_start + 1
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    covered += cur_end - cur_start + 1
+
+    return ranges[0][0], max(e for _, e in ranges), covered
+
+
+def _chunk_stats(job):
+    """Estadísticas de un chunk; se ejecuta en un proceso del pool"""
+    import networkx  # noqa: F401  # la importación no cuenta en build_ms
+
+    file_name, index, chunk, max_cycles = job
+    processor = GraphProcessor()
+    nodes = chunk.get("nodes", [])
+    t0 = time.perf_counter()
+
+    G, _ = processor.build_graph(nodes)
+    t1 = time.perf_counter()
+
+    stats = processor.get_graph_stats(G, max_cycles)
+    t2 = time.perf_counter()
+
+    roots = processor.find_roots(G, chunk.get("mem_offset"))
+    paths = processor.find_all_paths(G, roots)
+    t3 = time.perf_counter()
+
+    frame_min, frame_max, covered = _frame_coverage(processor, nodes)
+
+    return {
+        "file": file_name,
+        "chunk": index,
+        "id": chunk.get("id"),
+        "offset": chunk.get("mem_offset", "N/A"),
+        "nodes": stats["num_nodes"],
+        "edges": stats["num_edges"],
+        "roots": len(roots),
+        "leaves": sum(1 for n in G.nodes() if G.out_degree(n) == 0),
+        "paths": len(paths),
+        "is_dag": stats["is_dag"],
+        "sccs": stats["num_sccs"],
+        "cyclic_sccs": stats["num_cyclic_sccs"],
+        "largest_scc": stats["largest_scc"],
+        "feedback_edges": stats["num_feedback_edges"],
+        "cycles": stats["num_cycles"],
+        "cycles_capped": stats["cycles_capped"],
+        "frame_min": frame_min,
+        "frame_max": frame_max,
+        "frames_covered": covered,
+        "build_ms": round((t1 - t0) * 1000, 3),
+        "stats_ms": round((t2 - t1) * 1000, 3),
+        "paths_ms": round((t3 - t2) * 1000, 3),
+        "total_ms": round((t3 - t0) * 1000, 3),
+        "sample_paths": paths[:3],
+    }
+
+
+def _game_stats(file_name, data, max_cycles):
+    """Estadísticas del grafo global (sin enumerar paths, puede ser enorme)"""
+    import networkx  # noqa: F401  # la importación no cuenta en build_ms
+
+    processor = GraphProcessor()
+    t0 = time.perf_counter()
+    G, mem_map = processor.build_game_graph(data)
+    t1 = time.perf_counter()
+    stats = processor.get_graph_stats(G, max_cycles)
+    t2 = time.perf_counter()
+    frame_min, frame_max, covered = _frame_coverage(processor, mem_map.values())
+
+    return {
+        "file": file_name,
+        "chunk": "global",
+        "id": None,
+        "offset": None,
+        "nodes": stats["num_nodes"],
+        "edges": stats["num_edges"],
+        "roots": len(processor.find_roots(G)),
+        "leaves": sum(1 for n in G.nodes() if G.out_degree(n) == 0),
+        "paths": None,
+        "is_dag": stats["is_dag"],
+        "sccs": stats["num_sccs"],
+        "cyclic_sccs": stats["num_cyclic_sccs"],
+        "largest_scc": stats["largest_scc"],
+        "feedback_edges": stats["num_feedback_edges"],
+        "cycles": stats["num_cycles"],
+        "cycles_capped": stats["cycles_capped"],
+        "frame_min": frame_min,
+        "frame_max": frame_max,
+        "frames_covered": covered,
+        "build_ms": round((t1 - t0) * 1000, 3),
+        "stats_ms": round((t2 - t1) * 1000, 3),
+        "paths_ms": None,
+        "total_ms": round((t2 - t0) * 1000, 3),
+        "sample_paths": [],
+    }
+
+
+def _format_text(row):
+    """Bloque de texto legible con las estadísticas de un chunk"""
+    lines = []
+    if row["chunk"] == "global":
+        lines.append("Grafo global (todas las escenas)")
+    else:
+        lines.append(f"Chunk {row['chunk']} (offset: {row['offset']})")
+    lines.append(f"  Nodos: {row['nodes']}, Aristas: {row['edges']}")
+    cycles = f"{row['cycles']}{'+' if row['cycles_capped'] else ''}"
+    lines.append(f"  Es DAG: {row['is_dag']}, Ciclos: {cycles}")
+    if not row["is_dag"]:
+        lines.append(
+            f"  SCCs: {row['sccs']}, con ciclos: {row['cyclic_sccs']} "
+            f"(mayor: {row['largest_scc']}), aristas de retroceso: {row['feedback_edges']}"
+        )
+    lines.append(f"  Raíces: {row['roots']}, Hojas: {row['leaves']}")
+    if row["frame_min"] is not None:
+        lines.append(
+            f"  Frames: {row['frame_min']}-{row['frame_max']} "
+            f"({row['frames_covered']} cubiertos)"
+        )
+
+    paths = row["sample_paths"]
+    if row["paths"] is not None:
+        lines.append(f"  Paths encontrados: {row['paths']} ({row['total_ms']:.1f} ms)")
+
+    # paths de ejemplo
+    if paths and row["paths"] <= 3:
+        for j, path in enumerate(paths):
+            lines.append(
+                f"    path {j + 1}: {' -> '.join([str(p)[-8:] for p in path])}"
+            )
+    elif paths:
+        lines.append(f"    Primer path: {' -> '.join([str(p)[-8:] for p in paths[0]])}")
+        lines.append(f"    (... {row['paths'] - 1} paths más)")
+
+    return "\n".join(lines) + "\n\n"
+
+
 def main():
+    import argparse
+    import contextlib
+    import csv
     import json
+    import os
     import sys
+    from concurrent.futures import ProcessPoolExecutor
     from pathlib import Path
 
     JSON_FILE = "Zorton_brothes_v1.01.json"
 
-    json_path = Path(__file__).parent.parent.parent / JSON_FILE
-
-    if not json_path.exists():
-        print(f"Error: No se encuentra el archivo {json_path}")
-        sys.exit(1)
-
-    print(f"Cargando {json_path.name}...")
-
-    with open(json_path, encoding="utf-8") as f:
-        data = json.load(f)
-
-    processor = GraphProcessor()
+    parser = argparse.ArgumentParser(
+        description="Estadísticas de los grafos de escenas, en paralelo por chunk"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        default=[str(Path(__file__).parent.parent.parent / JSON_FILE)],
+        help="archivos JSON de escenas",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["text", "json", "csv"], default="text"
+    )
+    parser.add_argument("-o", "--output", help="archivo de salida (por defecto stdout)")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count(), help="procesos del pool"
+    )
+    parser.add_argument(
+        "--max-cycles",
+        type=int,
+        default=GraphProcessor.MAX_CYCLES,
+        help="tope de ciclos a contar por grafo (0 = no contar)",
+    )
+    args = parser.parse_args()
+
+    datasets = []
+    for file_name in args.files:
+        json_path = Path(file_name)
+        if not json_path.exists():
+            print(f"Error: No se encuentra el archivo {json_path}", file=sys.stderr)
+            sys.exit(1)
+
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict) or "chunks" not in data:
+            print(f"Error: Formato de JSON no válido: {json_path}", file=sys.stderr)
+            sys.exit(1)
+
+        datasets.append((str(json_path), data))
+
+    jobs = [
+        (file_name, i, chunk, args.max_cycles)
+        for file_name, data in datasets
+        for i, chunk in enumerate(data["chunks"])
+        if chunk.get("nodes")
+    ]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # el grafo global se calcula mientras el pool procesa los chunks
+        futures = pool.map(_chunk_stats, jobs, chunksize=4)
+        game_rows = [
+            _game_stats(file_name, data, args.max_cycles)
+            for file_name, data in datasets
+        ]
+        rows = list(futures)
+    elapsed = time.perf_counter() - t0
+
+    for game_row in game_rows:
+        last = max(
+            (i for i, r in enumerate(rows) if r["file"] == game_row["file"]),
+            default=len(rows) - 1,
+        )
+        rows.insert(last + 1, game_row)
 
-    if not isinstance(data, dict) or "chunks" not in data:
-        print("Error: Formato de JSON no válido")
-        sys.exit(1)
-
-    chunks = data["chunks"]
-    print(f"Total de chunks/escenas: {len(chunks)}", end="\n\n")
-
-    total_paths = 0
-
-    for i, chunk in enumerate(chunks):
-        nodes = chunk.get("nodes", [])
-        if not nodes:
-            print(f"Chunk {i}: Sin nodos")
-            continue
-
-        G, mem_map = processor.build_graph(nodes)
-        stats = processor.get_graph_stats(G)
-        priority_root = chunk.get("mem_offset")
-        roots = processor.find_roots(G, priority_root)
-        paths = processor.find_all_paths(G, roots)
-        total_paths += len(paths)
-
-        print(f"Chunk {i} (offset: {chunk.get('mem_offset', 'N/A')})")
-        print(f"  Nodos: {stats['num_nodes']}, Aristas: {stats['num_edges']}")
-        print(f"  Es DAG: {stats['is_dag']}, Ciclos: {stats['num_cycles']}")
-        print(
-            f"  Raíces: {len(roots)}, Hojas: {len([n for n in G.nodes() if G.out_degree(n) == 0])}"
+    with contextlib.ExitStack() as stack:
+        stream = (
+            stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+            if args.output
+            else sys.stdout
         )
-        print(f"  Paths encontrados: {len(paths)}")
-
-        # paths de ejemplo
-        if paths and len(paths) <= 3:
-            for j, path in enumerate(paths[:3]):
-                print(f"    path {j + 1}: {' -> '.join([str(p)[-8:] for p in path])}")
-        elif len(paths) > 3:
-            print(f"    Primer path: {' -> '.join([str(p)[-8:] for p in paths[0]])}")
-            print(f"    (... {len(paths) - 1} paths más)")
-        print()
-
-    print(f"{'=' * 60}")
-    print(f"Total de paths en todas las escenas: {total_paths}")
-    print(f"{'=' * 60}")
+        if args.format == "json":
+            # sample_paths solo es para el formato de texto
+            records = [{field: row[field] for field in STATS_FIELDS} for row in rows]
+            json.dump(records, stream, indent=2, ensure_ascii=False)
+            stream.write("\n")
+        elif args.format == "csv":
+            writer = csv.DictWriter(stream, STATS_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            current = None
+            for row in rows:
+                if row["file"] != current:
+                    current = row["file"]
+                    stream.write(f"{'=' * 60}\n{current}\n{'=' * 60}\n\n")
+                stream.write(_format_text(row))
+
+            total_paths = sum(r["paths"] or 0 for r in rows)
+            stream.write(
+                f"{'=' * 60}\n"
+                f"Total de paths en todas las escenas: {total_paths}\n"
+                f"{len(jobs)} chunks en {elapsed:.2f}s con {args.workers} procesos\n"
+                f"{'=' * 60}\n"
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,396 @@
+"""
+Panel con el grafo de la escena actual (o del juego completo).
+
+El grafo y su layout se calculan en un hilo aparte (con la caché de
+graph_layout) y el resultado vuelve al hilo de la interfaz con una señal.
+Cada nodo es un QGraphicsItem que se pinta según el zoom (nivel de detalle):
+de lejos un rectángulo relleno, de cerca el círculo con su etiqueta. Las
+aristas salientes de cada nodo son un solo item, así el índice de la escena
+descarta lo que queda fuera de la vista y mover o hacer zoom sobre el grafo
+del juego completo no repinta todo.
+"""
+
+import threading
+
+from PySide6.QtCore import QLineF, QPointF, QRectF, Qt, Signal
+from PySide6.QtGui import QBrush, QColor, QFont, QPainter, QPainterPath, QPen
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QGraphicsItem,
+    QGraphicsScene,
+    QGraphicsView,
+    QHBoxLayout,
+    QLabel,
+    QStyleOptionGraphicsItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from . import graph_layout
+from .graph_processor import GraphProcessor
+
+NODE_RADIUS = 14.0
+ARROW_SIZE = 8.0
+# por debajo de estos niveles de detalle se simplifica el dibujo
+LOD_LABEL = 0.6
+LOD_SHAPE = 0.2
+LOD_ARROWS = 0.4
+MIN_ZOOM = 0.01
+MAX_ZOOM = 8.0
+CLICK_DISTANCE = 4  # píxeles que puede moverse el ratón en un clic
+
+KIND_COLORS = {
+    graph_layout.DEATH: QColor(220, 60, 60),
+    graph_layout.RESPAWN: QColor(240, 160, 40),
+    graph_layout.TERMINAL: QColor(80, 190, 100),
+    graph_layout.NORMAL: QColor(80, 140, 220),
+    graph_layout.EXTERNAL: QColor(130, 130, 130),
+}
+KIND_NAMES = {
+    graph_layout.DEATH: "muerte",
+    graph_layout.RESPAWN: "respawn",
+    graph_layout.TERMINAL: "salida",
+    graph_layout.NORMAL: "normal",
+    graph_layout.EXTERNAL: "otra escena",
+}
+EDGE_COLOR = QColor(150, 150, 150)
+CURRENT_COLOR = QColor(255, 220, 0)
+
+
+def _lod(painter):
+    return QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+
+
+class _NodeItem(QGraphicsItem):
+    """nodo del grafo; se simplifica al alejar el zoom"""
+
+    def __init__(self, mem, kind, label, tooltip, font, root=False):
+        super().__init__()
+        self.mem = mem
+        self._font = font
+        self.current = False
+        self._label = label
+        self._brush = QBrush(KIND_COLORS[kind])
+        self._pen = QPen(Qt.GlobalColor.white if root else Qt.GlobalColor.black)
+        self._pen.setWidthF(3.0 if root else 1.0)
+        self._current_pen = QPen(CURRENT_COLOR, 4.0)
+        self._rect = QRectF(
+            -NODE_RADIUS, -NODE_RADIUS, 2 * NODE_RADIUS, 2 * NODE_RADIUS
+        )
+        self._bounds = self._rect.adjusted(-4, -4, 4, 4)
+        self._bounds.setBottom(self._rect.bottom() + 18)
+        self.setToolTip(tooltip)
+        self.setZValue(1)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def set_current(self, current):
+        if current != self.current:
+            self.current = current
+            self.update()
+
+    def paint(self, painter, option, widget=None):
+        lod = _lod(painter)
+        if lod < LOD_SHAPE:
+            painter.fillRect(self._rect, CURRENT_COLOR if self.current else self._brush)
+            return
+        painter.setBrush(self._brush)
+        painter.setPen(self._current_pen if self.current else self._pen)
+        painter.drawEllipse(self._rect)
+        if lod >= LOD_LABEL:
+            painter.setPen(Qt.GlobalColor.white)
+            painter.setFont(self._font)
+            painter.drawText(
+                QRectF(-60, NODE_RADIUS, 120, 16),
+                Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop,
+                self._label,
+            )
+
+
+class _EdgesItem(QGraphicsItem):
+    """aristas salientes de un nodo; las flechas solo se pintan de cerca"""
+
+    def __init__(self, start, ends):
+        super().__init__()
+        self._lines = QPainterPath()
+        self._arrows = QPainterPath()
+        for end in ends:
+            line = QLineF(start, end)
+            if line.length() <= 2 * NODE_RADIUS:
+                continue
+            # de borde a borde de los círculos
+            unit = line.unitVector()
+            d = QPointF(unit.dx(), unit.dy())
+            p0, p1 = start + d * NODE_RADIUS, end - d * NODE_RADIUS
+            self._lines.moveTo(p0)
+            self._lines.lineTo(p1)
+            normal = QPointF(-d.y(), d.x())
+            base = p1 - d * ARROW_SIZE
+            self._arrows.moveTo(p1)
+            self._arrows.lineTo(base + normal * (ARROW_SIZE / 2))
+            self._arrows.lineTo(base - normal * (ARROW_SIZE / 2))
+            self._arrows.closeSubpath()
+        self._bounds = self._lines.boundingRect().adjusted(
+            -ARROW_SIZE, -ARROW_SIZE, ARROW_SIZE, ARROW_SIZE
+        )
+        self._pen = QPen(EDGE_COLOR, 0)  # cosmético: 1 px con cualquier zoom
+        self.setZValue(0)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        painter.setPen(self._pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawPath(self._lines)
+        if _lod(painter) >= LOD_ARROWS:
+            painter.setBrush(EDGE_COLOR)
+            painter.drawPath(self._arrows)
+
+
+class SceneGraphView(QGraphicsView):
+    """Vista del grafo con zoom (rueda), arrastre para moverse y clic en nodos"""
+
+    nodeClicked = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setBackgroundBrush(QColor(40, 40, 40))
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlags(
+            QGraphicsView.OptimizationFlag.DontSavePainterState
+            | QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing
+        )
+        self.label_font = QFont()
+        self.label_font.setPointSize(7)
+        self.items_by_mem = {}
+        self.current = None
+        self._press_pos = None
+
+    def set_graph(self, G, positions, root=None):
+        """reemplaza el grafo mostrado"""
+        processor = GraphProcessor()
+        scene = self.scene()
+        scene.clear()
+        self.items_by_mem = {}
+        self.current = None
+
+        points = {
+            mem: QPointF(*positions[mem]) for mem in G.nodes() if mem in positions
+        }
+        for mem, point in points.items():
+            ends = [points[s] for s in G.successors(mem) if s in points]
+            if ends:
+                edges = _EdgesItem(point, ends)
+                scene.addItem(edges)
+
+        for mem, point in points.items():
+            node = G.nodes[mem].get("data")
+            kind = graph_layout.node_kind(node, processor)
+            frames = processor.node_frames(node) if node else 0
+            tooltip = f"{mem}\n{KIND_NAMES[kind]}"
+            if frames:
+                v = node.get("value", {})
+                start = processor.frame_val(v.get("ptr_frame_start"))
+                tooltip += f"\nFrames: {start}-{start + frames - 1} ({frames})"
+            scene_id = G.nodes[mem].get("scene")
+            if scene_id is not None:
+                tooltip += f"\nEscena: {scene_id}"
+            item = _NodeItem(
+                mem, kind, mem[-5:], tooltip, self.label_font, root=mem == root
+            )
+            item.setPos(point)
+            scene.addItem(item)
+            self.items_by_mem[mem] = item
+
+        scene.setSceneRect(scene.itemsBoundingRect().adjusted(-40, -40, 40, 40))
+        self.fit()
+
+    def clear(self):
+        self.scene().clear()
+        self.items_by_mem = {}
+        self.current = None
+
+    def fit(self):
+        """encaja todo el grafo en la vista (sin pasar de zoom 1)"""
+        rect = self.scene().sceneRect()
+        if rect.isEmpty():
+            return
+        self.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
+        if self.transform().m11() > 1.0:
+            self.resetTransform()
+            self.centerOn(rect.center())
+        self._update_antialiasing()
+
+    def set_current(self, mem):
+        """resalta un nodo y lo hace visible si está fuera de la vista"""
+        previous = self.items_by_mem.get(self.current)
+        if previous is not None:
+            previous.set_current(False)
+        self.current = mem
+        item = self.items_by_mem.get(mem)
+        if item is None:
+            return
+        item.set_current(True)
+        if (
+            not self.mapToScene(self.viewport().rect())
+            .boundingRect()
+            .contains(item.pos())
+        ):
+            self.centerOn(item)
+
+    def _update_antialiasing(self):
+        # el antialiasing solo compensa cuando los nodos se ven grandes
+        self.setRenderHint(
+            QPainter.RenderHint.Antialiasing, self.transform().m11() >= LOD_LABEL
+        )
+
+    def wheelEvent(self, event):
+        factor = 1.15 ** (event.angleDelta().y() / 120)
+        zoom = self.transform().m11() * factor
+        if MIN_ZOOM <= zoom <= MAX_ZOOM:
+            self.scale(factor, factor)
+            self._update_antialiasing()
+        event.accept()
+
+    def mousePressEvent(self, event):
+        self._press_pos = event.position().toPoint()
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        pos = event.position().toPoint()
+        if (
+            event.button() != Qt.MouseButton.LeftButton
+            or self._press_pos is None
+            or (pos - self._press_pos).manhattanLength() > CLICK_DISTANCE
+        ):
+            return
+        # un clic sin arrastrar sobre un nodo
+        for item in self.items(pos):
+            if isinstance(item, _NodeItem):
+                self.nodeClicked.emit(item.mem)
+                break
+
+
+class SceneGraphPanel(QWidget):
+    """Grafo de la escena actual con el layout calculado en segundo plano"""
+
+    nodeClicked = Signal(str)
+    # (generación, grafo, posiciones, raíz) desde el hilo del layout
+    _layoutReady = Signal(int, object, object, object)
+
+    def __init__(self, layout_cache=None):
+        super().__init__()
+        self.layout_cache = layout_cache or graph_layout.GraphLayoutCache()
+        self.scene_nodes = []
+        self.scene_root = None
+        self.game_data = None
+        self._generation = 0
+        self._pending = False
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #666; padding: 2px;")
+        self.game_check = QCheckBox("Juego completo")
+        self.game_check.setToolTip("Mostrar todas las escenas unidas en un grafo")
+        self.game_check.setEnabled(False)
+        self.game_check.toggled.connect(self._request)
+        self.legend_label = QLabel(self._legend())
+
+        self.view = SceneGraphView()
+        self.view.nodeClicked.connect(self._on_node_clicked)
+        self._layoutReady.connect(self._on_layout_ready)
+
+        header = QHBoxLayout()
+        header.addWidget(self.status_label, 1)
+        header.addWidget(self.legend_label)
+        header.addWidget(self.game_check)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header)
+        layout.addWidget(self.view, 1)
+        self.setLayout(layout)
+        self.setMinimumHeight(200)
+
+    @staticmethod
+    def _legend():
+        return " ".join(
+            f'<span style="color: {KIND_COLORS[kind].name()};">●</span> {name}'
+            for kind, name in KIND_NAMES.items()
+        )
+
+    def set_game_data(self, data):
+        """JSON completo para la vista del juego entero"""
+        self.game_data = data
+        self.game_check.setEnabled(data is not None)
+
+    def show_scene(self, nodes, root=None):
+        """muestra el grafo de una escena (lista de nodos del chunk)"""
+        self.scene_nodes = nodes
+        self.scene_root = root
+        if not self.game_check.isChecked():
+            self._request()
+
+    def set_current(self, mem):
+        self.view.set_current(mem)
+
+    def _request(self):
+        """pide el layout del grafo actual; solo se calcula si el panel se ve"""
+        self._generation += 1
+        self._pending = True
+        if self.isVisible():
+            self._start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._pending:
+            self._start()
+
+    def _start(self):
+        self._pending = False
+        generation = self._generation
+        merged = self.game_check.isChecked() and self.game_data is not None
+        self.status_label.setText("Calculando layout...")
+        worker = threading.Thread(
+            target=self._compute,
+            args=(
+                generation,
+                self.game_data if merged else None,
+                self.scene_nodes,
+                self.scene_root,
+            ),
+            daemon=True,
+        )
+        worker.start()
+
+    def _compute(self, generation, game_data, nodes, root):
+        """hilo del layout: construye el grafo y lo coloca (sin tocar Qt)"""
+        processor = GraphProcessor()
+        if game_data is not None:
+            G, _ = processor.build_game_graph(game_data)
+            order = game_data.get("scene_order", [])
+            root = order[0] if order else None
+        else:
+            G, _ = processor.build_graph(nodes)
+        positions = self.layout_cache.layout(G)
+        self._layoutReady.emit(generation, G, positions, root)
+
+    def _on_layout_ready(self, generation, G, positions, root):
+        # un cambio de escena mientras se calculaba deja este layout obsoleto
+        if generation != self._generation:
+            return
+        current = self.view.current
+        self.view.set_graph(G, positions, root)
+        self.view.set_current(current)
+        self.status_label.setText(
+            f"{G.number_of_nodes()} nodos, {G.number_of_edges()} aristas"
+        )
+
+    def _on_node_clicked(self, mem):
+        self.view.set_current(mem)
+        self.nodeClicked.emit(mem)
@@ -0,0 +1,316 @@
+"""
+Índice de hashes perceptuales de todos los frames de un vídeo.
+
+La construcción reparte el vídeo en segmentos entre procesos; cada uno
+decodifica su segmento de forma secuencial y calcula el dHash por lotes
+directamente en un .npy de uint64 compartido (mmap).
+
+Las consultas usan multi-index hashing: el hash de 64 bits se parte en 4
+trozos de 16 bits y, por el principio del palomar, si dos hashes están a
+distancia <= r al menos uno de los trozos está a distancia <= r // 4. Cada
+trozo tiene una tabla ordenada en la que se buscan con searchsorted todos
+los valores de 16 bits a esa distancia del trozo consultado, y solo esos
+candidatos se comparan bit a bit. Para radios grandes (r // 4 > 2) hay
+tantos valores que probar que se compara con todos (popcount vectorizado).
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .calibration import Calibration
+from .phash import dhash_batch, hamming
+
+CHUNKS = 4
+CHUNK_BITS = 64 // CHUNKS
+# 137 valores por trozo; con 697 (r // 4 = 3) ya compensa comparar con todos
+MAX_SUB_RADIUS = 2
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+@lru_cache
+def _flip_masks(sub_radius):
+    """máscaras de CHUNK_BITS bits con como mucho sub_radius bits a 1"""
+    masks = np.arange(1 << CHUNK_BITS, dtype=np.uint64)
+    return masks[hamming(masks, np.uint64(0)) <= sub_radius]
+
+
+class FrameHashIndex:
+    """dHash de cada frame del vídeo con búsqueda por distancia de Hamming"""
+
+    DATA_SUFFIX = ".dhash.npy"
+    META_SUFFIX = ".dhash.json"
+    VERSION = 1
+    SEGMENT_FRAMES = 1500
+    BATCH_FRAMES = 256  # frames que se hashean de una vez
+
+    def __init__(self, hashes, calibration=None):
+        self.hashes = hashes  # uint64 (frames del vídeo,)
+        self.calibration = calibration if calibration is not None else Calibration()
+        self._build_tables()
+
+    def _build_tables(self):
+        """tabla ordenada por cada trozo de 16 bits"""
+        mask = np.uint64((1 << CHUNK_BITS) - 1)
+        self._orders = []
+        self._sorted = []
+        for c in range(CHUNKS):
+            values = (self.hashes >> np.uint64(c * CHUNK_BITS)) & mask
+            order = np.argsort(values, kind="stable")
+            self._orders.append(order)
+            self._sorted.append(values[order])
+
+    @staticmethod
+    def paths(video_path):
+        video_path = Path(video_path)
+        return (
+            video_path.with_name(video_path.name + FrameHashIndex.DATA_SUFFIX),
+            video_path.with_name(video_path.name + FrameHashIndex.META_SUFFIX),
+        )
+
+    @classmethod
+    def open(cls, video_path):
+        """Abre el índice del vídeo si existe, está completo y es de este vídeo"""
+        data_path, meta_path = cls.paths(video_path)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if (
+            meta.get("version") != cls.VERSION
+            or not meta.get("complete")
+            or meta.get("source") != _source_info(video_path)
+        ):
+            return None
+
+        try:
+            hashes = np.load(data_path, mmap_mode="r")
+        except OSError, ValueError:
+            return None
+        return cls(np.asarray(hashes), Calibration.for_video(video_path))
+
+    def _candidates(self, h, sub_radius=0):
+        """frames con algún trozo de 16 bits a distancia <= sub_radius del de h"""
+        mask = (1 << CHUNK_BITS) - 1
+        flips = _flip_masks(sub_radius)
+        found = []
+        for c in range(CHUNKS):
+            values = np.uint64((h >> (c * CHUNK_BITS)) & mask) ^ flips
+            lo = np.searchsorted(self._sorted[c], values, side="left")
+            hi = np.searchsorted(self._sorted[c], values, side="right")
+            hit = hi > lo
+            found += [self._orders[c][a:b] for a, b in zip(lo[hit], hi[hit])]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def search(self, h, k=10, radius=8):
+        """
+        Frames más parecidos a un hash.
+
+        Args:
+            h: dHash (int) del frame buscado
+            k: máximo de resultados
+            radius: distancia de Hamming máxima
+
+        Returns:
+            lista de (frame del laserdisc, frame del vídeo, distancia)
+        """
+        h = int(h)
+        sub_radius = radius // CHUNKS
+        if sub_radius <= MAX_SUB_RADIUS:
+            # principio del palomar: algún trozo está a distancia <= sub_radius
+            frames = self._candidates(h, sub_radius)
+            dist = hamming(self.hashes[frames], np.uint64(h))
+        else:
+            frames = np.arange(len(self.hashes))
+            dist = hamming(self.hashes, np.uint64(h))
+
+        keep = dist <= radius
+        frames, dist = frames[keep], dist[keep]
+        best = np.argsort(dist, kind="stable")[:k]
+        return [
+            (
+                self.calibration.to_laserdisc(int(frames[i])),
+                int(frames[i]),
+                int(dist[i]),
+            )
+            for i in best
+        ]
+
+    def search_frame(self, frame, k=10, radius=8):
+        """como search, a partir de una imagen BGR (captura, frame de otra copia...)"""
+        return self.search(dhash_batch([frame])[0], k, radius)
+
+
+def _hash_segment(job):
+    """dHash de un segmento del vídeo en su sitio del mmap (proceso del pool)"""
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, data_path, start, end, batch = job
+    hashes = np.load(data_path, mmap_mode="r+")
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+
+    done = 0
+    frames = []
+    try:
+        for frame_number in range(start, end + 1):
+            frame = accessor.read(frame_number)
+            if frame is None:
+                break
+            frames.append(frame)
+            if len(frames) == batch:
+                hashes[start + done : start + done + batch] = dhash_batch(frames)
+                done += batch
+                frames = []
+        if frames:
+            hashes[start + done : start + done + len(frames)] = dhash_batch(frames)
+            done += len(frames)
+    finally:
+        cap.release()
+        hashes.flush()
+
+    return done == end - start + 1
+
+
+def build(video_path, workers=None, segment_frames=None):
+    """
+    Calcula el dHash de todos los frames del vídeo.
+
+    Args:
+        video_path: vídeo a indexar
+        workers: procesos del pool (por defecto uno por núcleo)
+        segment_frames: frames por tarea
+
+    Returns:
+        FrameHashIndex o None si falló
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .frame_access import KeyframeIndex
+
+    segment_frames = segment_frames or FrameHashIndex.SEGMENT_FRAMES
+
+    keyframes = KeyframeIndex.for_video(video_path)
+    if keyframes is None:
+        print(f"Error: no se pudo abrir {video_path}")
+        return None
+    total = keyframes.total_frames
+
+    data_path, meta_path = FrameHashIndex.paths(video_path)
+    meta_path.unlink(missing_ok=True)
+    np.lib.format.open_memmap(
+        data_path, mode="w+", dtype=np.uint64, shape=(total,)
+    ).flush()
+
+    jobs = [
+        (
+            str(video_path),
+            str(data_path),
+            start,
+            min(start + segment_frames, total) - 1,
+            FrameHashIndex.BATCH_FRAMES,
+        )
+        for start in range(0, total, segment_frames)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        complete = all(pool.map(_hash_segment, jobs))
+
+    if not complete:
+        print("Error: no se pudieron decodificar todos los frames")
+        return None
+
+    # los metadatos se escriben al final: si no existen, el índice no está completo
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": FrameHashIndex.VERSION,
+                "source": _source_info(video_path),
+                "total_frames": total,
+                "complete": True,
+            },
+            f,
+        )
+
+    return FrameHashIndex.open(video_path)
+
+
+def main():
+    import argparse
+    import time
+
+    import cv2
+
+    parser = argparse.ArgumentParser(
+        description="Índice de dHash de los frames de un vídeo"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="indexa todos los frames del vídeo")
+    build_parser.add_argument("video")
+    build_parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    build_parser.add_argument(
+        "--segment", type=int, default=FrameHashIndex.SEGMENT_FRAMES
+    )
+
+    query_parser = sub.add_parser("query", help="¿de qué frame es esta imagen?")
+    query_parser.add_argument("video", help="vídeo indexado")
+    query_parser.add_argument("images", nargs="*", help="imágenes a buscar")
+    query_parser.add_argument(
+        "--from-video", help="buscar frames de otro vídeo en lugar de imágenes"
+    )
+    query_parser.add_argument("--frame", type=int, nargs="*", default=[])
+    query_parser.add_argument("-k", type=int, default=5)
+    query_parser.add_argument("-r", "--radius", type=int, default=8)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "build":
+        index = build(args.video, args.workers, args.segment)
+        if index is not None:
+            print(
+                f"{len(index.hashes)} frames indexados en "
+                f"{time.perf_counter() - t0:.1f}s"
+            )
+        return
+
+    index = FrameHashIndex.open(args.video)
+    if index is None:
+        print(f"No hay índice para {args.video}, ejecutar antes 'build'")
+        return
+    print(f"Índice cargado en {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    queries = [(path, cv2.imread(path)) for path in args.images]
+    if args.from_video:
+        cap = cv2.VideoCapture(args.from_video)
+        for n in args.frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, n)
+            ok, frame = cap.read()
+            queries.append((f"{args.from_video}#{n}", frame if ok else None))
+        cap.release()
+
+    for name, image in queries:
+        if image is None:
+            print(f"{name}: no se pudo leer")
+            continue
+        t0 = time.perf_counter()
+        results = index.search_frame(image, args.k, args.radius)
+        elapsed = (time.perf_counter() - t0) * 1000
+        found = ", ".join(f"{ld} (vídeo {v}, d={d})" for ld, v, d in results)
+        print(f"{name} [{elapsed:.1f} ms]: {found or 'sin coincidencias'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Calibración automática de los hitboxes respecto al vídeo.
+
+Las coordenadas de los hitboxes son de la pantalla Amiga (320x256) y no
+siempre cuadran con la imagen del vídeo. Se muestrean frames dentro de la
+ventana activa de los hitboxes de muchos nodos y, para cada uno, se
+calcula un mapa de energía a resolución Amiga (bordes más movimiento
+respecto al frame anterior) y su imagen integral. Después se puntúan a la
+vez todas las transformaciones candidatas (dx, dy, escala): para cada una,
+la energía media dentro de cada caja menos la de un marco alrededor,
+sumando sobre todas las cajas de todas las muestras. Con la imagen
+integral cada caja cuesta cuatro lecturas, así que cada escala se evalúa
+con una sola operación NumPy sobre la rejilla (dx, dy) x cajas.
+
+La transformación es x' = cx + (x - cx) * escala + dx (igual para y), con
+(cx, cy) el centro de la pantalla Amiga.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .calibration import Calibration
+from .graph_processor import GraphProcessor
+
+AMIGA_SIZE = (320, 256)
+CENTER = (AMIGA_SIZE[0] / 2, AMIGA_SIZE[1] / 2)
+IDENTITY = {"dx": 0, "dy": 0, "scale": 1.0}
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def transform_box(box, transform):
+    """(x0, y0, x1, y1) transformado con un dict dx/dy/scale"""
+    x0, y0, x1, y1 = box
+    s = transform.get("scale", 1.0)
+    dx, dy = transform.get("dx", 0), transform.get("dy", 0)
+    cx, cy = CENTER
+    return (
+        cx + (x0 - cx) * s + dx,
+        cy + (y0 - cy) * s + dy,
+        cx + (x1 - cx) * s + dx,
+        cy + (y1 - cy) * s + dy,
+    )
+
+
+def hitbox_samples(data, frames_per_node=3):
+    """
+    Frames del laserdisc a muestrear y cajas activas en cada uno.
+
+    Returns:
+        lista de (escena, frame, [(x0, y0, x1, y1), ...])
+    """
+    processor = GraphProcessor()
+    samples = []
+    seen = set()
+    for i, chunk in enumerate(data.get("chunks", [])):
+        scene = str(chunk.get("id", i))
+        for n in chunk.get("nodes", []):
+            v = n.get("value", {})
+            boxes = [
+                (h["x0"], h["y0"], h["x1"], h["y1"])
+                for h in (
+                    item.get("hitbox", {}) for item in v.get("lista_hitboxes", [])
+                )
+                if h
+                and h.get("x1", 0) > h.get("x0", 0)
+                and h.get("y1", 0) > h.get("y0", 0)
+            ]
+            start = processor.frame_val(v.get("ptr_frame_hitbox_start"))
+            end = processor.frame_val(v.get("ptr_frame_hitbox_end"))
+            if not boxes or start is None or end is None or end < start:
+                continue
+            key = (start, end, tuple(boxes))
+            if key in seen:
+                continue  # mismo nodo repetido en otro chunk
+            seen.add(key)
+            picks = np.linspace(start, end, frames_per_node + 2)[1:-1]
+            for frame in sorted({round(p) for p in picks}):
+                samples.append((scene, frame, boxes))
+    return samples
+
+
+def _energy(frame, previous):
+    """energía de bordes + movimiento a resolución Amiga"""
+    import cv2
+
+    gray = cv2.cvtColor(
+        cv2.resize(frame, AMIGA_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY
+    ).astype(np.float32)
+    edges = np.hypot(
+        cv2.Sobel(gray, cv2.CV_32F, 1, 0), cv2.Sobel(gray, cv2.CV_32F, 0, 1)
+    )
+    energy = edges / (edges.mean() + 1e-6)
+    if previous is not None:
+        prev = cv2.cvtColor(
+            cv2.resize(previous, AMIGA_SIZE, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        ).astype(np.float32)
+        motion = np.abs(gray - prev)
+        energy += motion / (motion.mean() + 1e-6)
+    return energy
+
+
+def _energy_maps(job):
+    """mapas de energía de un lote de frames del laserdisc (proceso del pool)"""
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, frames = job
+    calibration = Calibration.for_video(video_path)
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+    maps = np.zeros((len(frames), AMIGA_SIZE[1], AMIGA_SIZE[0]), dtype=np.float32)
+    valid = np.zeros(len(frames), dtype=bool)
+    try:
+        for i, ld_frame in enumerate(frames):
+            video_frame = calibration.to_video(ld_frame)
+            previous = accessor.read(video_frame - 1) if video_frame > 0 else None
+            frame = accessor.read(video_frame)
+            if frame is not None:
+                maps[i] = _energy(frame, previous)
+                valid[i] = True
+    finally:
+        cap.release()
+    return maps, valid
+
+
+def _integral(maps):
+    """imágenes integrales (S, alto + 1, ancho + 1) de un lote de mapas"""
+    ii = np.zeros((len(maps), maps.shape[1] + 1, maps.shape[2] + 1), dtype=np.float64)
+    ii[:, 1:, 1:] = maps.cumsum(axis=1).cumsum(axis=2)
+    return ii
+
+
+def _box_sums(ii, s, x0, y0, x1, y1):
+    """suma de cada caja con cuatro lecturas de la imagen integral"""
+    return ii[s, y1, x1] - ii[s, y0, x1] - ii[s, y1, x0] + ii[s, y0, x0]
+
+
+def score_transforms(ii, sample_idx, boxes, shifts, scales, margin=4):
+    """
+    Puntúa todas las transformaciones a la vez.
+
+    Args:
+        ii: imágenes integrales (S, 257, 321)
+        sample_idx: muestra de cada caja (B,)
+        boxes: cajas en coordenadas Amiga (B, 4)
+        shifts: desplazamientos a probar (array de enteros)
+        scales: escalas a probar
+        margin: ancho del marco alrededor de cada caja
+
+    Returns:
+        scores (escalas, dy, dx)
+    """
+    w, h = AMIGA_SIZE
+    cx, cy = CENTER
+    dx = shifts[None, :, None]
+    dy = shifts[:, None, None]
+    s = sample_idx[None, None, :]
+    scores = np.empty((len(scales), len(shifts), len(shifts)))
+
+    for k, scale in enumerate(scales):
+        bx0 = cx + (boxes[:, 0] - cx) * scale
+        by0 = cy + (boxes[:, 1] - cy) * scale
+        bx1 = cx + (boxes[:, 2] - cx) * scale
+        by1 = cy + (boxes[:, 3] - cy) * scale
+
+        # (dy, dx, cajas) de una vez
+        x0 = np.clip(np.rint(bx0 + dx), 0, w).astype(np.intp)
+        x1 = np.clip(np.rint(bx1 + dx), 0, w).astype(np.intp)
+        y0 = np.clip(np.rint(by0 + dy), 0, h).astype(np.intp)
+        y1 = np.clip(np.rint(by1 + dy), 0, h).astype(np.intp)
+        inner_area = (x1 - x0) * (y1 - y0)
+        inner = _box_sums(ii, s, x0, y0, x1, y1)
+
+        ox0, oy0 = np.maximum(x0 - margin, 0), np.maximum(y0 - margin, 0)
+        ox1, oy1 = np.minimum(x1 + margin, w), np.minimum(y1 + margin, h)
+        outer_area = (ox1 - ox0) * (oy1 - oy0)
+        outer = _box_sums(ii, s, ox0, oy0, ox1, oy1)
+
+        ring_area = outer_area - inner_area
+        contrast = np.where(
+            (inner_area > 0) & (ring_area > 0),
+            inner / np.maximum(inner_area, 1)
+            - (outer - inner) / np.maximum(ring_area, 1),
+            0.0,
+        )
+        scores[k] = contrast.mean(axis=2)
+    return scores
+
+
+def estimate(
+    video_path,
+    json_paths,
+    max_shift=20,
+    scales=None,
+    frames_per_node=3,
+    max_samples=600,
+    workers=None,
+    per_scene=False,
+):
+    """
+    Estima la transformación de los hitboxes para el vídeo.
+
+    Args:
+        video_path: vídeo
+        json_paths: JSON de escenas
+        max_shift: desplazamiento máximo en píxeles Amiga
+        scales: escalas candidatas (por defecto 0.90..1.10)
+        frames_per_node: frames muestreados por ventana de hitboxes
+        max_samples: tope de frames muestreados
+        workers: procesos del pool
+        per_scene: estimar además una transformación por escena
+
+    Returns:
+        dict con dx, dy, scale, score, samples (y scenes si per_scene)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .frame_access import KeyframeIndex
+
+    if scales is None:
+        scales = np.round(np.arange(0.90, 1.101, 0.02), 2)
+    scales = np.asarray(scales, dtype=np.float64)
+    shifts = np.arange(-max_shift, max_shift + 1)
+
+    samples = []
+    for json_path in json_paths:
+        with open(json_path, encoding="utf-8") as f:
+            samples += hitbox_samples(json.load(f), frames_per_node)
+    if len(samples) > max_samples:
+        picks = np.unique(np.linspace(0, len(samples) - 1, max_samples).round())
+        samples = [samples[int(i)] for i in picks]
+    if not samples:
+        return None
+
+    KeyframeIndex.for_video(video_path)
+    workers = workers or os.cpu_count()
+    frames = [frame for _, frame, _ in samples]
+    # lotes contiguos de frames ordenados: cada proceso avanza sin saltos grandes
+    order = np.argsort(frames, kind="stable")
+    batches = [b for b in np.array_split(order, workers) if len(b)]
+    jobs = [(str(video_path), [frames[i] for i in b]) for b in batches]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_energy_maps, jobs))
+
+    maps = np.empty((len(samples), AMIGA_SIZE[1], AMIGA_SIZE[0]), dtype=np.float32)
+    valid = np.zeros(len(samples), dtype=bool)
+    for b, (batch_maps, batch_valid) in zip(batches, results):
+        maps[b] = batch_maps
+        valid[b] = batch_valid
+    ii = _integral(maps)
+
+    def solve(sample_ids):
+        sample_idx = []
+        boxes = []
+        for i in sample_ids:
+            for box in samples[i][2]:
+                sample_idx.append(i)
+                boxes.append(box)
+        if not boxes:
+            return None
+        scores = score_transforms(
+            ii,
+            np.asarray(sample_idx),
+            np.asarray(boxes, dtype=np.float64),
+            shifts,
+            scales,
+        )
+        k, iy, ix = np.unravel_index(scores.argmax(), scores.shape)
+        return {
+            "dx": int(shifts[ix]),
+            "dy": int(shifts[iy]),
+            "scale": float(scales[k]),
+            "score": float(scores[k, iy, ix]),
+            "samples": len(set(sample_ids)),
+        }
+
+    ids = np.flatnonzero(valid)
+    result = solve(ids)
+    if result is not None and per_scene:
+        scenes = {}
+        for scene in sorted({samples[i][0] for i in ids}):
+            scene_result = solve([i for i in ids if samples[i][0] == scene])
+            if scene_result is not None:
+                scenes[scene] = scene_result
+        result["scenes"] = scenes
+    return result
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Estima el desplazamiento y la escala de los hitboxes sobre el vídeo"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", nargs="+", help="JSON de escenas")
+    parser.add_argument("--max-shift", type=int, default=20, help="en píxeles Amiga")
+    parser.add_argument("--frames-per-node", type=int, default=3)
+    parser.add_argument("--max-samples", type=int, default=600)
+    parser.add_argument("--per-scene", action="store_true")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = estimate(
+        args.video,
+        args.json,
+        args.max_shift,
+        frames_per_node=args.frames_per_node,
+        max_samples=args.max_samples,
+        workers=args.workers,
+        per_scene=args.per_scene,
+    )
+    if result is None:
+        print("No hay hitboxes con ventana de frames que muestrear")
+        return
+
+    calibration = Calibration.for_video(args.video)
+    if not calibration.source:
+        calibration.source = _source_info(args.video)
+    calibration.hitbox = result
+    calibration.save(Calibration.path_for(args.video))
+
+    print(
+        f"dx={result['dx']:+d} dy={result['dy']:+d} escala={result['scale']:.2f} "
+        f"({result['samples']} frames, {time.perf_counter() - t0:.1f}s)"
+    )
+    for scene, r in result.get("scenes", {}).items():
+        print(
+            f"  escena {scene}: dx={r['dx']:+d} dy={r['dy']:+d} escala={r['scale']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from PySide6.QtWidgets import (
+    QDoubleSpinBox,
     QHBoxLayout,
     QLabel,
     QPushButton,
@@ -15,6 +16,7 @@ class HitboxControlsPanel(QWidget):
         super().__init__()
         self.offset_x_spin = None
         self.offset_y_spin = None
+        self.scale_spin = None
         self.select_all_btn = None
         self.deselect_all_btn = None
         self._create_layout()
@@ -45,7 +47,7 @@ class HitboxControlsPanel(QWidget):
         return layout
 
     def _create_offset_controls(self):
-        """controles de offset X e Y"""
+        """controles de offset X e Y y escala"""
         layout = QVBoxLayout()
 
         offset_label = QLabel("Offset Global:")
@@ -70,6 +72,16 @@ class HitboxControlsPanel(QWidget):
         offset_xy_layout.addWidget(offset_y_label)
         offset_xy_layout.addWidget(self.offset_y_spin)
 
+        scale_label = QLabel("Escala:")
+        self.scale_spin = QDoubleSpinBox()
+        self.scale_spin.setRange(0.5, 2.0)
+        self.scale_spin.setSingleStep(0.01)
+        self.scale_spin.setDecimals(2)
+        self.scale_spin.setValue(1.0)
+
+        offset_xy_layout.addWidget(scale_label)
+        offset_xy_layout.addWidget(self.scale_spin)
+
         layout.addWidget(offset_label)
         layout.addLayout(offset_xy_layout)
 
@@ -81,6 +93,21 @@ class HitboxControlsPanel(QWidget):
             return (self.offset_x_spin.value(), self.offset_y_spin.value())
         return (0, 0)
 
+    def get_scale_value(self):
+        """return de la escala actual"""
+        return self.scale_spin.value() if self.scale_spin else 1.0
+
+    def set_transform(self, offset_x, offset_y, scale):
+        """pone los valores sin emitir una señal por cada control"""
+        spins = (self.offset_x_spin, self.offset_y_spin, self.scale_spin)
+        for spin in spins:
+            spin.blockSignals(True)
+        self.offset_x_spin.setValue(offset_x)
+        self.offset_y_spin.setValue(offset_y)
+        self.scale_spin.setValue(scale)
+        for spin in spins:
+            spin.blockSignals(False)
+
     def connect_select_buttons(self, select_all_callback, deselect_all_callback):
         """callbacks de los botones de selección"""
         if self.select_all_btn and self.deselect_all_btn:
@@ -0,0 +1,129 @@
+"""
+Intervalos de frames ([inicio, fin], ambos incluidos) en arrays ordenados.
+
+La línea de tiempo pide dos cosas en cada repintado:
+
+- los intervalos que tocan el rango visible (cuando caben como barras)
+- la cobertura por cubos del rango visible (cuando no caben)
+
+Las dos salen de búsquedas binarias sobre arrays precalculados, así que el
+coste depende de los píxeles y de lo que se ve, no del total de intervalos.
+"""
+
+import numpy as np
+
+from .graph_processor import GraphProcessor
+
+
+class IntervalSet:
+    """Conjunto de intervalos de frames ordenado por inicio"""
+
+    def __init__(self, intervals=()):
+        arr = np.asarray(
+            [
+                (s, e)
+                for s, e in intervals
+                if s is not None and e is not None and s <= e
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        order = np.argsort(arr[:, 0], kind="stable")
+        self.starts = arr[order, 0]
+        self.ends = arr[order, 1]
+        # los intervalos que tocan x empiezan en [x - max_len, x]
+        self.max_len = int((self.ends - self.starts).max()) if len(arr) else 0
+
+        # unión de los intervalos (disjuntos) y frames cubiertos acumulados
+        merged_starts, merged_ends = [], []
+        for s, e in zip(self.starts.tolist(), self.ends.tolist()):
+            if merged_ends and s <= merged_ends[-1] + 1:
+                merged_ends[-1] = max(merged_ends[-1], e)
+            else:
+                merged_starts.append(s)
+                merged_ends.append(e)
+        self._m_starts = np.asarray(merged_starts, dtype=np.int64)
+        self._m_ends = np.asarray(merged_ends, dtype=np.int64)
+        lengths = self._m_ends - self._m_starts + 1
+        self._m_before = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def span(self):
+        """(primer frame, último frame) o None si está vacío"""
+        if not len(self.starts):
+            return None
+        return int(self.starts[0]), int(self._m_ends[-1])
+
+    def visible(self, lo, hi):
+        """(inicios, fines) de los intervalos que tocan [lo, hi]"""
+        i0 = np.searchsorted(self.starts, lo - self.max_len, side="left")
+        i1 = np.searchsorted(self.starts, hi, side="right")
+        starts, ends = self.starts[i0:i1], self.ends[i0:i1]
+        inside = ends >= lo
+        return starts[inside], ends[inside]
+
+    def count_visible(self, lo, hi):
+        """cota superior del número de intervalos en [lo, hi] (sin recorrerlos)"""
+        i0 = np.searchsorted(self.starts, lo - self.max_len, side="left")
+        i1 = np.searchsorted(self.starts, hi, side="right")
+        return int(i1 - i0)
+
+    def _covered_before(self, x):
+        """frames cubiertos menores que x (vectorizado)"""
+        x = np.asarray(x, dtype=np.int64)
+        if not len(self._m_starts):
+            return np.zeros(x.shape, dtype=np.int64)
+        k = np.searchsorted(self._m_starts, x, side="right") - 1
+        kc = np.maximum(k, 0)
+        inside = np.clip(
+            x - self._m_starts[kc], 0, self._m_ends[kc] - self._m_starts[kc] + 1
+        )
+        return np.where(k >= 0, self._m_before[kc] + inside, 0)
+
+    def coverage(self, lo, hi, buckets):
+        """
+        Fracción cubierta de cada cubo al partir [lo, hi] en cubos iguales.
+
+        Args:
+            lo: primer frame del rango
+            hi: último frame del rango
+            buckets: número máximo de cubos (normalmente uno por columna de
+                píxeles); nunca hay más cubos que frames en el rango
+
+        Returns:
+            ndarray de floats entre 0 y 1
+        """
+        buckets = max(1, min(buckets, hi - lo + 1))
+        edges = np.linspace(lo, hi + 1, buckets + 1)
+        edges = np.round(edges).astype(np.int64)
+        covered = np.diff(self._covered_before(edges))
+        sizes = np.maximum(np.diff(edges), 1)
+        return covered / sizes
+
+
+def node_windows(nodes):
+    """
+    Intervalos de los nodos del JSON y de sus ventanas de hitboxes.
+
+    Returns:
+        tuple: (IntervalSet de nodos, IntervalSet de ventanas de hitboxes)
+    """
+    processor = GraphProcessor()
+    frames, hitboxes = [], []
+    for node in nodes:
+        v = node.get("value", {})
+        frames.append(
+            (
+                processor.frame_val(v.get("ptr_frame_start")),
+                processor.frame_val(v.get("ptr_frame_end")),
+            )
+        )
+        if v.get("lista_hitboxes"):
+            hitboxes.append(
+                (
+                    processor.frame_val(v.get("ptr_frame_hitbox_start")),
+                    processor.frame_val(v.get("ptr_frame_hitbox_end")),
+                )
+            )
+    return IntervalSet(frames), IntervalSet(hitboxes)
@@ -0,0 +1,272 @@
+"""
+Modelos Qt de los paneles de hitboxes y de paths/nodos.
+
+Las vistas (QTableView, QListView) solo pintan las filas visibles y se
+actualizan con las señales del modelo, así que cambiar de nodo o de escena
+no crea widgets ni vuelve a parsear hojas de estilo. El botón de
+reproducción de cada hitbox lo pinta un delegado en lugar de ser un
+QPushButton por fila.
+"""
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QBrush, QColor, QFont
+from PySide6.QtWidgets import (
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+)
+
+from .colors import HITBOX_RGB
+
+_ROOT = QModelIndex()  # índice raíz por defecto de rowCount/columnCount
+
+
+class HitboxListModel(QAbstractTableModel):
+    """Hitboxes del nodo actual: columna marcable con su color y columna de frames"""
+
+    checkedChanged = Signal()
+
+    HITBOX_COLUMN = 0
+    PLAY_COLUMN = 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hitboxes = []  # copias con color_index, las que se dibujan
+        self.originals = []  # coordenadas del JSON, las que se muestran
+        self.checked = []
+        # se crean una vez: data() se llama por cada fila visible en cada repintado
+        self._brushes = [QBrush(QColor(*rgb)) for rgb in HITBOX_RGB]
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def set_hitboxes(self, hitboxes):
+        self.beginResetModel()
+        self.originals = [hb.copy() for hb in hitboxes]
+        self.hitboxes = [{**hb, "color_index": i} for i, hb in enumerate(hitboxes)]
+        self.checked = [False] * len(hitboxes)
+        self.endResetModel()
+        self.checkedChanged.emit()
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self.hitboxes)
+
+    def columnCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else 2
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled
+        if index.column() == self.HITBOX_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def frame_range(self, row):
+        """(inicio, fin) de la ventana del hitbox o None"""
+        hb = self.originals[row]
+        start, end = hb.get("frame_start"), hb.get("frame_end")
+        if start is None or end is None:
+            return None
+        return start, end
+
+    def _tooltip(self, row):
+        hb = self.originals[row]
+        x0, y0 = hb.get("x0", 0), hb.get("y0", 0)
+        x1, y1 = hb.get("x1", 0), hb.get("y1", 0)
+        tooltip = f"""Hitbox #{row + 1}
+Puntos: {hb.get("points", 500)}
+Coordenadas: ({x0}, {y0}) → ({x1}, {y1})
+Hexadecimal: (0x{x0:02X}, 0x{y0:02X}) → (0x{x1:02X}, 0x{y1:02X})
+Ancho: {x1 - x0} px
+Alto: {y1 - y0} px"""
+        frames = self.frame_range(row)
+        if frames is not None:
+            start, end = frames
+            tooltip += f"\nFrames: {start} - {end} ({end - start + 1} frames)"
+        return tooltip
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+
+        if index.column() == self.PLAY_COLUMN:
+            frames = self.frame_range(row)
+            if frames is None:
+                return None
+            if role == Qt.ItemDataRole.DisplayRole:
+                return f"▶ {frames[0]}-{frames[1]}"
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return f"Reproducir frames {frames[0]}-{frames[1]}"
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            hb = self.originals[row]
+            return (
+                f"Hb {row + 1} ({hb.get('x0', 0)}, {hb.get('y0', 0)}) → "
+                f"({hb.get('x1', 0)}, {hb.get('y1', 0)})"
+            )
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return (
+                Qt.CheckState.Checked if self.checked[row] else Qt.CheckState.Unchecked
+            )
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._brushes[row % len(self._brushes)]
+        if role == Qt.ItemDataRole.FontRole:
+            return self._bold
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._tooltip(row)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.set_checked(index.row(), checked)
+        return True
+
+    def set_checked(self, row, checked):
+        if self.checked[row] == checked:
+            return
+        self.checked[row] = checked
+        index = self.index(row, self.HITBOX_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.checkedChanged.emit()
+
+    def set_all_checked(self, checked):
+        """marca o desmarca todas las filas con una sola notificación"""
+        if not self.checked or all(c == checked for c in self.checked):
+            return
+        self.checked = [checked] * len(self.checked)
+        self.dataChanged.emit(
+            self.index(0, self.HITBOX_COLUMN),
+            self.index(len(self.checked) - 1, self.HITBOX_COLUMN),
+            [Qt.ItemDataRole.CheckStateRole],
+        )
+        self.checkedChanged.emit()
+
+    def checked_hitboxes(self):
+        return [hb for hb, c in zip(self.hitboxes, self.checked) if c]
+
+
+class _CurrentRowModel(QAbstractListModel):
+    """lista de solo lectura con la fila actual en negrita"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.current = -1
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def set_items(self, items):
+        self.beginResetModel()
+        self.items = items
+        self.current = -1
+        self.endResetModel()
+
+    def set_current(self, row):
+        """cambia la fila actual notificando solo las dos filas afectadas"""
+        previous, self.current = self.current, row
+        for r in (previous, row):
+            if 0 <= r < len(self.items):
+                index = self.index(r)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.FontRole])
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._text(row, self.items[row])
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._tooltip(row, self.items[row])
+        if role == Qt.ItemDataRole.FontRole and row == self.current:
+            return self._bold
+        return None
+
+    def _text(self, row, item):
+        """texto de la fila; las subclases lo adaptan a sus elementos"""
+        return str(item)
+
+    def _tooltip(self, row, item):
+        return None
+
+
+class PathListModel(_CurrentRowModel):
+    """Paths de la escena (o los que pasan el filtro, con su número original)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ids = []
+
+    def set_items(self, items, ids=None):
+        self.ids = list(range(len(items))) if ids is None else ids
+        super().set_items(items)
+
+    def _text(self, row, path):
+        return (
+            f"Path {self.ids[row] + 1}: {len(path['nodes'])} nodos | "
+            f"{path.get('total_frames', 0)} frames | "
+            f"{path.get('total_hitboxes', 0)} hitboxes"
+        )
+
+
+class NodeListModel(_CurrentRowModel):
+    """Nodos del path actual"""
+
+    def _text(self, row, node):
+        start, end = node.get("frame_start"), node.get("frame_end")
+        text = f"Nodo {row + 1}: {node.get('mem', 'N/A')}"
+        if start is not None and end is not None:
+            text += f"  {start}-{end}"
+        if node.get("hitboxes"):
+            text += f"  ({len(node['hitboxes'])} hitboxes)"
+        if node.get("ptr_node_respawn"):
+            text += "  💀"
+        if node.get("death"):
+            text += "  ☠"
+        return text
+
+    def _tooltip(self, row, node):
+        if node.get("ptr_node_respawn"):
+            return f"Respawn: {node['ptr_node_respawn']}"
+        return None
+
+
+class PlayButtonDelegate(QStyledItemDelegate):
+    """Pinta un botón en las celdas con texto y emite clicked(fila) al pulsarlo"""
+
+    clicked = Signal(int)
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole)
+        if not text:
+            return
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 1, -2, -1)
+        button.text = text
+        button.state = QStyle.StateFlag.State_Enabled
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            button.state |= QStyle.StateFlag.State_MouseOver
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and index.data(Qt.ItemDataRole.DisplayRole)
+            and option.rect.contains(event.position().toPoint())
+        ):
+            self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
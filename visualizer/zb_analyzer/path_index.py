@@ -0,0 +1,166 @@
+"""
+Índice invertido de los paths de una escena para filtrarlos al vuelo.
+
+Se construye una vez por escena:
+
+- nodo (mem) -> ids de los paths que pasan por él
+- cubo de frames -> ids de los nodos cuyo rango toca ese cubo
+- por path: puntos, número de nodos, frames, si tiene respawn o muerte
+
+Cada filtro da una máscara booleana sobre los paths y la consulta es el AND
+de las máscaras, así que el coste de una consulta depende de los nodos que
+coinciden y no de recorrer todos los paths.
+"""
+
+import numpy as np
+
+BUCKET_FRAMES = 64
+
+
+class PathIndex:
+    """Índice de los graph_paths de una escena"""
+
+    def __init__(self, paths):
+        self.paths = paths
+        n = len(paths)
+
+        node_ids = {}  # mem -> id de nodo
+        node_paths = []  # id de nodo -> [ids de path]
+        node_ranges = []  # id de nodo -> (inicio, fin) o None
+        node_info = []  # id de nodo -> (puntos, respawn, muerte)
+        flat_paths = []  # (path, nodo) por cada paso de cada path
+        flat_nodes = []
+        for p, path in enumerate(paths):
+            for node in path.get("nodes", []):
+                mem = node.get("mem")
+                i = node_ids.get(mem)
+                if i is None:
+                    i = node_ids[mem] = len(node_paths)
+                    node_paths.append([])
+                    start, end = node.get("frame_start"), node.get("frame_end")
+                    node_ranges.append(
+                        (start, end) if start is not None and end is not None else None
+                    )
+                    node_info.append(
+                        (
+                            sum(hb.get("points", 0) or 0 for hb in node["hitboxes"]),
+                            bool(node.get("ptr_node_respawn")),
+                            bool(node.get("death")),
+                        )
+                    )
+                # un path puede repetir nodo (ciclos): el id se añade una vez
+                if not node_paths[i] or node_paths[i][-1] != p:
+                    node_paths[i].append(p)
+                flat_paths.append(p)
+                flat_nodes.append(i)
+
+        # agregados por path con bincount sobre los pasos
+        flat_paths = np.asarray(flat_paths, dtype=np.int64)
+        flat_nodes = np.asarray(flat_nodes, dtype=np.int64)
+        info = np.asarray(node_info, dtype=np.int64).reshape(-1, 3)
+        self.score = np.bincount(
+            flat_paths, weights=info[flat_nodes, 0], minlength=n
+        ).astype(np.int64)
+        self.length = np.bincount(flat_paths, minlength=n).astype(np.int32)
+        self.frames = np.array(
+            [p.get("total_frames", 0) for p in paths], dtype=np.int64
+        )
+        self.has_respawn = np.bincount(flat_paths, info[flat_nodes, 1], minlength=n) > 0
+        self.has_death = np.bincount(flat_paths, info[flat_nodes, 2], minlength=n) > 0
+
+        self.node_mems = list(node_ids)
+        self._node_ids = node_ids
+        self._node_paths = [np.asarray(ids, dtype=np.int32) for ids in node_paths]
+        self._node_start = np.array(
+            [r[0] if r else -1 for r in node_ranges], dtype=np.int64
+        )
+        self._node_end = np.array(
+            [r[1] if r else -2 for r in node_ranges], dtype=np.int64
+        )
+
+        buckets = {}
+        for i, r in enumerate(node_ranges):
+            if r is None or r[1] < r[0]:
+                continue
+            for b in range(r[0] // BUCKET_FRAMES, r[1] // BUCKET_FRAMES + 1):
+                buckets.setdefault(b, []).append(i)
+        self._buckets = {
+            b: np.asarray(ids, dtype=np.int32) for b, ids in buckets.items()
+        }
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _paths_of_nodes(self, node_ids):
+        """máscara de los paths que pasan por alguno de los nodos"""
+        mask = np.zeros(len(self.paths), dtype=bool)
+        for i in node_ids:
+            mask[self._node_paths[i]] = True
+        return mask
+
+    def paths_with_node(self, mem):
+        """ids de los paths que pasan por el nodo con ese mem"""
+        i = self._node_ids.get(mem)
+        if i is None:
+            return np.empty(0, dtype=np.int32)
+        return self._node_paths[i]
+
+    def nodes_matching(self, text):
+        """ids de los nodos cuyo mem contiene el texto (sin distinguir mayúsculas)"""
+        text = text.strip().lower()
+        exact = self._node_ids.get(text)
+        if exact is not None:
+            return [exact]
+        return [i for i, mem in enumerate(self.node_mems) if text in str(mem).lower()]
+
+    def nodes_at_frame(self, frame):
+        """ids de los nodos cuyo rango contiene el frame"""
+        candidates = self._buckets.get(frame // BUCKET_FRAMES)
+        if candidates is None:
+            return np.empty(0, dtype=np.int32)
+        inside = (self._node_start[candidates] <= frame) & (
+            frame <= self._node_end[candidates]
+        )
+        return candidates[inside]
+
+    def query(
+        self,
+        mem=None,
+        frame=None,
+        respawn=None,
+        death=None,
+        min_score=None,
+        min_length=None,
+        max_length=None,
+    ):
+        """
+        Paths que cumplen todos los filtros indicados.
+
+        Args:
+            mem: texto contenido en el mem de algún nodo del path
+            frame: frame del laserdisc que reproduce algún nodo del path
+            respawn: True/False para exigir o excluir nodos con respawn
+            death: True/False para exigir o excluir nodos que llevan a la muerte
+            min_score: puntos mínimos (suma de los hitboxes del path)
+            min_length: número mínimo de nodos
+            max_length: número máximo de nodos
+
+        Returns:
+            ndarray con los ids de los paths, en orden
+        """
+        mask = np.ones(len(self.paths), dtype=bool)
+        if mem:
+            mask &= self._paths_of_nodes(self.nodes_matching(mem))
+        if frame is not None:
+            mask &= self._paths_of_nodes(self.nodes_at_frame(frame))
+        if respawn is not None:
+            mask &= self.has_respawn == respawn
+        if death is not None:
+            mask &= self.has_death == death
+        if min_score is not None:
+            mask &= self.score >= min_score
+        if min_length is not None:
+            mask &= self.length >= min_length
+        if max_length is not None:
+            mask &= self.length <= max_length
+        return np.flatnonzero(mask)
@@ -0,0 +1,118 @@
+import time
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QComboBox,
+    QGridLayout,
+    QLabel,
+    QLineEdit,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .path_index import PathIndex
+
+
+class PathSearchPanel(QWidget):
+    """Panel de búsqueda y filtrado de los paths de la escena"""
+
+    # ids de los paths que cumplen los filtros
+    filterChanged = Signal(list)
+
+    TRISTATE = (("Todos", None), ("Con", True), ("Sin", False))
+
+    def __init__(self):
+        super().__init__()
+        self.index = PathIndex([])
+        self.last_query_ms = 0.0
+
+        self.mem_edit = QLineEdit()
+        self.mem_edit.setPlaceholderText("mem del nodo (p. ej. 0x00047b4e o 47b4)")
+        self.frame_edit = QLineEdit()
+        self.frame_edit.setPlaceholderText("frame")
+
+        self.respawn_combo = QComboBox()
+        self.respawn_combo.addItems([text for text, _ in self.TRISTATE])
+        self.death_combo = QComboBox()
+        self.death_combo.addItems([text for text, _ in self.TRISTATE])
+
+        # 0 = sin filtro
+        self.min_score_spin = QSpinBox()
+        self.min_score_spin.setRange(0, 10_000_000)
+        self.min_score_spin.setSingleStep(100)
+        self.min_score_spin.setSpecialValueText("-")
+        self.min_length_spin = QSpinBox()
+        self.min_length_spin.setRange(0, 1000)
+        self.min_length_spin.setSpecialValueText("-")
+        self.max_length_spin = QSpinBox()
+        self.max_length_spin.setRange(0, 1000)
+        self.max_length_spin.setSpecialValueText("-")
+
+        self.result_label = QLabel()
+        self.result_label.setStyleSheet("color: #666; padding: 2px;")
+
+        self._create_layout()
+
+        self.mem_edit.textChanged.connect(self.run_query)
+        self.frame_edit.textChanged.connect(self.run_query)
+        self.respawn_combo.currentIndexChanged.connect(self.run_query)
+        self.death_combo.currentIndexChanged.connect(self.run_query)
+        self.min_score_spin.valueChanged.connect(self.run_query)
+        self.min_length_spin.valueChanged.connect(self.run_query)
+        self.max_length_spin.valueChanged.connect(self.run_query)
+
+    def _create_layout(self):
+        grid = QGridLayout()
+        grid.setContentsMargins(0, 0, 0, 0)
+        grid.addWidget(QLabel("Nodo:"), 0, 0)
+        grid.addWidget(self.mem_edit, 0, 1, 1, 3)
+        grid.addWidget(QLabel("Frame:"), 1, 0)
+        grid.addWidget(self.frame_edit, 1, 1)
+        grid.addWidget(QLabel("Puntos ≥"), 1, 2)
+        grid.addWidget(self.min_score_spin, 1, 3)
+        grid.addWidget(QLabel("Respawn:"), 2, 0)
+        grid.addWidget(self.respawn_combo, 2, 1)
+        grid.addWidget(QLabel("Muerte:"), 2, 2)
+        grid.addWidget(self.death_combo, 2, 3)
+        grid.addWidget(QLabel("Nodos ≥"), 3, 0)
+        grid.addWidget(self.min_length_spin, 3, 1)
+        grid.addWidget(QLabel("Nodos ≤"), 3, 2)
+        grid.addWidget(self.max_length_spin, 3, 3)
+
+        header = QLabel("Buscar paths:")
+        header.setStyleSheet("font-weight: bold; margin-top: 10px;")
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(header)
+        layout.addLayout(grid)
+        layout.addWidget(self.result_label)
+        self.setLayout(layout)
+
+    def set_index(self, index):
+        """índice de la escena actual; se vuelven a aplicar los filtros"""
+        self.index = index
+        self.run_query()
+
+    def filters(self):
+        """filtros actuales como argumentos de PathIndex.query"""
+        frame_text = self.frame_edit.text().strip()
+        return {
+            "mem": self.mem_edit.text().strip() or None,
+            "frame": int(frame_text) if frame_text.isdigit() else None,
+            "respawn": self.TRISTATE[self.respawn_combo.currentIndex()][1],
+            "death": self.TRISTATE[self.death_combo.currentIndex()][1],
+            "min_score": self.min_score_spin.value() or None,
+            "min_length": self.min_length_spin.value() or None,
+            "max_length": self.max_length_spin.value() or None,
+        }
+
+    def run_query(self):
+        t0 = time.perf_counter()
+        ids = self.index.query(**self.filters()).tolist()
+        self.last_query_ms = (time.perf_counter() - t0) * 1000
+        self.result_label.setText(
+            f"{len(ids)} de {len(self.index)} paths ({self.last_query_ms:.1f} ms)"
+        )
+        self.filterChanged.emit(ids)
@@ -0,0 +1,86 @@
+"""
+Medidas de rendimiento de la reproducción para el HUD y el log [perf].
+
+Cada etapa del camino de un frame (decode en el hilo decodificador;
+convert, present y composite en la GUI) guarda sus últimas duraciones en
+una deque acotada. Desactivado, start() devuelve None sin leer el reloj y
+stop() sale en la primera comparación: es lo único que cuesta por frame.
+"""
+
+import os
+import time
+from collections import deque
+
+DECODE = "decode"  # VideoCapture / proxy, en el hilo decodificador
+CONVERT = "convert"  # resize y ndarray -> QPixmap
+COMPOSITE = "composite"  # paintEvent: frame, hitboxes y cruz
+PRESENT = "present"  # desde que se pide el repintado hasta el paintEvent
+STAGES = (DECODE, CONVERT, COMPOSITE, PRESENT)
+
+WINDOW = 120  # muestras por etapa (~5 s a 25 fps)
+FPS_WINDOW = 1.0  # segundos para los fps efectivos
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except AttributeError, ValueError, OSError:
+    _PAGE_SIZE = 4096
+
+
+def process_rss():
+    """memoria residente del proceso en bytes (None fuera de Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError, IndexError, ValueError:
+        return None
+
+
+class PerfStats:
+    """Duraciones por etapa y frames presentados, solo si está activo"""
+
+    def __init__(self, enabled=False, window=WINDOW):
+        self.enabled = enabled
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.presented = deque()  # instantes de presentación recientes
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled:
+            self.reset()
+
+    def reset(self):
+        for samples in self.samples.values():
+            samples.clear()
+        self.presented.clear()
+
+    def start(self):
+        """instante de inicio de una medida, None si está desactivado"""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, stage, t0):
+        """apunta la duración desde t0 (deque.append es atómico entre hilos)"""
+        if t0 is None:
+            return
+        self.samples[stage].append(time.perf_counter() - t0)
+
+    def frame_presented(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.presented.append(now)
+        while now - self.presented[0] > FPS_WINDOW:
+            self.presented.popleft()
+
+    def fps(self):
+        """frames presentados por segundo en el último FPS_WINDOW"""
+        now = time.perf_counter()
+        while self.presented and now - self.presented[0] > FPS_WINDOW:
+            self.presented.popleft()
+        return len(self.presented) / FPS_WINDOW
+
+    def stage_ms(self, stage):
+        """(media, máximo) en ms de las últimas muestras, o None"""
+        samples = list(self.samples[stage])  # copia: decode escribe desde otro hilo
+        if not samples:
+            return None
+        return sum(samples) / len(samples) * 1000, max(samples) * 1000
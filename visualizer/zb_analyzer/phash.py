@@ -0,0 +1,51 @@
+"""
+Hashes perceptuales de frames.
+
+dHash de 64 bits: el frame en grises se reduce a 9x8 y cada bit indica si
+un píxel es más claro que su vecino de la derecha. Es robusto a cambios de
+resolución, compresión y pequeños ajustes de brillo entre copias, y la
+distancia de Hamming entre dos hashes mide lo distintos que son los frames.
+"""
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8  # 8x8 bits -> uint64
+
+
+def _small_gray(frames):
+    """(N, 8, 9) en grises a partir de frames BGR"""
+    small = np.empty((len(frames), HASH_SIZE, HASH_SIZE + 1), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small[i] = cv2.resize(
+            gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA
+        )
+    return small
+
+
+def dhash_batch(frames):
+    """
+    dHash de un lote de frames.
+
+    Args:
+        frames: secuencia o array (N, alto, ancho[, 3]) de frames BGR o grises
+
+    Returns:
+        ndarray uint64 (N,)
+    """
+    if len(frames) == 0:
+        return np.empty(0, dtype=np.uint64)
+    small = _small_gray(frames)
+    bits = small[:, :, 1:] > small[:, :, :-1]  # (N, 8, 8), vectorizado
+    packed = np.packbits(bits.reshape(len(small), -1), axis=1)  # (N, 8) bytes
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def dhash(frame):
+    return int(dhash_batch([frame])[0])
+
+
+def hamming(a, b):
+    """distancia de Hamming entre hashes (con broadcasting de NumPy)"""
+    return np.bitwise_count(np.bitwise_xor(a, b))
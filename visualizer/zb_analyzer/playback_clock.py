@@ -0,0 +1,96 @@
+import math
+import time
+
+
+class PlaybackClock:
+    """
+    Reloj de reproducción sobre un reloj monotónico.
+
+    No cuenta ticks del temporizador: calcula cuántos frames deberían
+    haberse presentado desde que arrancó según los fps reales del vídeo y
+    la velocidad. Si un tick llega tarde, el reproductor sabe cuántos
+    frames saltarse para no acumular retraso.
+    """
+
+    DEFAULT_FPS = 25.0  # PAL, si el contenedor no informa
+
+    def __init__(self, fps=DEFAULT_FPS, speed=1.0):
+        self.fps = self._valid_fps(fps)
+        self.speed = speed
+        self.running = False
+        self._t0 = 0.0
+        self._base = 0  # pasos ya contados al re-anclar
+        self.reset_stats()
+
+    @classmethod
+    def _valid_fps(cls, fps):
+        if not fps or math.isnan(fps) or fps <= 0:
+            return cls.DEFAULT_FPS
+        return fps
+
+    @property
+    def frame_period(self):
+        """segundos entre frames a la velocidad actual"""
+        return 1.0 / (self.fps * self.speed)
+
+    def start(self):
+        """arranca desde cero (play, seek o inicio de loop)"""
+        self._t0 = time.perf_counter()
+        self._base = 0
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def _elapsed_steps(self, now):
+        return (now - self._t0) * self.fps * self.speed
+
+    def due(self, now=None):
+        """frames que deberían haberse presentado desde start()"""
+        if not self.running:
+            return 0
+        now = time.perf_counter() if now is None else now
+        return self._base + int(self._elapsed_steps(now))
+
+    def time_until(self, steps, now=None):
+        """segundos hasta que toque el paso steps (0 si ya tocaba)"""
+        now = time.perf_counter() if now is None else now
+        remaining = (steps - self._base) / (self.fps * self.speed) - (now - self._t0)
+        return max(0.0, remaining)
+
+    def set_fps(self, fps):
+        self._retime(fps=self._valid_fps(fps))
+
+    def set_speed(self, speed):
+        """cambia la velocidad sin saltos: se re-ancla en la posición actual"""
+        self._retime(speed=speed)
+
+    def _retime(self, fps=None, speed=None):
+        # los pasos ya transcurridos se conservan, y también la fracción
+        # del frame en curso, pero al nuevo ritmo
+        progress = 0.0
+        now = time.perf_counter()
+        if self.running:
+            elapsed = self._elapsed_steps(now)
+            self._base += int(elapsed)
+            progress = elapsed % 1
+
+        self.fps = fps or self.fps
+        self.speed = speed or self.speed
+        self._t0 = now - progress / (self.fps * self.speed)
+
+    # contadores
+
+    def reset_stats(self):
+        self.presented = 0
+        self.dropped = 0
+        self.late = 0
+
+    def stats(self):
+        return {
+            "fps": self.fps,
+            "speed": self.speed,
+            "presented": self.presented,
+            "dropped": self.dropped,
+            "late": self.late,
+        }
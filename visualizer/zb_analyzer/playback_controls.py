@@ -1,10 +1,19 @@
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
 
 
 class PlaybackControls(QWidget):
     """Panel de reproducción"""
 
+    SPEEDS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0)
+
     def __init__(self):
         super().__init__()
 
@@ -13,6 +22,12 @@ class PlaybackControls(QWidget):
         self.next_btn = QPushButton("Frame posterior")
         self.frame_label = QLabel("Frame: 0")
 
+        self.speed_combo = QComboBox()
+        for speed in self.SPEEDS:
+            self.speed_combo.addItem(f"{speed:g}x", speed)
+        self.speed_combo.setCurrentIndex(self.SPEEDS.index(1.0))
+        self.speed_combo.setToolTip("Velocidad de reproducción")
+
         self._create_layout()
 
     def _create_layout(self):
@@ -20,6 +35,7 @@ class PlaybackControls(QWidget):
         controls_layout.addWidget(self.prev_btn)
         controls_layout.addWidget(self.play_pause_btn)
         controls_layout.addWidget(self.next_btn)
+        controls_layout.addWidget(self.speed_combo)
 
         frame_layout = QHBoxLayout()
         frame_layout.addWidget(self.frame_label)
@@ -36,6 +52,11 @@ class PlaybackControls(QWidget):
         self.prev_btn.clicked.connect(prev_callback)
         self.next_btn.clicked.connect(next_callback)
 
+    def connect_speed(self, speed_callback):
+        self.speed_combo.currentIndexChanged.connect(
+            lambda: speed_callback(self.speed_combo.currentData())
+        )
+
     def update_frame_label(self, frame_number):
         self.frame_label.setText(f"Frame: {frame_number}")
 
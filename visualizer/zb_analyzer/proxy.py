@@ -0,0 +1,275 @@
+"""
+Vídeo proxy de baja resolución y caché de miniaturas.
+
+El generador recorre el vídeo una sola vez por segmentos, en paralelo, y
+por cada segmento escribe un AVI MJPG reducido (solo intra: cualquier frame
+se decodifica sin depender de otros) y las miniaturas de sus frames en un
+único .npy mapeado en memoria. Todo queda en un directorio junto al vídeo.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+class ProxyVideo:
+    """Lector del proxy MJPG por segmentos y de las miniaturas"""
+
+    DIR_SUFFIX = ".proxy"
+    INDEX_NAME = "index.json"
+    THUMBS_NAME = "thumbs.npy"
+    VERSION = 1
+    SEGMENT_FRAMES = 1500  # 1 minuto PAL por segmento
+    SCALE = 0.5
+    THUMB_WIDTH = 96
+
+    def __init__(self, directory, index):
+        self.directory = Path(directory)
+        self.index = index
+        self.total_frames = index["total_frames"]
+        self.segment_frames = index["segment_frames"]
+        self.width, self.height = index["size"]
+        self.thumbs = np.load(self.directory / self.THUMBS_NAME, mmap_mode="r")
+
+        # segmento abierto; solo lo usa el hilo decodificador
+        self._cap = None
+        self._segment = -1
+        self._position = 0
+
+    @classmethod
+    def directory_for(cls, video_path):
+        video_path = Path(video_path)
+        return video_path.with_name(video_path.name + cls.DIR_SUFFIX)
+
+    @staticmethod
+    def segment_path(directory, segment):
+        return Path(directory) / f"seg_{segment:05d}.avi"
+
+    @classmethod
+    def open(cls, video_path):
+        """Abre el proxy del vídeo si existe, está completo y es de este vídeo"""
+        directory = cls.directory_for(video_path)
+        try:
+            with open(directory / cls.INDEX_NAME, encoding="utf-8") as f:
+                index = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if (
+            index.get("version") != cls.VERSION
+            or not index.get("complete")
+            or index.get("source") != _source_info(video_path)
+        ):
+            return None
+
+        try:
+            return cls(directory, index)
+        except OSError, ValueError:
+            return None
+
+    def thumbnail(self, frame_number):
+        """vista (sin copia) de la miniatura o None si está fuera del vídeo"""
+        if 0 <= frame_number < len(self.thumbs):
+            return self.thumbs[frame_number]
+        return None
+
+    def read(self, frame_number):
+        """frame del proxy; MJPG es solo intra, el seek no decodifica nada más"""
+        if not 0 <= frame_number < self.total_frames:
+            return None
+
+        segment, offset = divmod(frame_number, self.segment_frames)
+        if segment != self._segment:
+            self.release()
+            self._cap = cv2.VideoCapture(
+                str(self.segment_path(self.directory, segment))
+            )
+            self._segment = segment
+            self._position = 0
+
+        if offset != self._position:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, offset)
+        ret, frame = self._cap.read()
+        if not ret:
+            self.release()
+            return None
+        self._position = offset + 1
+        return frame
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._cap = None
+        self._segment = -1
+
+
+def _build_segment(job):
+    """Decodifica un segmento y escribe su proxy y sus miniaturas (proceso del pool)"""
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, directory, segment, start, end, size, thumb_size, fps = job
+    thumbs = np.load(Path(directory) / ProxyVideo.THUMBS_NAME, mmap_mode="r+")
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+    writer = cv2.VideoWriter(
+        str(ProxyVideo.segment_path(directory, segment)),
+        cv2.VideoWriter_fourcc(*"MJPG"),
+        fps,
+        size,
+    )
+
+    done = 0
+    try:
+        for frame_number in range(start, end + 1):
+            # un solo seek al principio, el resto es lectura secuencial
+            frame = accessor.read(frame_number)
+            if frame is None:
+                break
+            writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+            cv2.resize(
+                frame,
+                thumb_size,
+                dst=thumbs[frame_number],
+                interpolation=cv2.INTER_AREA,
+            )
+            done += 1
+    finally:
+        writer.release()
+        cap.release()
+        thumbs.flush()
+
+    return done == end - start + 1
+
+
+def build(video_path, workers=None, scale=None, thumb_width=None, segment_frames=None):
+    """
+    Genera el proxy y las miniaturas del vídeo.
+
+    Args:
+        video_path: vídeo de origen
+        workers: procesos del pool (por defecto uno por núcleo)
+        scale: escala del proxy respecto al original
+        thumb_width: ancho de las miniaturas (el alto mantiene la proporción)
+        segment_frames: frames por segmento (y por tarea)
+
+    Returns:
+        ProxyVideo: proxy abierto, o None si falló
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .frame_access import KeyframeIndex
+
+    scale = scale or ProxyVideo.SCALE
+    thumb_width = thumb_width or ProxyVideo.THUMB_WIDTH
+    segment_frames = segment_frames or ProxyVideo.SEGMENT_FRAMES
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"Error: no se pudo abrir {video_path}")
+        return None
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    cap.release()
+
+    # el recuento de la cabecera puede mentir, el índice cuenta paquetes
+    keyframes = KeyframeIndex.for_video(video_path)
+    if keyframes is None:
+        print(f"Error: no se pudo indexar {video_path}")
+        return None
+    total = keyframes.total_frames
+
+    # MJPG necesita dimensiones pares
+    size = (max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2))
+    thumb_size = (thumb_width, max(1, round(height * thumb_width / width)))
+
+    directory = ProxyVideo.directory_for(video_path)
+    directory.mkdir(exist_ok=True)
+    index_path = directory / ProxyVideo.INDEX_NAME
+    index_path.unlink(missing_ok=True)
+
+    np.lib.format.open_memmap(
+        directory / ProxyVideo.THUMBS_NAME,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(total, thumb_size[1], thumb_size[0], 3),
+    ).flush()
+
+    jobs = [
+        (
+            str(video_path),
+            str(directory),
+            segment,
+            start,
+            min(start + segment_frames, total) - 1,
+            size,
+            thumb_size,
+            fps,
+        )
+        for segment, start in enumerate(range(0, total, segment_frames))
+    ]
+    print(
+        f"{total} frames en {len(jobs)} segmentos, proxy {size[0]}x{size[1]}, "
+        f"miniaturas {thumb_size[0]}x{thumb_size[1]}"
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        complete = all(pool.map(_build_segment, jobs))
+
+    if not complete:
+        print("Error: no se pudieron decodificar todos los frames")
+        return None
+
+    # el índice se escribe al final: si no existe, el proxy no está completo
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": ProxyVideo.VERSION,
+                "source": _source_info(video_path),
+                "total_frames": total,
+                "segment_frames": segment_frames,
+                "size": list(size),
+                "thumb_size": list(thumb_size),
+                "complete": True,
+            },
+            f,
+        )
+
+    return ProxyVideo.open(video_path)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Genera el vídeo proxy y las miniaturas para navegar rápido"
+    )
+    parser.add_argument("video")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scale", type=float, default=ProxyVideo.SCALE)
+    parser.add_argument("--thumb-width", type=int, default=ProxyVideo.THUMB_WIDTH)
+    parser.add_argument(
+        "--segment",
+        type=int,
+        default=ProxyVideo.SEGMENT_FRAMES,
+        help="frames por segmento",
+    )
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    proxy = build(args.video, args.workers, args.scale, args.thumb_width, args.segment)
+    if proxy is not None:
+        print(f"Proxy generado en {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
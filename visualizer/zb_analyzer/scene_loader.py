@@ -2,6 +2,7 @@ import json
 import traceback
 
 from .graph_processor import GraphProcessor
+from .path_index import PathIndex
 
 
 class SceneDataLoader:
@@ -11,26 +12,19 @@ class SceneDataLoader:
         self.json_path = json_path
         self.scenes = []
         self.paths = []
+        self.data = None
+        self.chunks_by_id = {}
+        self.node_map = {}  # mem_offset -> nodo del JSON (manda el primer chunk)
+        self.path_indexes = {}  # id de escena -> PathIndex
+        self.loaded = set()  # índices de las escenas con paths calculados
         self.graph_processor = GraphProcessor()
+        self.game_graph = None
 
     def load_scenes(self):
         try:
-            with open(self.json_path, encoding="utf-8") as f:
-                data = json.load(f)
-
-            self.scenes = []
-            self.paths = []
-
-            chunks = data["chunks"]
-            scene_order = data.get("scene_order", [])
-
-            if isinstance(data, dict) and chunks:
-                for scene_data in data["chunks"]:
-                    scene = self._process_graph_data(scene_data)
-                    self.scenes.append(scene)
-
-            if scene_order:
-                self._reorder_scenes_by_game_order(scene_order, chunks)
+            self.read_scenes()
+            for index in range(len(self.scenes)):
+                self.process_scene(index)
 
             print(
                 f"Cargado grafo con {len(self.scenes)} escenas y {sum(len(s.get('graph_paths', [])) for s in self.scenes)} paths totales"
@@ -44,39 +38,70 @@ class SceneDataLoader:
             traceback.print_exc()
             return self._get_default_scenes()
 
-    def _frame_val(self, field):
+    def read_scenes(self):
+        """
+        Lee el JSON y deja las escenas en el orden del juego, todavía sin
+        paths: process_scene los calcula escena a escena (así la primera se
+        puede usar sin esperar a las demás).
         """
-        Extraer frame integer de ptr_frame_*
+        with open(self.json_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.data = data
+        self.scenes = []
+        self.paths = []
+        self.path_indexes = {}
+        self.loaded = set()
+        self.node_map = {}
+        for chunk in data["chunks"]:
+            for node in chunk.get("nodes", []):
+                self.node_map.setdefault(node.get("mem_offset"), node)
+        for node in data.get("spare_chunks", []):
+            self.node_map.setdefault(node.get("mem_offset"), node)
 
-        - está en el tercer elemento de la lista
-        - ejemplo:
+        chunks = data["chunks"]
+        scene_order = data.get("scene_order", [])
 
-            "ptr_frame_start": [
-                "0x0004731c",
-                "0x0000751c",
-                "10548"
-                ]
-        """
+        if isinstance(data, dict) and chunks:
+            for scene_data in data["chunks"]:
+                self.scenes.append(self._new_scene(scene_data))
 
-        if not isinstance(field, list) or len(field) < 3:
-            return None
-        s = field[2]
-        try:
-            return int(s)
-        except Exception:
-            return None
+        if scene_order:
+            self._reorder_scenes_by_game_order(scene_order, chunks)
+
+        return self.scenes
+
+    def process_scene(self, index):
+        """Calcula los paths de una escena leída con read_scenes"""
+        scene = self.scenes[index]
+        scene_data = self.chunks_by_id.get(scene.get("id"), {})
+        scene["graph_paths"] = self._find_scene_paths(scene_data)
+        self.loaded.add(index)
+        return scene
+
+    def is_loaded(self, index):
+        """True si la escena ya tiene sus paths calculados"""
+        return index in self.loaded
+
+    def _frame_val(self, field):
+        """Extraer frame integer de ptr_frame_* (ver GraphProcessor.frame_val)"""
+        return self.graph_processor.frame_val(field)
 
-    def _process_graph_data(self, scene_data):
-        """Procesa el grafo y extrae todos los caminos válidos usando GraphProcessor"""
+    def _new_scene(self, scene_data):
+        """Escena sin paths a partir de un chunk"""
         scene = {
             "id": scene_data.get("id", 0),
             "offset": scene_data.get("mem_offset", scene_data.get("file_offset", "")),
             "graph_paths": [],
         }
+        self.chunks_by_id[scene["id"]] = scene_data
+        return scene
 
+    def _find_scene_paths(self, scene_data):
+        """Caminos de un chunk con la estructura de graph_paths"""
         nodes = scene_data.get("nodes", [])
         if not nodes:
-            return scene
+            return []
 
         G, mem_map = self.graph_processor.build_graph(nodes)
 
@@ -87,14 +112,15 @@ class SceneDataLoader:
 
         # convertir paths a estructura de datos usada
         # se mantienen los hitboxes pero la lista de frames ya no es necesaria
+        graph_paths = []
         for path in all_paths:
             path_data = self._convert_path_to_data(path, mem_map)
             if path_data:
-                scene["graph_paths"].append(path_data)
+                graph_paths.append(path_data)
 
-        scene["graph_paths"].reverse()
+        graph_paths.reverse()
 
-        return scene
+        return graph_paths
 
     def _convert_path_to_data(self, path, mem_map):
         """Convierte un camino de NetworkX a la estructura de datos esperada"""
@@ -126,6 +152,7 @@ class SceneDataLoader:
                 "ptr_node_respawn": ptr_node_respawn
                 if ptr_node_respawn != "0x00000000"
                 else None,
+                "death": self.graph_processor.ends_in_death(node),
                 "hitboxes": [],
             }
 
@@ -200,12 +227,50 @@ class SceneDataLoader:
 
         print(f"Escenas reordenadas según orden del juego: {chunk_order[:10]}...")
 
+    def get_game_graph(self, rebuild=False):
+        """Grafo global del juego (se construye o se carga de caché la primera vez)"""
+        if self.game_graph is None or rebuild:
+            from .game_graph import GameGraph
+
+            self.game_graph = GameGraph.from_json(self.json_path, rebuild=rebuild)
+        return self.game_graph
+
     def get_paths(self, scene_index=0):
         """Retorna todos los caminos de una escena específica"""
         if scene_index < len(self.scenes):
             return self.scenes[scene_index].get("graph_paths", [])
         return []
 
+    def get_path_index(self, scene_index=0):
+        """Índice de búsqueda de los paths de una escena (se construye una vez)"""
+        if scene_index >= len(self.scenes):
+            return PathIndex([])
+        scene_id = self.scenes[scene_index].get("id")
+        if scene_id not in self.path_indexes:
+            self.path_indexes[scene_id] = PathIndex(self.get_paths(scene_index))
+        return self.path_indexes[scene_id]
+
+    def get_best_route(self, scene_index=0):
+        """Ruta con más puntos de una escena, con la estructura de graph_paths"""
+        if scene_index >= len(self.scenes):
+            return None
+        chunk = self.chunks_by_id.get(self.scenes[scene_index].get("id"), {})
+        nodes = chunk.get("nodes", [])
+        if not nodes:
+            return None
+
+        G, mem_map = self.graph_processor.build_graph(nodes)
+        roots = self.graph_processor.find_roots(G, chunk.get("mem_offset"))
+        routes = self.graph_processor.max_score_routes(G, roots)
+        if not routes:
+            return None
+        return self._convert_path_to_data(routes[0]["path"], mem_map)
+
+    def get_node_data(self, mem):
+        """Un nodo cualquiera del JSON con la estructura de los pasos de graph_paths"""
+        data = self._convert_path_to_data([mem], self.node_map)
+        return data["nodes"][0] if data else None
+
     def get_path_node(self, scene_index, path_idx, node_idx):
         """Obtiene un nodo específico de un camino"""
         paths = self.get_paths(scene_index)
@@ -0,0 +1,415 @@
+"""
+Detección de cortes de plano y validación de los rangos de frames de nodos.
+
+Para cada frame se calculan dos señales respecto al anterior: la diferencia
+de histogramas de color y la diferencia media de píxeles en grises a baja
+resolución. Se calculan en paralelo por segmentos del vídeo y se guardan en
+un .npy junto a él; validar otro JSON de escenas después solo lee ese
+fichero.
+
+Un corte es un frame en el que alguna de las señales supera su umbral
+absoluto y que destaca sobre la mediana de su entorno; el frame 0 siempre
+lo es. Cada nodo se compara con los cortes: su inicio debería ser un corte
+y el frame siguiente a su final también, salvo que otro nodo empiece justo
+ahí (metraje continuo).
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .calibration import Calibration
+from .graph_processor import GraphProcessor
+
+HIST_BINS = 16  # por canal
+SMALL_SIZE = (80, 64)  # tamaño para la diferencia de píxeles
+SIGNALS = ["hist_diff", "pixel_diff"]
+
+REPORT_FIELDS = [
+    "scene",
+    "mem",
+    "frame_start",
+    "frame_end",
+    "start_status",
+    "start_cut",
+    "end_status",
+    "end_cut",
+]
+
+
+def _source_info(video_path):
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def _frame_features(frames):
+    """histogramas normalizados (N, 3*bins) y grises reducidos (N, alto, ancho)"""
+    import cv2
+
+    hists = np.empty((len(frames), 3 * HIST_BINS), dtype=np.float32)
+    small = np.empty((len(frames), SMALL_SIZE[1], SMALL_SIZE[0]), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        reduced = cv2.resize(frame, SMALL_SIZE, interpolation=cv2.INTER_AREA)
+        for c in range(3):
+            hists[i, c * HIST_BINS : (c + 1) * HIST_BINS] = cv2.calcHist(
+                [reduced], [c], None, [HIST_BINS], [0, 256]
+            ).ravel()
+        small[i] = cv2.cvtColor(reduced, cv2.COLOR_BGR2GRAY)
+    hists /= hists.sum(axis=1, keepdims=True) / 3
+    return hists, small
+
+
+def _signals(hists, small):
+    """señales entre frames consecutivos, vectorizadas sobre el lote"""
+    hist_diff = 0.5 * np.abs(np.diff(hists, axis=0)).sum(axis=1) / 3  # 0..1
+    pixel_diff = np.abs(np.diff(small, axis=0)).mean(axis=(1, 2)) / 255  # 0..1
+    return np.stack([hist_diff, pixel_diff], axis=1)
+
+
+def _signal_segment(job):
+    """señales de un segmento del vídeo en su sitio del mmap (proceso del pool)"""
+    import cv2
+
+    from .frame_access import FrameAccessor, KeyframeIndex
+
+    video_path, data_path, start, end, batch = job
+    signals = np.load(data_path, mmap_mode="r+")
+    cap = cv2.VideoCapture(str(video_path))
+    accessor = FrameAccessor(cap, KeyframeIndex.for_video(video_path, build=False))
+
+    # se lee también el frame anterior al segmento para la primera diferencia
+    first = max(start - 1, 0)
+    prev = None
+    done = 0
+    try:
+        frame_number = first
+        while frame_number <= end:
+            frames = []
+            while frame_number <= end and len(frames) < batch:
+                frame = accessor.read(frame_number)
+                if frame is None:
+                    break
+                frames.append(frame)
+                frame_number += 1
+            if not frames:
+                break
+
+            hists, small = _frame_features(frames)
+            if prev is not None:
+                hists = np.concatenate([prev[0], hists])
+                small = np.concatenate([prev[1], small])
+            values = _signals(hists, small)
+            if prev is None and start == 0:
+                # el frame 0 no tiene anterior: se cuenta como corte
+                values = np.concatenate([[[1.0, 1.0]], values])
+            signals[start + done : start + done + len(values)] = values
+            done += len(values)
+            prev = (hists[-1:], small[-1:])
+
+            if len(frames) < batch and frame_number <= end:
+                break  # fin del vídeo antes de tiempo
+    finally:
+        cap.release()
+        signals.flush()
+
+    return done == end - start + 1
+
+
+class ShotSignals:
+    """Señales de corte por frame del vídeo, cacheadas junto al vídeo"""
+
+    DATA_SUFFIX = ".shots.npy"
+    META_SUFFIX = ".shots.json"
+    VERSION = 1
+    SEGMENT_FRAMES = 1500
+    BATCH_FRAMES = 128
+
+    # un corte supera alguno de estos mínimos y destaca sobre su entorno
+    MIN_HIST = 0.3
+    MIN_PIXEL = 0.12
+    CONTRAST = 3.0
+    LOCAL_WINDOW = 12
+
+    def __init__(self, signals, calibration=None):
+        self.signals = signals  # float32 (frames del vídeo, 2)
+        self.calibration = calibration if calibration is not None else Calibration()
+        self._cuts = None
+
+    @staticmethod
+    def paths(video_path):
+        video_path = Path(video_path)
+        return (
+            video_path.with_name(video_path.name + ShotSignals.DATA_SUFFIX),
+            video_path.with_name(video_path.name + ShotSignals.META_SUFFIX),
+        )
+
+    @classmethod
+    def open(cls, video_path):
+        """Señales del vídeo si existen, están completas y son de este vídeo"""
+        data_path, meta_path = cls.paths(video_path)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except OSError, json.JSONDecodeError:
+            return None
+
+        if (
+            meta.get("version") != cls.VERSION
+            or not meta.get("complete")
+            or meta.get("source") != _source_info(video_path)
+        ):
+            return None
+
+        try:
+            signals = np.load(data_path, mmap_mode="r")
+        except OSError, ValueError:
+            return None
+        return cls(signals, Calibration.for_video(video_path))
+
+    @classmethod
+    def for_video(cls, video_path, workers=None):
+        """Señales cacheadas, o calculadas y guardadas si no existen"""
+        signals = cls.open(video_path)
+        if signals is None:
+            signals = compute(video_path, workers)
+        return signals
+
+    def cuts(self):
+        """frames del vídeo que empiezan un plano nuevo (ordenados)"""
+        if self._cuts is None:
+            # >= 1 cuando alguna señal supera su umbral
+            score = np.maximum(
+                self.signals[:, 0] / self.MIN_HIST, self.signals[:, 1] / self.MIN_PIXEL
+            )
+
+            if not len(score):
+                self._cuts = np.empty(0, dtype=np.int64)
+                return self._cuts
+
+            # mediana local (sin el propio frame) para no confundir movimiento
+            # con cortes; reflect no repite en el relleno la señal forzada
+            # del frame 0, que taparía los cortes del principio
+            k = self.LOCAL_WINDOW
+            padded = np.pad(score, k, mode="reflect")
+            windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * k + 1)
+            local = np.median(np.delete(windows, k, axis=1), axis=1)
+
+            is_cut = (score >= 1) & (score >= self.CONTRAST * local)
+            is_cut[0] = True  # el primer frame siempre empieza un plano
+            self._cuts = np.flatnonzero(is_cut)
+        return self._cuts
+
+    def nearest_cut(self, ld_frame, window):
+        """
+        Distancia (en frames) del corte más cercano a un frame del laserdisc,
+        o None si no hay ninguno en ±window.
+        """
+        cuts = self.cuts()
+        video_frame = self.calibration.to_video(ld_frame)
+        i = np.searchsorted(cuts, video_frame)
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(cuts):
+                delta = int(cuts[j]) - video_frame
+                if abs(delta) <= window and (best is None or abs(delta) < abs(best)):
+                    best = delta
+        return best
+
+
+def compute(video_path, workers=None, segment_frames=None):
+    """
+    Calcula las señales de todo el vídeo en paralelo por segmentos.
+
+    Returns:
+        ShotSignals o None si falló
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .frame_access import KeyframeIndex
+
+    segment_frames = segment_frames or ShotSignals.SEGMENT_FRAMES
+
+    keyframes = KeyframeIndex.for_video(video_path)
+    if keyframes is None:
+        print(f"Error: no se pudo abrir {video_path}")
+        return None
+    total = keyframes.total_frames
+
+    data_path, meta_path = ShotSignals.paths(video_path)
+    meta_path.unlink(missing_ok=True)
+    np.lib.format.open_memmap(
+        data_path, mode="w+", dtype=np.float32, shape=(total, len(SIGNALS))
+    ).flush()
+
+    jobs = [
+        (
+            str(video_path),
+            str(data_path),
+            start,
+            min(start + segment_frames, total) - 1,
+            ShotSignals.BATCH_FRAMES,
+        )
+        for start in range(0, total, segment_frames)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        complete = all(pool.map(_signal_segment, jobs))
+
+    if not complete:
+        print("Error: no se pudieron decodificar todos los frames")
+        return None
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": ShotSignals.VERSION,
+                "source": _source_info(video_path),
+                "signals": SIGNALS,
+                "complete": True,
+            },
+            f,
+        )
+
+    return ShotSignals.open(video_path)
+
+
+def _status(delta, continuous=False):
+    if delta == 0:
+        return "ok"
+    if delta is not None:
+        return f"desplazado {delta:+d}"
+    return "continuo" if continuous else "sin corte"
+
+
+def validate(data, signals, window=5):
+    """
+    Compara los límites de cada nodo con los cortes detectados.
+
+    Args:
+        data: JSON de escenas
+        signals: ShotSignals del vídeo
+        window: distancia máxima a la que buscar el corte
+
+    Returns:
+        lista de filas (REPORT_FIELDS) más "mismatch"
+    """
+    processor = GraphProcessor()
+    nodes = [
+        (chunk.get("id", i), n)
+        for i, chunk in enumerate(data.get("chunks", []))
+        for n in chunk.get("nodes", [])
+    ]
+    nodes += [("spare", n) for n in data.get("spare_chunks", [])]
+
+    starts = set()
+    for _, n in nodes:
+        start = processor.frame_val(n.get("value", {}).get("ptr_frame_start"))
+        if start is not None:
+            starts.add(start)
+
+    rows = []
+    seen = set()
+    for scene, n in nodes:
+        v = n.get("value", {})
+        start = processor.frame_val(v.get("ptr_frame_start"))
+        end = processor.frame_val(v.get("ptr_frame_end"))
+        mem = n.get("mem_offset")
+        if start is None or end is None or (mem is not None and mem in seen):
+            continue
+        seen.add(mem)
+
+        start_cut = signals.nearest_cut(start, window)
+        end_cut = signals.nearest_cut(end + 1, window)
+        # si otro nodo sigue justo después, el metraje puede ser continuo
+        continuous_end = (end + 1) in starts
+        row = {
+            "scene": scene,
+            "mem": mem,
+            "frame_start": start,
+            "frame_end": end,
+            "start_status": _status(start_cut),
+            "start_cut": start_cut,
+            "end_status": _status(end_cut, continuous_end),
+            "end_cut": end_cut,
+        }
+        row["mismatch"] = row["start_status"] != "ok" or row["end_status"] not in (
+            "ok",
+            "continuo",
+        )
+        rows.append(row)
+    return rows
+
+
+def main():
+    import argparse
+    import contextlib
+    import csv
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Detecta cortes de plano y valida los rangos de frames de los nodos"
+    )
+    parser.add_argument("video")
+    parser.add_argument("json", nargs="+", help="JSON de escenas")
+    parser.add_argument(
+        "-w", "--window", type=int, default=5, help="distancia máxima al corte"
+    )
+    parser.add_argument(
+        "-a", "--all", action="store_true", help="mostrar también los ok"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["text", "json", "csv"], default="text"
+    )
+    parser.add_argument("-o", "--output", help="archivo de salida (por defecto stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    signals = ShotSignals.for_video(args.video, args.workers)
+    if signals is None:
+        sys.exit(1)
+    print(
+        f"{len(signals.cuts())} cortes en {len(signals.signals)} frames "
+        f"({time.perf_counter() - t0:.1f}s)",
+        file=sys.stderr,
+    )
+
+    rows = []
+    for json_path in args.json:
+        with open(json_path, encoding="utf-8") as f:
+            for row in validate(json.load(f), signals, args.window):
+                rows.append({"file": json_path, **row})
+    shown = rows if args.all else [r for r in rows if r["mismatch"]]
+
+    with contextlib.ExitStack() as stack:
+        stream = (
+            stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+            if args.output
+            else sys.stdout
+        )
+        if args.format == "json":
+            json.dump(shown, stream, indent=2, ensure_ascii=False)
+            stream.write("\n")
+        elif args.format == "csv":
+            writer = csv.DictWriter(
+                stream, ["file", *REPORT_FIELDS], extrasaction="ignore"
+            )
+            writer.writeheader()
+            writer.writerows(shown)
+        else:
+            for row in shown:
+                stream.write(
+                    f"Escena {row['scene']} nodo {row['mem']}: "
+                    f"{row['frame_start']}-{row['frame_end']} "
+                    f"inicio {row['start_status']}, final {row['end_status']}\n"
+                )
+            mismatches = sum(r["mismatch"] for r in rows)
+            stream.write(
+                f"\n{mismatches} de {len(rows)} nodos no cuadran con los cortes\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
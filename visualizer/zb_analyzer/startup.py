@@ -0,0 +1,129 @@
+"""
+Arranque del visualizador sin bloquear la ventana.
+
+SceneLoadWorker lee el JSON y calcula los paths escena a escena en un hilo
+aparte, empezando por la que se está mirando, y avisa con señales según van
+estando listas. StartupProfile mide el tiempo desde el inicio del proceso
+hasta cada hito del arranque (ventana, escenas, vídeo, primer frame).
+"""
+
+import threading
+import time
+import traceback
+
+from PySide6.QtCore import QObject, Signal
+
+# errores de un JSON con una estructura inesperada (campos que faltan o de
+# otro tipo); cualquier otro es un fallo del visualizador y se propaga
+DATA_ERRORS = (KeyError, IndexError, TypeError, ValueError, AttributeError)
+
+
+class SceneLoadWorker(QObject):
+    """Carga de escenas en segundo plano"""
+
+    # SceneDataLoader con las escenas en orden de juego, aún sin paths
+    opened = Signal(object)
+    # (índice de escena, escenas listas, total)
+    sceneReady = Signal(int, int, int)
+    finished = Signal()
+
+    def __init__(self, json_path, parent=None):
+        super().__init__(parent)
+        self.json_path = json_path
+        self._wanted = []  # escenas pedidas desde la GUI, la última primero
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="SceneLoader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """deja de procesar escenas (al cerrar la ventana)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def prioritize(self, index):
+        """calcula esta escena antes que las demás pendientes"""
+        with self._lock:
+            self._wanted.append(index)
+
+    def _next(self, pending):
+        with self._lock:
+            while self._wanted:
+                index = self._wanted.pop()
+                if index in pending:
+                    return index
+        return min(pending)
+
+    def _run(self):
+        # los módulos de grafos (networkx) se importan en este hilo
+        from .scene_loader import SceneDataLoader
+
+        t0 = time.perf_counter()
+        loader = SceneDataLoader(self.json_path)
+        try:
+            loader.read_scenes()
+        except (OSError, *DATA_ERRORS) as e:
+            print(f"Error cargando JSON: {e}")
+            traceback.print_exc()
+            loader.scenes = loader._get_default_scenes()
+            loader.loaded = set(range(len(loader.scenes)))
+        self.opened.emit(loader)
+
+        total = len(loader.scenes)
+        pending = set(range(total)) - loader.loaded
+        for index in loader.loaded:
+            self.sceneReady.emit(index, total - len(pending), total)
+        while pending and not self._stop.is_set():
+            index = self._next(pending)
+            try:
+                loader.process_scene(index)
+                loader.get_path_index(index)
+            except DATA_ERRORS as e:
+                # la escena queda sin paths pero la carga sigue
+                print(f"Error procesando la escena {index + 1}: {e}")
+                traceback.print_exc()
+                loader.loaded.add(index)
+            pending.discard(index)
+            self.sceneReady.emit(index, total - len(pending), total)
+        if pending:
+            return
+
+        print(
+            f"Cargado grafo con {total} escenas y "
+            f"{sum(len(s.get('graph_paths', [])) for s in loader.scenes)} paths totales "
+            f"en {time.perf_counter() - t0:.2f}s"
+        )
+        self.finished.emit()
+
+
+class StartupProfile:
+    """Hitos del arranque en ms desde `t0` (time.perf_counter)"""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+
+    def mark(self, name):
+        """apunta un hito la primera vez que ocurre"""
+        if name in self.marks:
+            return
+        self.marks[name] = (time.perf_counter() - self.t0) * 1000
+        print(f"[arranque] {name}: {self.marks[name]:.0f} ms")
+
+    def has(self, *names):
+        return all(name in self.marks for name in names)
+
+    def report(self):
+        width = max((len(name) for name in self.marks), default=0)
+        lines = ["[arranque] resumen:"]
+        lines += [
+            f"  {name:<{width}}  {ms:8.0f} ms"
+            for name, ms in sorted(self.marks.items(), key=lambda item: item[1])
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,256 @@
+"""
+Línea de tiempo del laserdisc bajo el vídeo.
+
+Cada carril es un IntervalSet (nodos de la escena, ventanas de hitboxes,
+nodos de todo el juego). Si los intervalos visibles caben se pintan como
+barras; si no, se pinta la cobertura por columna de píxeles, agrupada en
+unos pocos niveles de intensidad para que cada nivel sea una sola llamada
+de dibujo. Clic (o arrastre) para saltar a un frame, rueda para zoom,
+Shift + rueda para desplazarse y doble clic para volver a la escena.
+"""
+
+import numpy as np
+from PySide6.QtCore import QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from .intervals import IntervalSet, node_windows
+
+LABEL_WIDTH = 70
+LANE_HEIGHT = 14
+LANE_GAP = 3
+AXIS_HEIGHT = 16
+LEVELS = 6  # niveles de intensidad de la cobertura
+MIN_BAR_PIXELS = 2  # píxeles por intervalo por debajo de los que se agrega
+MIN_SPAN = 20  # frames visibles con el zoom máximo
+ZOOM_STEP = 1.25
+BACKGROUND = QColor(32, 32, 32)
+LANE_BACKGROUND = QColor(48, 48, 48)
+TEXT_COLOR = QColor(200, 200, 200)
+PLAYHEAD_COLOR = QColor(255, 220, 0)
+CURRENT_COLOR = QColor(255, 255, 255, 60)
+NODE_COLOR = QColor(80, 140, 220)
+HITBOX_COLOR = QColor(230, 70, 70)
+GAME_COLOR = QColor(150, 150, 150)
+
+
+def _tick_step(span, count=8):
+    """paso 1, 2 o 5 por potencia de 10 para unas `count` marcas"""
+    raw = max(span / count, 1)
+    power = 10 ** int(np.floor(np.log10(raw)))
+    for m in (1, 2, 5, 10):
+        if m * power >= raw:
+            return m * power
+    return 10 * power
+
+
+class TimelineWidget(QWidget):
+    """Carriles de intervalos de frames con cabezal de reproducción"""
+
+    seekRequested = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lanes = []  # (nombre, IntervalSet, QColor)
+        self.game_nodes = IntervalSet()
+        self.lo, self.hi = 0, 1000
+        self.home = (0, 1000)
+        self.position = None
+        self.current = None  # (inicio, fin) del nodo que se reproduce
+        self._seeking = False
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self._update_height()
+
+    def _update_height(self):
+        lanes = max(len(self.lanes), 1)
+        self.setFixedHeight(AXIS_HEIGHT + lanes * (LANE_HEIGHT + LANE_GAP) + LANE_GAP)
+
+    def set_lanes(self, lanes):
+        """lista de (nombre, IntervalSet, QColor)"""
+        self.lanes = lanes
+        self._update_height()
+        self.update()
+
+    def set_game_nodes(self, nodes):
+        """nodos de todo el juego (carril de fondo, se calcula una vez)"""
+        self.game_nodes, _ = node_windows(nodes)
+
+    def set_scene(self, nodes):
+        """carriles de los nodos y hitboxes de una escena, con zoom a ella"""
+        scene_nodes, hitboxes = node_windows(nodes)
+        self.set_lanes(
+            [
+                ("Nodos", scene_nodes, NODE_COLOR),
+                ("Hitboxes", hitboxes, HITBOX_COLOR),
+                ("Juego", self.game_nodes, GAME_COLOR),
+            ]
+        )
+        self.set_home(scene_nodes.span())
+
+    def set_home(self, span, margin=0.02):
+        """rango de la escena (al que vuelve el doble clic) y lo muestra"""
+        if span is None:
+            return
+        lo, hi = span
+        pad = max(int((hi - lo) * margin), 1)
+        self.home = (lo - pad, hi + pad)
+        self.set_range(*self.home)
+
+    def set_range(self, lo, hi):
+        if hi - lo < MIN_SPAN:
+            mid = (lo + hi) / 2
+            lo, hi = mid - MIN_SPAN / 2, mid + MIN_SPAN / 2
+        self.lo, self.hi = lo, hi
+        self.update()
+
+    def set_position(self, frame):
+        """mueve el cabezal; solo repinta las columnas que cambian"""
+        if frame == self.position:
+            return
+        old = self._frame_x(self.position) if self.position is not None else None
+        self.position = frame
+        new = self._frame_x(frame)
+        if old is not None and int(old) == int(new):
+            return
+        for x in (old, new):
+            if x is not None:
+                self.update(int(x) - 2, 0, 5, self.height())
+
+    def set_current(self, start, end):
+        self.current = (start, end) if start is not None and end is not None else None
+        self.update()
+
+    # geometría
+
+    def _bars_width(self):
+        return max(self.width() - LABEL_WIDTH, 1)
+
+    def _scale(self):
+        """píxeles por frame"""
+        return self._bars_width() / max(self.hi - self.lo, 1)
+
+    def _frame_x(self, frame):
+        return LABEL_WIDTH + (frame - self.lo) * self._scale()
+
+    def _x_frame(self, x):
+        return self.lo + (x - LABEL_WIDTH) / self._scale()
+
+    # pintado
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        self._paint_axis(painter)
+
+        lo, hi = int(np.floor(self.lo)), int(np.ceil(self.hi))
+        for i, (name, intervals, color) in enumerate(self.lanes):
+            top = AXIS_HEIGHT + LANE_GAP + i * (LANE_HEIGHT + LANE_GAP)
+            painter.setPen(TEXT_COLOR)
+            painter.drawText(
+                QRectF(2, top, LABEL_WIDTH - 4, LANE_HEIGHT),
+                Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                name,
+            )
+            lane = QRectF(LABEL_WIDTH, top, self._bars_width(), LANE_HEIGHT)
+            painter.fillRect(lane, LANE_BACKGROUND)
+            painter.setClipRect(lane)
+            if intervals.count_visible(lo, hi) * MIN_BAR_PIXELS <= self._bars_width():
+                self._paint_bars(painter, intervals, lo, hi, top, color)
+            else:
+                self._paint_coverage(painter, intervals, lo, hi, top, color)
+            painter.setClipping(False)
+
+        painter.setClipRect(QRectF(LABEL_WIDTH, 0, self._bars_width(), self.height()))
+        if self.current is not None:
+            x0 = self._frame_x(self.current[0])
+            x1 = self._frame_x(self.current[1] + 1)
+            painter.fillRect(
+                QRectF(x0, AXIS_HEIGHT, max(x1 - x0, 1), self.height()), CURRENT_COLOR
+            )
+
+        if self.position is not None:
+            x = self._frame_x(self.position)
+            if x >= LABEL_WIDTH:
+                painter.setPen(QPen(PLAYHEAD_COLOR, 2))
+                painter.drawLine(int(x), 0, int(x), self.height())
+
+    def _paint_axis(self, painter):
+        step = _tick_step(self.hi - self.lo)
+        painter.setPen(TEXT_COLOR)
+        first = int(np.ceil(self.lo / step) * step)
+        for frame in range(first, int(self.hi) + 1, step):
+            x = int(self._frame_x(frame))
+            painter.drawLine(x, AXIS_HEIGHT - 4, x, AXIS_HEIGHT)
+            painter.drawText(x + 2, AXIS_HEIGHT - 5, str(frame))
+
+    def _paint_bars(self, painter, intervals, lo, hi, top, color):
+        starts, ends = intervals.visible(lo, hi)
+        scale = self._scale()
+        x0 = LABEL_WIDTH + (starts - self.lo) * scale
+        # 1 px de separación para distinguir intervalos contiguos
+        widths = np.maximum((ends + 1 - starts) * scale - 1, 1)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRects(
+            [
+                QRectF(x, top, w, LANE_HEIGHT)
+                for x, w in zip(x0.tolist(), widths.tolist())
+            ]
+        )
+
+    def _paint_coverage(self, painter, intervals, lo, hi, top, color):
+        coverage = intervals.coverage(lo, hi, int(self._bars_width()))
+        width = self._bars_width() / len(coverage)
+        levels = np.ceil(coverage * LEVELS).astype(np.int32)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for level in range(1, LEVELS + 1):
+            columns = np.flatnonzero(levels == level)
+            if not len(columns):
+                continue
+            shade = QColor(color)
+            shade.setAlphaF(level / LEVELS)
+            painter.setBrush(shade)
+            painter.drawRects(
+                [
+                    QRectF(LABEL_WIDTH + c * width, top, max(width, 1), LANE_HEIGHT)
+                    for c in columns.tolist()
+                ]
+            )
+
+    # interacción
+
+    def _seek_to(self, x):
+        if x < LABEL_WIDTH:
+            return
+        self.seekRequested.emit(round(self._x_frame(x)))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._seeking = True
+            self._seek_to(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if self._seeking:
+            self._seek_to(event.position().x())
+
+    def mouseReleaseEvent(self, event):
+        self._seeking = False
+
+    def mouseDoubleClickEvent(self, event):
+        self.set_range(*self.home)
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        span = self.hi - self.lo
+        if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+            shift = -steps * span / 10
+            self.set_range(self.lo + shift, self.hi + shift)
+        else:
+            # zoom alrededor del frame bajo el ratón
+            anchor = self._x_frame(max(event.position().x(), LABEL_WIDTH))
+            factor = ZOOM_STEP**-steps
+            self.set_range(
+                anchor - (anchor - self.lo) * factor,
+                anchor + (self.hi - anchor) * factor,
+            )
+        event.accept()
@@ -1,36 +1,82 @@
-import cv2
-from PySide6.QtCore import QRect, Qt, QTimer
+import math
+import threading
+
+from PySide6.QtCore import QPoint, QRect, QSize, Qt, QTimer, Signal
 from PySide6.QtGui import QColor, QFont, QImage, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import QLabel
 
+from .calibration import Calibration
+from .colors import HITBOX_RGB
+from .frame_cache import FrameCache
+from .perf_stats import (
+    COMPOSITE,
+    CONVERT,
+    PRESENT,
+    STAGES,
+    PerfStats,
+    process_rss,
+)
+from .playback_clock import PlaybackClock
+
 
 class VideoPlayer(QLabel):
     """Widget para reproducir video y visualizar hitboxes"""
 
-    HITBOX_COLORS = [
-        QColor(255, 0, 0),  # Rojo
-        QColor(0, 255, 0),  # Verde
-        QColor(0, 100, 255),  # Azul
-        QColor(255, 255, 0),  # Amarillo
-        QColor(255, 0, 255),  # Magenta
-        QColor(0, 255, 255),  # Cian
-        QColor(255, 128, 0),  # Naranja
-        QColor(128, 0, 255),  # Púrpura
-        QColor(255, 192, 203),  # Rosa
-        QColor(0, 255, 128),  # Verde menta
-        QColor(255, 64, 64),  # Rojo claro
-        QColor(64, 255, 64),  # Verde claro
-        QColor(64, 64, 255),  # Azul claro
-        QColor(255, 215, 0),  # Dorado
-        QColor(255, 99, 71),  # Tomate
-    ]
-
-    def __init__(self):
+    # True si el vídeo se abrió; se emite al terminar load_video
+    videoLoaded = Signal(bool)
+    firstFrameShown = Signal()
+    # (ruta, calibración, FrameStore, ProxyVideo, FrameDecoder) desde el hilo
+    _opened = Signal(str, object, object, object, object)
+
+    HITBOX_COLORS = [QColor(*rgb) for rgb in HITBOX_RGB]
+
+    # con más retraso que esto (sin loop) se salta con un seek en vez de
+    # decodificar y descartar cada frame
+    SKIP_AHEAD_FRAMES = 12
+    LATE_RETRY_MS = 5  # reintento si el frame que toca aún no está decodificado
+    PERF_INTERVAL_MS = 1000  # refresco del HUD y de la línea [perf]
+
+    def __init__(
+        self,
+        cache_bytes=FrameCache.DEFAULT_BUDGET,
+        loop_bytes=None,
+    ):
         super().__init__()
-        self.cap = None
+        self.decoder = None
+        self.video_info = {}
+        # el temporizador solo despierta al reproductor cuando toca el
+        # siguiente frame; qué frame toca lo decide el reloj
+        self.clock = PlaybackClock()
+        self.playing = False
+        self._steps = 0  # frames avanzados desde que arrancó el reloj
+        self._late_step = None
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_frame)
+        # mientras está en pausa, espera al frame pedido con un seek
+        self.seek_timer = QTimer()
+        self.seek_timer.timeout.connect(self._poll_seek)
         self.current_frame = None
+        self.current_frame_number = -1
+        self.pending_frame = None  # frame pedido con seek que aún no ha llegado
+        self.frame_cache = FrameCache(cache_bytes)
+        self.frame_store = None  # frames extraídos a disco, si existen
+        self.proxy = None  # vídeo proxy y miniaturas, si existen
+        self.calibration = Calibration()  # frame del laserdisc -> frame del vídeo
+        self.loop_bytes = loop_bytes  # None = el del decodificador
+        self._loading = None  # ruta que se está abriendo
+        self._autoplay = True
+        self._deferred = None  # loop o salto pedido mientras se abría el vídeo
+        self._first_frame_pending = False
+        self._opened.connect(self._on_opened)
+        # HUD de rendimiento: sin coste salvo las comprobaciones de perf.enabled
+        self.perf = PerfStats()
+        self.perf_timer = QTimer()
+        self.perf_timer.timeout.connect(self._perf_sample)
+        self._present_t0 = None
+        self._perf_base = None  # contadores al activar el HUD o del último muestreo
+        self._hud_lines = []
         self.hitboxes = []  # lista de (x0, y0, x1, y1, color_idx)
         # escala fija para Amiga 68k (320x256 → 720x576)
         self.amiga_width = 320
@@ -52,70 +98,400 @@ class VideoPlayer(QLabel):
         self.mouse_y = -1
         self.show_mouse_coords = False
 
+        # capas del compositor: frame escalado y hitboxes, cruz en paintEvent
+        self._base_pixmap = None
+        self._overlay_pixmap = None
+        self._overlay_key = None
+        self._coords_font = QFont()
+        self._coords_font.setPointSize(12)
+        self._coords_font.setBold(True)
+        self._hud_font = QFont("monospace")
+        self._hud_font.setStyleHint(QFont.StyleHint.Monospace)
+        self._hud_font.setPointSize(9)
+        self.setMinimumSize(self.display_width, self.display_height)
+
     def load_video(self, path):
-        """cargar archivo de video"""
+        """
+        Abrir un vídeo sin bloquear la GUI: calibración, almacén, proxy y
+        VideoCapture se abren en un hilo aparte y videoLoaded avisa al terminar.
+        """
+        self.release()
         self.video_path = path
-        self.cap = cv2.VideoCapture(path)
-        if self.cap.isOpened():
-            self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_cache.clear()
+        self.frame_cache.reset_stats()
+        self.current_frame_number = -1
+        self._loading = path
+        self._deferred = None
+        self._first_frame_pending = True
+        self.setText("Abriendo vídeo...")
+        threading.Thread(
+            target=self._open_video, args=(path,), name="VideoOpen", daemon=True
+        ).start()
+
+    def _open_video(self, path):
+        """hilo: todo lo que toca disco (y cv2) antes de poder decodificar"""
+        from .decoder import FrameDecoder
+        from .frame_store import FrameStore
+        from .proxy import ProxyVideo
+
+        calibration = Calibration.for_video(path)
+        frame_store = FrameStore.open(path, calibration)
+        proxy = ProxyVideo.open(path)
+        decoder = FrameDecoder(
+            path,
+            self.frame_cache,
+            loop_budget=self.loop_bytes or FrameDecoder.DEFAULT_LOOP_BUDGET,
+            store=frame_store,
+            proxy=proxy,
+            calibration=calibration,
+            perf=self.perf,
+        )
+        decoder.start()
+        decoder.ready.wait()
+        self._opened.emit(path, calibration, frame_store, proxy, decoder)
+
+    def _on_opened(self, path, calibration, frame_store, proxy, decoder):
+        if path != self._loading:
+            # otro load_video (o release) mientras se abría
+            decoder.stop()
+            return
+        self._loading = None
+
+        self.calibration = calibration
+        if not self.calibration.is_identity:
+            print(f"Calibración: {len(self.calibration.segments)} tramos")
+        self.frame_store = frame_store
+        if self.frame_store is not None:
+            print(f"Almacén de frames: {len(self.frame_store)} frames en mmap")
+        self.proxy = proxy
+        if self.proxy is not None:
+            print(f"Proxy disponible: {self.proxy.width}x{self.proxy.height}")
+
+        self.decoder = decoder
+        self.video_info = self.decoder.info
+
+        if self.video_info["opened"]:
+            self.total_frames = self.video_info["total_frames"]
+            self.clock.set_fps(self.video_info["fps"])
+            self.clock.reset_stats()
+            video_width = self.video_info["width"]
+            video_height = self.video_info["height"]
             print(f"Video cargado: {video_width}x{video_height}")
             print(
                 f"Escala Amiga: {self.amiga_width}x{self.amiga_height} → Display: {self.display_width}x{self.display_height}"
             )
             print(f"Escala: {self.scale_x:.4f}x (ancho), {self.scale_y:.4f}x (alto)")
+            print(f"FPS: {self.clock.fps:.3f}")
+            deferred, self._deferred = self._deferred, None
+            if deferred is not None and deferred[0] == "loop":
+                self.play_loop(*deferred[1:])
+            else:
+                self.decoder.seek(deferred[1] if deferred is not None else 0)
+                if self._autoplay:
+                    self.play()
         else:
             self.total_frames = 0
+            self.decoder = None
+            self.setText("No se ha podido cargar ningún vídeo.")
             print("Error: no se pudo abrir el video")
-        self.timer.start(40)  # ~25 FPS
+        self.videoLoaded.emit(self.decoder is not None)
 
-    def update_frame(self):
-        """actualiza el frame actual del video"""
-        if not (self.cap and self.cap.isOpened()):
+    def release(self):
+        """detener el hilo decodificador"""
+        self._loading = None
+        self.timer.stop()
+        self.seek_timer.stop()
+        self.clock.stop()
+        self.playing = False
+        if self.decoder:
+            self.decoder.stop()
+            self.decoder.join(timeout=1)
+            self.decoder = None
+
+    def _show_frame(self, frame_number, frame):
+        if frame_number == self.pending_frame:
+            self.pending_frame = None
+        self.current_frame = frame
+        self.current_frame_number = frame_number
+        self.display_frame()
+        self.perf.frame_presented()
+        if self._first_frame_pending:
+            self._first_frame_pending = False
+            self.firstFrameShown.emit()
+
+    def _request_frame(self, frame_number):
+        """pide un frame al decodificador y lo muestra cuando esté listo"""
+        frame = self.decoder.peek(frame_number)
+        if frame is not None:
+            # ya decodificado: se muestra al momento y solo se mueve el cabezal
+            self.pending_frame = None
+            self.decoder.seek(frame_number + 1, deliver=False)
+            self._show_frame(frame_number, frame)
+            if self.playing:
+                self._restart_clock()
             return
 
-        current = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        self.pending_frame = frame_number
+        self.decoder.seek(frame_number)
+        if self.playing:
+            self._restart_clock()
+        else:
+            self.seek_timer.start(5)
+
+        thumb = None
+        if self.proxy:
+            thumb = self.proxy.thumbnail(self.calibration.to_video(frame_number))
+        if thumb is not None:
+            # miniatura provisional mientras llega el frame decodificado
+            self.current_frame = thumb
+            self.current_frame_number = frame_number
+            self.display_frame()
 
-        # reiniciar bucle
-        if self.loop_enabled and current > self.loop_end:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.loop_start)
-            current = self.loop_start
+    def _poll_seek(self):
+        item = self.decoder.take_frame() if self.decoder else None
+        if item:
+            self._show_frame(*item)
+        if item or not self.decoder or self.decoder.eof:
+            self.seek_timer.stop()
 
-        ret, frame = self.cap.read()
-        if ret:
-            self.current_frame = frame.copy()
-            self.display_frame()
+    def update_frame(self):
+        """presenta el frame que pide el reloj, sin bloquear la GUI"""
+        if not self.decoder or not self.playing:
+            return
+
+        behind = self.clock.due() - self._steps
+        if behind > 0:
+            behind = self._advance(behind)
+        if self.playing:
+            self._schedule_tick(behind)
+
+    def _advance(self, behind):
+        """
+        Avanza behind frames presentando solo el último (los demás se
+        descartan). Devuelve cuántos frames siguen pendientes.
+        """
+        loop_random = self.loop_enabled and (
+            self.decoder.loop_buffer is not None
+            or (
+                self.frame_store is not None
+                and self.frame_store.covers(self.loop_start, self.loop_end)
+            )
+        )
+        if loop_random:
+            # loop en memoria o en el mmap: acceso directo al frame que toca
+            current = self.current_frame_number
+            if not self.loop_start <= current <= self.loop_end:
+                current = self.loop_start - 1  # el loop empieza por su inicio
+            frame_number = self._loop_frame(current + behind)
+            frame = self.decoder.peek(frame_number)
+            if frame is None:
+                self._mark_late()  # el loop todavía se está decodificando
+                return behind
+            self._present(frame_number, frame, behind)
+            return 0
+
+        item = None
+        taken = 0
+        while taken < behind:
+            next_item = self.decoder.take_frame()
+            if next_item is None:
+                break
+            item = next_item
+            taken += 1
+        if item:
+            self._present(*item, taken)
+
+        missing = behind - taken
+        if missing == 0:
+            return 0
+        if self.decoder.eof:
+            self.pause()
+            return 0
+
+        self._mark_late()
+        if missing > self.SKIP_AHEAD_FRAMES and not self.loop_enabled:
+            # el decodificador no llega: saltar directamente al frame que toca
+            target = min(self.current_frame_number + missing, self.total_frames - 1)
+            self.decoder.seek(target)
+            self.clock.dropped += missing
+            self._steps += missing
+            return 0
+        return missing
+
+    def _present(self, frame_number, frame, steps):
+        self._show_frame(frame_number, frame)
+        self.clock.presented += 1
+        self.clock.dropped += steps - 1
+        self._steps += steps
+
+    def _mark_late(self):
+        # una vez por frame que no estaba listo a su hora, no por reintento
+        if self._late_step != self._steps:
+            self._late_step = self._steps
+            self.clock.late += 1
+
+    def _loop_frame(self, frame_number):
+        length = self.loop_end - self.loop_start + 1
+        return self.loop_start + (frame_number - self.loop_start) % length
+
+    def _schedule_tick(self, pending=0):
+        if pending > 0:
+            delay_ms = self.LATE_RETRY_MS
         else:
-            self.timer.stop()
+            delay_ms = math.ceil(self.clock.time_until(self._steps + 1) * 1000)
+        self.timer.start(delay_ms)
+
+    def _restart_clock(self):
+        self.clock.start()
+        self._steps = 0
+        self._late_step = None
+        self._schedule_tick()
 
     def display_frame(self):
-        """mostrar el frame actual con hitboxes y coordenadas del mouse"""
+        """
+        Prepara la capa base del frame actual: se convierte y escala una
+        sola vez por frame. Hitboxes y cruz se pintan encima en paintEvent.
+        """
         if self.current_frame is None:
             return
-        frame = self.current_frame.copy()
 
-        # convertir BGR (OpenCV) → RGB (Qt)
-        # doc oficial de QT6
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_image)
+        t0 = self.perf.start()
+        target = self._frame_size()
+        frame = self.current_frame
+        if frame.shape[1] != target.width() or frame.shape[0] != target.height():
+            import cv2
+
+            # un único resize al tamaño de pantalla (también para proxy y miniaturas)
+            frame = cv2.resize(
+                frame, (target.width(), target.height()), interpolation=cv2.INTER_LINEAR
+            )
 
-        painter = QPainter(pixmap)
+        # QImage lee el BGR de OpenCV tal cual, sin cvtColor ni copia intermedia;
+        # fromImage hace la única copia necesaria hacia el pixmap
+        h, w, _ = frame.shape
+        qt_image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+        self._base_pixmap = QPixmap.fromImage(qt_image)
+        self.perf.stop(CONVERT, t0)
+        self.update()
+        if self._present_t0 is None:
+            self._present_t0 = self.perf.start()
+
+    def _frame_size(self):
+        """tamaño en pantalla del frame, manteniendo la proporción del vídeo"""
+        size = QSize(self.video_info.get("width", 0), self.video_info.get("height", 0))
+        bounds = QSize(self.display_width, self.display_height)
+        if size.isEmpty():
+            return bounds
+        return size.scaled(bounds, Qt.KeepAspectRatio)
+
+    def _frame_origin(self):
+        """esquina superior izquierda del frame centrado en el widget"""
+        size = self._base_pixmap.size()
+        return QPoint(
+            (self.width() - size.width()) // 2, (self.height() - size.height()) // 2
+        )
 
-        self._draw_hitboxes(painter, pixmap)
-        self._draw_mouse_coords(painter, pixmap)
+    def _hitbox_overlay(self):
+        """capa transparente con los hitboxes, cacheada por conjunto de hitboxes"""
+        size = self._base_pixmap.size()
+        key = (tuple(self.hitboxes), size.width(), size.height())
+        if self._overlay_key != key:
+            overlay = QPixmap(size)
+            overlay.fill(Qt.transparent)
+            painter = QPainter(overlay)
+            self._draw_hitboxes(painter)
+            painter.end()
+            self._overlay_pixmap = overlay
+            self._overlay_key = key
+        return self._overlay_pixmap
+
+    def paintEvent(self, event):
+        if self._base_pixmap is None:
+            super().paintEvent(event)  # texto de "sin vídeo"
+            return
 
+        self.perf.stop(PRESENT, self._present_t0)
+        self._present_t0 = None
+        t0 = self.perf.start()
+
+        origin = self._frame_origin()
+        painter = QPainter(self)
+        painter.drawPixmap(origin, self._base_pixmap)
+        if self.hitboxes:
+            painter.drawPixmap(origin, self._hitbox_overlay())
+
+        painter.translate(origin)
+        self._draw_mouse_coords(painter, self._base_pixmap)
+        self.perf.stop(COMPOSITE, t0)
+        if self.perf.enabled:
+            self._draw_hud(painter)
         painter.end()
 
-        self.setPixmap(
-            pixmap.scaled(self.display_width, self.display_height, Qt.KeepAspectRatio)
+    def set_perf_hud(self, enabled):
+        """HUD de rendimiento sobre el vídeo y línea [perf] en el log"""
+        self.perf.set_enabled(enabled)
+        self._present_t0 = None
+        self._hud_lines = []
+        if enabled:
+            self._perf_base = self._perf_counters()
+            self.perf_timer.start(self.PERF_INTERVAL_MS)
+        else:
+            self.perf_timer.stop()
+        self.update()
+
+    def _perf_counters(self):
+        cache = self.frame_cache
+        return (self.clock.dropped, self.clock.late, cache.hits, cache.misses)
+
+    def _perf_sample(self):
+        """refresca el HUD y escribe una línea [perf] con el último intervalo"""
+        counters = self._perf_counters()
+        dropped, late, hits, misses = (
+            now - before for now, before in zip(counters, self._perf_base)
         )
+        self._perf_base = counters
+
+        lines = []
+        for stage in STAGES:
+            ms = self.perf.stage_ms(stage)
+            text = f"{ms[0]:5.1f} / {ms[1]:5.1f} ms" if ms else "    -"
+            lines.append(f"{stage:<9} {text}")
+        lookups = hits + misses
+        lines.append(
+            f"fps       {self.perf.fps():5.1f} / {self.clock.fps * self.clock.speed:.1f}"
+        )
+        lines.append(f"drop/late {dropped:5d} / {late}")
+        lines.append(
+            f"caché     {hits / lookups:5.0%}" if lookups else "caché         -"
+        )
+        queue = self.decoder.queue_depth() if self.decoder else 0
+        lines.append(f"cola      {queue:5d}")
+        rss = process_rss()
+        if rss is not None:
+            lines.append(f"RSS       {rss / 2**20:5.0f} MB")
+
+        self._hud_lines = lines
+        print("[perf] " + " | ".join(" ".join(line.split()) for line in lines))
+        self.update()
+
+    def _draw_hud(self, painter):
+        """recuadro con las últimas medidas en la esquina del frame"""
+        if not self._hud_lines:
+            return
+        painter.setFont(self._hud_font)
+        metrics = painter.fontMetrics()
+        line_height = metrics.height()
+        width = max(metrics.horizontalAdvance(line) for line in self._hud_lines)
+        painter.fillRect(
+            QRect(4, 4, width + 12, line_height * len(self._hud_lines) + 8),
+            QColor(0, 0, 0, 170),
+        )
+        painter.setPen(QColor(0, 255, 120))
+        for i, line in enumerate(self._hud_lines):
+            painter.drawText(10, 8 + metrics.ascent() + i * line_height, line)
 
-    def _draw_hitboxes(self, painter, pixmap):
-        """dibujar hitboxes en el frame"""
+    def _draw_hitboxes(self, painter):
+        """dibujar hitboxes en la capa de hitboxes"""
         for hitbox_data in self.hitboxes:
             x0, y0, x1, y1, color_idx = hitbox_data
             color = self.HITBOX_COLORS[color_idx % len(self.HITBOX_COLORS)]
@@ -144,10 +520,7 @@ class VideoPlayer(QLabel):
         painter.drawLine(0, self.mouse_y, pixmap.width(), self.mouse_y)
         painter.drawLine(self.mouse_x, 0, self.mouse_x, pixmap.height())
 
-        font = QFont()
-        font.setPointSize(12)
-        font.setBold(True)
-        painter.setFont(font)
+        painter.setFont(self._coords_font)
 
         text = f"X: {video_x}, Y: {video_y}"
         text_rect = painter.boundingRect(0, 0, 0, 0, 0, text)
@@ -176,48 +549,61 @@ class VideoPlayer(QLabel):
         self.hitboxes = [
             (b["x0"], b["y0"], b["x1"], b["y1"], b.get("color_index", 0)) for b in boxes
         ]
-        if self.current_frame is not None:
-            self.display_frame()
+        self.update()
 
     def pause(self):
         """pauser la reproducción"""
+        self._autoplay = False
         self.timer.stop()
+        self.clock.stop()
+        self.playing = False
+        if self.decoder:
+            self.decoder.set_playing(False)
 
     def play(self):
-        if self.cap:
-            self.timer.start(40)
-
-    # TODO: refactorizar seek_frame y goto_frame
+        self._autoplay = True
+        if self.decoder:
+            self.decoder.set_playing(True)
+            self.playing = True
+            self._restart_clock()
+
+    def set_speed(self, speed):
+        """velocidad de reproducción (1.0 = tiempo real según los fps del vídeo)"""
+        self.clock.set_speed(speed)
+        if self.playing:
+            self._schedule_tick()
 
     def seek_frame(self, delta):
         """saltar a un frame relativo"""
-        if not self.cap:
+        if not self.decoder:
             return
-        current = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-        new_frame = max(0, current + delta)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-        ret, frame = self.cap.read()
-        if ret:
-            self.current_frame = frame.copy()
-            self.display_frame()
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
+        # los seeks encadenados parten del último frame pedido
+        base = (
+            self.pending_frame
+            if self.pending_frame is not None
+            else self.current_frame_number
+        )
+        new_frame = max(0, min(base + delta, self.total_frames - 1))
+        self._request_frame(new_frame)
 
     def goto_frame(self, frame_number):
         """saltar a un frame específico"""
-        if not self.cap:
+        if self._loading:
+            self._deferred = ("goto", frame_number)
+            return
+        if not self.decoder:
             return
 
         frame_number = max(0, min(frame_number, self.total_frames - 1))
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        ret, frame = self.cap.read()
-        if ret:
-            self.current_frame = frame.copy()
-            self.display_frame()
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self._request_frame(frame_number)
 
     def play_loop(self, start_frame, end_frame):
         """reproducir en bucle entre dos frames"""
-        if not self.cap:
+        if self._loading:
+            self._deferred = ("loop", start_frame, end_frame)
+            self._autoplay = True
+            return
+        if not self.decoder:
             return
 
         start_frame = max(0, min(start_frame, self.total_frames - 1))
@@ -227,34 +613,43 @@ class VideoPlayer(QLabel):
         self.loop_start = start_frame
         self.loop_end = end_frame
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-        ret, frame = self.cap.read()
-        if ret:
-            self.current_frame = frame.copy()
-            self.display_frame()
-        else:
-            print(f"Error: no se pudo leer el frame {start_frame}")
-
+        self.decoder.set_loop(start_frame, end_frame)
+        self._request_frame(start_frame)
         self.play()
 
     def stop_loop(self):
         """detener el modo bucle"""
+        if self._deferred is not None and self._deferred[0] == "loop":
+            self._deferred = None
         self.loop_enabled = False
+        if self.decoder:
+            self.decoder.set_loop(None)
         self.play()
 
+    def has_proxy(self):
+        return self.proxy is not None
+
+    def set_proxy_mode(self, enabled):
+        """proxy para navegar rápido o resolución completa para revisar hitboxes"""
+        if not self.decoder:
+            return
+        self.decoder.set_proxy(enabled)
+        if self.loop_enabled:
+            self.decoder.set_loop(self.loop_start, self.loop_end)
+        if self.current_frame_number >= 0:
+            self._request_frame(self.current_frame_number)
+
     def get_current_frame_number(self):
-        if self.cap and self.cap.isOpened():
-            return int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-        return 0
+        return max(self.current_frame_number, 0)
 
     def get_video_info(self):
         """obtener información del video"""
-        if not self.cap or not self.cap.isOpened():
+        if not self.decoder:
             return None
 
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        width = self.video_info["width"]
+        height = self.video_info["height"]
+        fps = self.video_info["fps"]
         total_frames = self.total_frames
         duration = total_frames / fps if fps > 0 else 0
 
@@ -265,30 +660,32 @@ class VideoPlayer(QLabel):
             "fps": fps,
             "total_frames": total_frames,
             "duration": duration,
+            "cache": self.frame_cache.stats(),
+            "queue_depth": self.decoder.queue_depth(),
+            "store_frames": len(self.frame_store) if self.frame_store else 0,
+            "proxy": self.decoder.use_proxy,
+            "playback": self.clock.stats(),
+            "calibration": self.calibration.segments,
         }
 
     def mouseMoveEvent(self, event):
-        if self.pixmap() and not self.pixmap().isNull():
-            pixmap_rect = self.pixmap().rect()
-            widget_rect = self.rect()
-
-            x_offset = (widget_rect.width() - pixmap_rect.width()) // 2
-            y_offset = (widget_rect.height() - pixmap_rect.height()) // 2
-
-            pos = event.position()
-            self.mouse_x = int(pos.x()) - x_offset
-            self.mouse_y = int(pos.y()) - y_offset
-
-            if (
-                0 <= self.mouse_x < pixmap_rect.width()
-                and 0 <= self.mouse_y < pixmap_rect.height()
-            ):
-                self.show_mouse_coords = True
-                self.display_frame()
-            else:
-                self.show_mouse_coords = False
-                self.display_frame()
+        if self._base_pixmap is None:
+            return
+
+        size = self._base_pixmap.size()
+        origin = self._frame_origin()
+        pos = event.position()
+        self.mouse_x = int(pos.x()) - origin.x()
+        self.mouse_y = int(pos.y()) - origin.y()
+
+        show = 0 <= self.mouse_x < size.width() and 0 <= self.mouse_y < size.height()
+        if show or self.show_mouse_coords:
+            # update() agrupa los repintados: solo se pinta la cruz sobre las
+            # capas ya hechas, como mucho una vez por refresco
+            self.show_mouse_coords = show
+            self.update()
 
     def leaveEvent(self, event):
-        self.show_mouse_coords = False
-        self.display_frame()
+        if self.show_mouse_coords:
+            self.show_mouse_coords = False
+            self.update()